@@ -226,6 +226,21 @@ if should_run_step "load_data"; then
         cat sql/03_load_data.sql
     } | snow sql $SNOW_CONN -i
     echo -e "${GREEN}[OK]${NC} Data loaded"
+    
+    # Materialize V_MMM_INPUT_WEEKLY (incremental refresh task runs on the project warehouse)
+    echo "Step 5b: Materializing weekly MMM input..."
+    {
+        echo "USE ROLE ${ROLE};"
+        echo "USE DATABASE ${DATABASE};"
+        echo "USE WAREHOUSE ${WAREHOUSE};"
+        echo ""
+        cat sql/06_weekly_input_table.sql
+        echo ""
+        echo "ALTER TASK DIMENSIONAL.REFRESH_MMM_INPUT_WEEKLY_TASK SUSPEND;"
+        echo "ALTER TASK DIMENSIONAL.REFRESH_MMM_INPUT_WEEKLY_TASK SET WAREHOUSE = ${WAREHOUSE};"
+        echo "ALTER TASK DIMENSIONAL.REFRESH_MMM_INPUT_WEEKLY_TASK RESUME;"
+    } | snow sql $SNOW_CONN -i
+    echo -e "${GREEN}[OK]${NC} Weekly input materialized"
 fi
 
 # Step 6: Deploy Notebooks
@@ -239,7 +254,17 @@ if should_run_step "notebook" && [ "$SKIP_NOTEBOOK" = false ]; then
         USE SCHEMA ATOMIC;
         PUT file://notebooks/01_mmm_training.ipynb @MODELS_STAGE/notebooks/ AUTO_COMPRESS=FALSE OVERWRITE=TRUE;
     "
-    
+
+    # Upload the mmm package next to the notebook (imported by the training cells)
+    for file in mmm/*.py; do
+        snow sql $SNOW_CONN -q "
+            USE ROLE ${ROLE};
+            USE DATABASE ${DATABASE};
+            USE SCHEMA ATOMIC;
+            PUT file://$file @MODELS_STAGE/notebooks/mmm/ AUTO_COMPRESS=FALSE OVERWRITE=TRUE;
+        "
+    done
+
     # Create notebook: MMM Training
     snow sql $SNOW_CONN -q "
         USE ROLE ${ROLE};
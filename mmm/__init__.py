@@ -0,0 +1,139 @@
+"""
+MMM Training Pipeline
+
+Importable version of notebooks/01_mmm_training.ipynb: data preparation,
+adstock/saturation transforms, Nevergrad hyperparameter search, Ridge fit,
+bootstrap ROI confidence, response curves, budget optimization and result
+persistence. Run headless with `python -m mmm train --config <file>`.
+"""
+
+from .config import MMMConfig, load_config
+from .data import (
+    COLUMN_MAPPING,
+    WEEKLY_INPUT_COLUMNS,
+    standardize_columns,
+    build_weekly_input,
+    load_weekly_input,
+    prepare_mmm_data,
+    pivot_for_modeling,
+    compute_observed_roas
+)
+from .weekly_store import WeeklyInputStore
+from .transforms import (
+    ADSTOCK_BACKENDS,
+    register_adstock_backend,
+    batch_geometric_adstock,
+    geometric_adstock,
+    AdstockState,
+    hill_saturation,
+    hill_derivative,
+    apply_media_transformations
+)
+from .validation import time_series_cv_split, calculate_metrics
+from .ridge import ControlGramRidge
+from .optimizer import MMMOptimizer
+from .training import train_final_model, fit_media_coefficients
+from .bootstrap import bootstrap_weights, weighted_ridge_coefs, bootstrap_roi_confidence
+from .curves import (
+    steady_state_response,
+    steady_state_marginal_roi,
+    efficiency_zone,
+    generate_response_curves
+)
+from .budget import BUDGET_SOLVERS, period_contribution, allocate_budget, optimize_budget
+from .results import parse_channel_key, prepare_model_results
+from .storage import (
+    model_results_for_db,
+    model_metadata,
+    save_to_snowflake,
+    sanitize_sql_identifier,
+    build_transformed_features,
+    save_transformed_features,
+    save_trial_ledger,
+    bootstrap_draws_frame,
+    save_bootstrap_draws,
+    save_bootstrap_draws_local,
+    load_bootstrap_draws,
+    save_adstock_state,
+    save_adstock_state_local,
+    load_adstock_state,
+    append_transformed_features,
+    append_transformed_features_local,
+    load_previous_run,
+    save_to_local
+)
+from .pipeline import run_training, extend_features
+
+__all__ = [
+    # Configuration
+    'MMMConfig',
+    'load_config',
+    
+    # Data
+    'COLUMN_MAPPING',
+    'WEEKLY_INPUT_COLUMNS',
+    'standardize_columns',
+    'build_weekly_input',
+    'load_weekly_input',
+    'prepare_mmm_data',
+    'pivot_for_modeling',
+    'compute_observed_roas',
+    'WeeklyInputStore',
+    
+    # Transforms
+    'ADSTOCK_BACKENDS',
+    'register_adstock_backend',
+    'batch_geometric_adstock',
+    'geometric_adstock',
+    'AdstockState',
+    'hill_saturation',
+    'hill_derivative',
+    'apply_media_transformations',
+    
+    # Validation
+    'time_series_cv_split',
+    'calculate_metrics',
+    
+    # Modeling
+    'ControlGramRidge',
+    'MMMOptimizer',
+    'train_final_model',
+    'fit_media_coefficients',
+    'bootstrap_weights',
+    'weighted_ridge_coefs',
+    'bootstrap_roi_confidence',
+    'steady_state_response',
+    'steady_state_marginal_roi',
+    'efficiency_zone',
+    'generate_response_curves',
+    'BUDGET_SOLVERS',
+    'period_contribution',
+    'allocate_budget',
+    'optimize_budget',
+    
+    # Results
+    'parse_channel_key',
+    'prepare_model_results',
+    'model_results_for_db',
+    'model_metadata',
+    'save_to_snowflake',
+    'sanitize_sql_identifier',
+    'build_transformed_features',
+    'save_transformed_features',
+    'save_trial_ledger',
+    'bootstrap_draws_frame',
+    'save_bootstrap_draws',
+    'save_bootstrap_draws_local',
+    'load_bootstrap_draws',
+    'save_adstock_state',
+    'save_adstock_state_local',
+    'load_adstock_state',
+    'append_transformed_features',
+    'append_transformed_features_local',
+    'load_previous_run',
+    'save_to_local',
+    
+    # Pipeline
+    'run_training',
+    'extend_features'
+]
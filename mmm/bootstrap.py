@@ -0,0 +1,254 @@
+"""
+Bootstrap confidence intervals for channel ROI.
+
+Resampling weeks with replacement is the same as refitting with integer
+per-week weights (how many times each week was drawn). The engine works on a
+(resamples × weeks) weight matrix instead of materialized resamples:
+
+- weighted means/variances for every resample: one matrix product each
+- X'WX for every resample: W @ (per-week outer products), then one batched
+  np.linalg.solve for all ridge systems
+- per-channel contribution and spend sums: W @ X_media_trans and W @ X_media
+
+Resampling schemes (MMMConfig.bootstrap_method):
+- "index": classic iid resample of weeks
+- "poisson": Poisson(1) weight per week
+- "moving_block": concatenated blocks of bootstrap_block_length consecutive weeks
+- "stationary": Politis-Romano blocks with geometric lengths (mean
+  bootstrap_block_length), wrapping around the end of the series
+The block schemes keep the autocorrelation that adstock builds into the
+weekly series, which iid resampling destroys (and so understates the CI width).
+
+Resamples are processed in chunks of bootstrap_chunk_size. Each chunk gets its
+own generator from np.random.SeedSequence(random_seed).spawn(), and chunks run
+on a process pool of num_workers, so results are reproducible for any number
+of workers.
+
+With return_draws=True the per-resample coefficient and ROI matrices are
+returned as well (float32, resamples × channels) so they can be persisted
+(storage.save_bootstrap_draws) for joint-uncertainty calculations downstream.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .transforms import apply_media_transformations
+
+
+def _block_indices(n_samples: int, n_bootstrap: int, block_length: int, rng) -> np.ndarray:
+    """Moving-block bootstrap: random starts, blocks of consecutive weeks, truncated to n."""
+    block_length = min(max(1, block_length), n_samples)
+    n_blocks = math.ceil(n_samples / block_length)
+    starts = rng.integers(0, n_samples - block_length + 1, size=(n_bootstrap, n_blocks))
+    idx = starts[:, :, None] + np.arange(block_length)
+    return idx.reshape(n_bootstrap, -1)[:, :n_samples]
+
+
+def _stationary_indices(n_samples: int, n_bootstrap: int, block_length: int, rng) -> np.ndarray:
+    """Stationary bootstrap: each week starts a new block with prob 1/block_length, else continues (circular)."""
+    p_new = 1.0 / max(1, block_length)
+    idx = np.empty((n_bootstrap, n_samples), dtype=np.int64)
+    idx[:, 0] = rng.integers(0, n_samples, size=n_bootstrap)
+    new_block = rng.random((n_bootstrap, n_samples)) < p_new
+    jumps = rng.integers(0, n_samples, size=(n_bootstrap, n_samples))
+    for t in range(1, n_samples):
+        idx[:, t] = np.where(new_block[:, t], jumps[:, t], (idx[:, t - 1] + 1) % n_samples)
+    return idx
+
+
+def bootstrap_weights(
+    n_samples: int,
+    n_bootstrap: int,
+    method: str = "index",
+    rng=None,
+    block_length: int = 8
+) -> np.ndarray:
+    """
+    Draw a (n_bootstrap × n_samples) matrix of per-week resampling weights.
+    
+    - "index": counts of an iid resample of weeks per row
+    - "poisson": independent Poisson(1) counts (resample size varies by row)
+    - "moving_block" / "stationary": counts of a block resample (see module docstring)
+    
+    rng is a np.random.Generator (default: a fresh unseeded generator).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    if method == "poisson":
+        return rng.poisson(1.0, size=(n_bootstrap, n_samples)).astype(float)
+    if method == "index":
+        idx = rng.integers(0, n_samples, size=(n_bootstrap, n_samples))
+    elif method == "moving_block":
+        idx = _block_indices(n_samples, n_bootstrap, block_length, rng)
+    elif method == "stationary":
+        idx = _stationary_indices(n_samples, n_bootstrap, block_length, rng)
+    else:
+        raise ValueError(
+            f"Unknown bootstrap_method '{method}'. Use 'index', 'poisson', 'moving_block' or 'stationary'."
+        )
+    offsets = (np.arange(n_bootstrap) * n_samples)[:, None]
+    return np.bincount((idx + offsets).ravel(), minlength=n_bootstrap * n_samples) \
+        .reshape(n_bootstrap, n_samples).astype(float)
+
+
+def weighted_ridge_coefs(W: np.ndarray, X: np.ndarray, y: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Unscaled Ridge coefficients for every weight vector in W, in one batched solve.
+    
+    Each row of W gives the StandardScaler + Ridge(alpha) fit on the dataset with
+    week i repeated W[b, i] times, i.e. the same coef_ / scale_ as refitting on
+    X[boot_idx], y[boot_idx].
+    
+    Parameters:
+    -----------
+    W : array (B × n) - Per-week weights
+    X : array (n × k) - Features (transformed media + controls)
+    y : array (n,) - Target
+    alpha : float - Ridge penalty
+    
+    Returns:
+    --------
+    coefs : array (B × k)
+    """
+    n, k = X.shape
+    n_b = W.sum(axis=1)                                           # (B,)
+    mean = (W @ X) / n_b[:, None]                                 # (B, k)
+    y_mean = (W @ y) / n_b                                        # (B,)
+    
+    # Weighted second moments: W @ vec(x_i x_i')
+    outer = (X[:, :, None] * X[:, None, :]).reshape(n, k * k)
+    xtx = (W @ outer).reshape(-1, k, k)                           # (B, k, k)
+    cov = xtx - n_b[:, None, None] * mean[:, :, None] * mean[:, None, :]
+    
+    # StandardScaler: population std, near-constant columns → scale 1.0
+    var = np.diagonal(cov, axis1=1, axis2=2) / n_b[:, None]
+    eps = np.finfo(float).eps
+    constant = var <= n_b[:, None] * eps * var + (n_b[:, None] * mean * eps) ** 2
+    scale = np.where(constant, 1.0, np.sqrt(np.maximum(var, 0)))  # (B, k)
+    
+    gram = cov / (scale[:, :, None] * scale[:, None, :])
+    gram[:, np.arange(k), np.arange(k)] += alpha
+    xty = W @ (X * y[:, None]) - n_b[:, None] * mean * y_mean[:, None]
+    rhs = xty / scale
+    
+    beta = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+    return beta / scale
+
+
+# Per-process bootstrap inputs, set once by the pool initializer
+_WORKER_DATA = None
+
+
+def _init_worker(data):
+    global _WORKER_DATA
+    _WORKER_DATA = data
+
+
+def _bootstrap_chunk(seed_seq, size, data=None):
+    """Draw one chunk of resamples and return its (coefs, roi) arrays (resamples × channels)."""
+    data = _WORKER_DATA if data is None else data
+    rng = np.random.default_rng(seed_seq)
+    W = bootstrap_weights(data['n_samples'], size, data['method'], rng, data['block_length'])
+    coefs = weighted_ridge_coefs(W, data['X_full'], data['y'], data['alpha'])[:, :data['n_channels']]
+    
+    # Per-channel sums over each resample: one matrix product each
+    contribution = (W @ data['media_trans']) * coefs
+    spend = W @ data['media_spend']
+    roi = np.divide(contribution, spend, out=np.zeros_like(contribution), where=spend > 0)
+    return coefs, roi
+
+
+def bootstrap_roi_confidence(X_media, X_control, y, channels, params, config, return_draws=False):
+    """
+    Bootstrap confidence intervals for channel ROI estimates.
+    
+    Resamples weeks config.n_bootstrap times, re-fits the model for each resample,
+    collects the distribution of ROI estimates. This captures uncertainty from:
+      - Sample variability (different weeks have different patterns)
+      - Coefficient estimation (regression has standard errors)
+    
+    Does NOT capture uncertainty in hyperparameters (theta, alpha, gamma).
+    
+    All resamples are solved as stacked linear algebra (see module docstring),
+    so 1,000-5,000 resamples cost less than the old 100-iteration refit loop.
+    Use bootstrap_method="moving_block" or "stationary" to respect the weekly
+    autocorrelation; draws are seeded from config.random_seed.
+    
+    Returns the ROI summary DataFrame, or (summary, draws) when return_draws=True,
+    where draws = {'channels': list, 'coef': array, 'roi': array} with float32
+    (n_bootstrap × channels) matrices in channel order.
+    """
+    n_samples = len(y)
+    n_bootstrap = config.n_bootstrap
+    ci_level = config.confidence_level
+    chunk_size = max(1, config.bootstrap_chunk_size)
+    
+    # Apply transformations once (params are fixed)
+    X_media_trans = apply_media_transformations(X_media, params, channels, backend=config.adstock_backend)
+    X_full = np.hstack([
+        X_media_trans[channels].to_numpy(dtype=float),
+        X_control.to_numpy(dtype=float)
+    ])
+    y_values = np.asarray(y, dtype=float)
+    media_trans = X_media_trans[channels].to_numpy(dtype=float)
+    media_spend = X_media[channels].to_numpy(dtype=float)
+    n_ch = len(channels)
+    
+    data = {
+        'n_samples': n_samples,
+        'method': config.bootstrap_method,
+        'block_length': config.bootstrap_block_length,
+        'X_full': X_full,
+        'y': y_values,
+        'alpha': config.ridge_alpha,
+        'media_trans': media_trans,
+        'media_spend': media_spend,
+        'n_channels': n_ch,
+    }
+    
+    # Fixed chunking + one spawned seed per chunk → same draws for any worker count
+    chunk_sizes = [min(chunk_size, n_bootstrap - start) for start in range(0, n_bootstrap, chunk_size)]
+    seeds = np.random.SeedSequence(config.random_seed).spawn(len(chunk_sizes))
+    num_workers = min(max(1, config.num_workers), len(chunk_sizes))
+    
+    method_label = config.bootstrap_method
+    if config.bootstrap_method in ("moving_block", "stationary"):
+        method_label += f", block={config.bootstrap_block_length}w"
+    print(f"\nRunning {n_bootstrap} bootstrap resamples ({method_label}) for {ci_level*100:.0f}% CI...")
+    
+    if num_workers > 1:
+        print(f"  {len(chunk_sizes)} chunks on {num_workers} worker processes")
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(data,)) as pool:
+            chunks = list(pool.map(_bootstrap_chunk, seeds, chunk_sizes))
+    else:
+        chunks = [_bootstrap_chunk(seed, size, data) for seed, size in zip(seeds, chunk_sizes)]
+    
+    coef_samples = np.vstack([coefs for coefs, _ in chunks])     # (n_bootstrap, channels)
+    roi_samples = np.vstack([roi for _, roi in chunks])
+    
+    # Calculate confidence intervals
+    alpha = 1 - ci_level
+    ci_pct = int(ci_level*100)
+    roi_ci = pd.DataFrame({
+        'CHANNEL_KEY': channels,
+        'ROI_MEAN': roi_samples.mean(axis=0),
+        'ROI_MEDIAN': np.median(roi_samples, axis=0),
+        'ROI_STD': roi_samples.std(axis=0),
+        f'ROI_CI_LOWER_{ci_pct}': np.percentile(roi_samples, alpha/2 * 100, axis=0),
+        f'ROI_CI_UPPER_{ci_pct}': np.percentile(roi_samples, (1 - alpha/2) * 100, axis=0),
+        'COEF_MEAN': coef_samples.mean(axis=0),
+        'COEF_STD': coef_samples.std(axis=0),
+        'TOTAL_SPEND': media_spend.sum(axis=0)
+    })
+    roi_ci['IS_SIGNIFICANT'] = roi_ci[f'ROI_CI_LOWER_{ci_pct}'] > 0
+    roi_ci = roi_ci.sort_values('ROI_MEAN', ascending=False)
+    
+    if return_draws:
+        draws = {
+            'channels': list(channels),
+            'coef': coef_samples.astype(np.float32),
+            'roi': roi_samples.astype(np.float32),
+        }
+        return roi_ci, draws
+    return roi_ci
@@ -0,0 +1,281 @@
+"""
+Constrained budget reallocation over the fitted response curves.
+
+Each channel's contribution over the modeled period at total spend S is
+
+    f(S) = n_weeks · coef · hill(S / n_weeks / (1 - θ); α, γ)
+
+and its exact derivative is the steady-state marginal ROI at weekly spend
+S / n_weeks (see curves.steady_state_marginal_roi). Both are evaluated for all
+channels at once, so the solvers never loop over channels in Python:
+
+- "slsqp": SciPy SLSQP on budget shares with the analytic gradient and
+  constraint Jacobian (no finite-difference objective calls).
+- "water_filling": equal-marginal-ROI solver. For a multiplier λ every
+  channel spends where f'(S) = λ (clipped to its bounds); λ is bisected until
+  the spend sums to the budget. For S-shaped curves (α > 1) only the
+  decreasing branch of f' past the Hill inflection point is used, and a
+  channel stays at its floor when that beats the tangency point.
+  This is exact for concave curves (α <= 1). With S-shaped channels the
+  Lagrangian solution can fall short of the optimum, so it is polished with
+  a local SLSQP step and the best point is kept; like SLSQP itself, the
+  result is then approximate (a local optimum of a non-concave problem).
+
+Caps are clamped to the budget left after the other channels' floors, so an
+uncapped channel (upper=np.inf) is allowed.
+"""
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+from .curves import steady_state_response, steady_state_marginal_roi
+
+BUDGET_SOLVERS = ("slsqp", "water_filling")
+
+
+def _curve_arrays(channels, params, coefficients):
+    """Per-channel (theta, alpha, gamma, coef) arrays in channel order."""
+    theta = np.array([params[ch]['theta'] for ch in channels], dtype=float)
+    alpha = np.array([params[ch]['alpha'] for ch in channels], dtype=float)
+    gamma = np.array([params[ch]['gamma'] for ch in channels], dtype=float)
+    coef = np.array([coefficients.get(ch, 0) for ch in channels], dtype=float)
+    return theta, alpha, gamma, coef
+
+
+def period_contribution(spend, theta, alpha, gamma, coef, n_weeks=1):
+    """Contribution over n_weeks at total spend per channel (broadcasts on the last axis)."""
+    return n_weeks * steady_state_response(np.asarray(spend, dtype=float) / n_weeks, theta, alpha, gamma, coef)
+
+
+def _water_fill(lower, upper, budget, theta, alpha, gamma, coef, n_weeks, tol=1e-10, max_iter=200):
+    """Equal-marginal-ROI allocation of budget within [lower, upper]."""
+    # Steady-state response written out so the inner loop is a handful of ufuncs:
+    # x = S·k with k = 1 / (n_weeks·(1 - θ)), f = x^α / (x^α + γ^α),
+    # f'(S) = n_weeks·coef·α·f·(1 - f) / x · k
+    k = 1 / (n_weeks * (1 - np.minimum(theta, 0.999999)))
+    gamma_a = np.maximum(gamma, 1e-10) ** alpha
+    scale = n_weeks * coef * alpha * k
+    
+    def marginal(S):
+        x = S * k
+        xa = x ** alpha
+        f = xa / (xa + gamma_a)
+        # x = 0 only for channels capped at 0, which cannot move anyway
+        return np.divide(scale * f * (1 - f), x, out=np.zeros_like(x), where=x > 0)
+    
+    def lagrangian(S, lam):
+        return period_contribution(S, theta, alpha, gamma, coef, n_weeks) - lam * S
+    
+    # Marginal ROI only decreases past the Hill inflection point (0 for α <= 1)
+    inflection = gamma * (np.maximum(alpha - 1, 0) / (alpha + 1)) ** (1 / alpha) / k
+    lo = np.clip(inflection, lower, upper)
+    lo = np.maximum(lo, np.minimum(upper, 1e-12 * np.maximum(upper, 1.0)))
+    hi = upper
+    m_lo, m_hi = marginal(lo), marginal(hi)
+    
+    # Tangency points f'(S) = λ fall as λ rises, so the roots found at the
+    # current λ bracket bound every later inner search
+    root_lo, root_hi = lo.copy(), hi.copy()
+    
+    def tangency(lam, a, b):
+        a, b = a.copy(), b.copy()
+        for _ in range(max_iter):
+            if np.all(b - a <= tol * np.maximum(hi, 1.0)):
+                break
+            mid = 0.5 * (a + b)
+            above = marginal(mid) > lam
+            a = np.where(above, mid, a)
+            b = np.where(above, b, mid)
+        return np.where(m_lo <= lam, lo, np.where(m_hi >= lam, hi, 0.5 * (a + b)))
+    
+    def allocate(root, lam):
+        # Non-concave (S-shaped) channels: stay at the floor if the tangency point loses
+        return np.where(lagrangian(lower, lam) > lagrangian(root, lam), lower, root)
+    
+    lam_lo, lam_hi = 0.0, float(np.max(m_lo, initial=0.0)) * (1 + 1e-9) + 1e-12
+    for _ in range(max_iter):
+        if lam_hi - lam_lo <= tol * max(lam_hi, 1e-12):
+            break
+        lam = 0.5 * (lam_lo + lam_hi)
+        root = tangency(lam, root_lo, root_hi)
+        if allocate(root, lam).sum() > budget:
+            lam_lo, root_hi = lam, root
+        else:
+            lam_hi, root_lo = lam, root
+    
+    # Spend the remaining gap on the channels that switch on between λ_hi and λ_lo
+    # (a partial move into the convex part of an S-curve), best average return first
+    S = allocate(tangency(lam_hi, root_lo, root_hi), lam_hi)
+    S_next = allocate(tangency(lam_lo, root_lo, root_hi), lam_lo)
+    step = np.maximum(S_next - S, 0)
+    gain = period_contribution(S_next, theta, alpha, gamma, coef, n_weeks) - \
+        period_contribution(S, theta, alpha, gamma, coef, n_weeks)
+    gap = budget - S.sum()
+    partial = {}
+    for i in np.argsort(-np.divide(gain, step, out=np.zeros_like(step), where=step > 0)):
+        if gap <= 0 or step[i] <= 0:
+            break
+        add = min(gap, step[i])
+        S[i] += add
+        gap -= add
+        if add < step[i] and step[i] > tol * max(hi[i], 1.0):
+            partial[i] = S_next[i]
+    
+    # Rounding residual (budget-neutral to machine precision)
+    gap = budget - S.sum()
+    room = (upper - S) if gap > 0 else (S - lower)
+    if room.sum() > 0:
+        S = S + gap * room / room.sum()
+    return np.clip(S, lower, upper), partial
+
+
+def allocate_budget(theta, alpha, gamma, coef, total_budget, lower, upper,
+                    n_weeks=1, solver="slsqp", x0=None):
+    """
+    Allocate total_budget across channels to maximize predicted contribution.
+    
+    Parameters:
+    -----------
+    theta, alpha, gamma, coef : arrays (channels,) - Fitted adstock/Hill parameters
+        and unscaled media coefficients
+    total_budget : float - Spend to allocate (same period as lower/upper)
+    lower, upper : arrays (channels,) - Per-channel spend floors (finite, >= 0) and
+        caps (>= floors; np.inf for uncapped)
+    n_weeks : int - Weeks the spend covers (spend is spread evenly)
+    solver : str - "slsqp" or "water_filling"
+    x0 : array (channels,) - Starting spend for SLSQP (defaults to a feasible scaled guess);
+        with water_filling, an extra start for the S-curve polish
+    
+    Returns:
+    --------
+    spend : array (channels,) - Recommended spend per channel
+    
+    Raises:
+    -------
+    ValueError - Unknown solver, invalid bounds or budget, or an infeasible budget
+    """
+    if solver not in BUDGET_SOLVERS:
+        raise ValueError(f"Unknown budget solver '{solver}'. Available: {list(BUDGET_SOLVERS)}")
+    
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    if not np.isfinite(total_budget) or total_budget < 0:
+        raise ValueError(f"Budget must be finite and >= 0, got {total_budget}")
+    if not np.all(np.isfinite(lower)) or np.any(lower < 0):
+        raise ValueError("Spend floors must be finite and >= 0")
+    if np.any(np.isnan(upper)) or np.any(upper < lower):
+        raise ValueError("Spend caps must be set (np.inf for uncapped) and >= the floors")
+    if lower.sum() > total_budget * (1 + 1e-9) or upper.sum() < total_budget * (1 - 1e-9):
+        raise ValueError(
+            f"Infeasible budget {total_budget:,.0f}: floors sum to {lower.sum():,.0f}, "
+            f"caps sum to {upper.sum():,.0f}"
+        )
+    if total_budget <= 0:
+        return np.zeros_like(lower)
+    
+    # No channel can take more than what the other floors leave (also bounds np.inf caps)
+    upper = np.maximum(np.minimum(upper, total_budget - (lower.sum() - lower)), lower)
+    
+    if solver == "water_filling":
+        args = (theta, alpha, gamma, coef, n_weeks)
+        spend, partial = _water_fill(lower, upper, total_budget, *args)
+        # A channel left part-way up the convex section of its S-curve is the
+        # one place the Lagrangian solution can be beaten: re-solve with it
+        # pinned at its floor and at its switch-on point and keep the best
+        best = period_contribution(spend, *args).sum()
+        for i, switch_on in partial.items():
+            for pin in (lower[i], switch_on):
+                lo, hi = lower.copy(), upper.copy()
+                lo[i] = hi[i] = pin
+                if lo.sum() > total_budget or hi.sum() < total_budget:
+                    continue
+                candidate, _ = _water_fill(lo, hi, total_budget, *args)
+                value = period_contribution(candidate, *args).sum()
+                if value > best:
+                    spend, best = candidate, value
+        
+        # Exact for concave curves; with S-shaped channels polish locally with SLSQP
+        # from the water-filling point (and from x0, so it never trails SLSQP from x0)
+        if np.any(np.asarray(alpha) > 1):
+            for start in [spend] if x0 is None else [spend, x0]:
+                polished = allocate_budget(theta, alpha, gamma, coef, total_budget, lower, upper,
+                                           n_weeks=n_weeks, solver="slsqp", x0=start)
+                value = period_contribution(polished, *args).sum()
+                if value > best:
+                    spend, best = polished, value
+        return spend
+    
+    # SLSQP on shares of the budget with exact gradients
+    if x0 is None:
+        x0 = np.clip(lower + (upper - lower) * (total_budget - lower.sum()) / max(upper.sum() - lower.sum(), 1e-12),
+                     lower, upper)
+    share0 = np.asarray(x0, dtype=float) / total_budget
+    scale = max(abs(period_contribution(x0, theta, alpha, gamma, coef, n_weeks).sum()), 1.0)
+    
+    def objective(x):
+        return -period_contribution(x * total_budget, theta, alpha, gamma, coef, n_weeks).sum() / scale
+    
+    def gradient(x):
+        mroi = steady_state_marginal_roi(x * total_budget / n_weeks, theta, alpha, gamma, coef)
+        return -np.nan_to_num(mroi, posinf=1e12) * total_budget / scale
+    
+    ones = np.ones(len(share0))
+    budget_constraint = {'type': 'eq', 'fun': lambda x: np.sum(x) - 1.0, 'jac': lambda x: ones}
+    bounds = list(zip(lower / total_budget, upper / total_budget))
+    
+    result = minimize(objective, share0, jac=gradient, method='SLSQP', bounds=bounds,
+                      constraints=budget_constraint, options={'maxiter': 1000, 'ftol': 1e-12})
+    return np.clip(result.x, lower / total_budget, upper / total_budget) * total_budget
+
+
+def optimize_budget(X_media, channels, params, coefficients, marginal_roi, budget_change_limit=0.30,
+                    solver="slsqp"):
+    """
+    Optimize budget allocation to maximize predicted revenue.
+    
+    Uses constrained optimization to find the best reallocation within
+    business constraints (±30% per channel, budget neutral). solver="slsqp"
+    runs SLSQP with exact gradients; solver="water_filling" equalizes
+    marginal ROI directly (see module docstring).
+    
+    coefficients are the unscaled media coefficients from fit_media_coefficients().
+    """
+    n_weeks = len(X_media)
+    spend_totals = X_media[channels].sum().to_numpy(dtype=float)
+    total_budget = spend_totals.sum()
+    
+    # Only optimize channels with actual spend (avoid divide-by-zero)
+    active = spend_totals > 0
+    active_channels = [ch for ch, on in zip(channels, active) if on]
+    
+    if len(active_channels) == 0:
+        return pd.DataFrame()
+    
+    current = spend_totals[active]
+    theta, alpha, gamma, coef = _curve_arrays(active_channels, params, coefficients)
+    lower = np.maximum(0, current * (1 - budget_change_limit))
+    upper = current * (1 + budget_change_limit)
+    
+    recommended = allocate_budget(
+        theta, alpha, gamma, coef, total_budget, lower, upper,
+        n_weeks=n_weeks, solver=solver, x0=current
+    )
+    change = recommended - current
+    
+    opt_df = pd.DataFrame({
+        'CHANNEL_KEY': active_channels,
+        'CURRENT_SPEND': current,
+        'RECOMMENDED_SPEND': recommended,
+        'CHANGE_AMOUNT': change,
+        'CHANGE_PCT': change / current * 100,
+        'MARGINAL_ROI': [marginal_roi.get(ch, 0) for ch in active_channels]
+    }).sort_values('CHANGE_PCT', ascending=False)
+    
+    current_contribution = period_contribution(current, theta, alpha, gamma, coef, n_weeks).sum()
+    optimized_contribution = period_contribution(recommended, theta, alpha, gamma, coef, n_weeks).sum()
+    predicted_lift = optimized_contribution - current_contribution
+    
+    print(f"\nPredicted Revenue Lift: ${predicted_lift:,.0f}")
+    print(f"Lift Percentage: {predicted_lift / current_contribution * 100:.1f}%")
+    
+    return opt_df
@@ -0,0 +1,102 @@
+"""
+Command-line entry point.
+
+    python -m mmm train --config configs/local.yaml
+    python -m mmm train --config configs/local.yaml --nevergrad-budget 50 --n-bootstrap 20
+    python -m mmm train --config configs/local.yaml --warm-start
+    python -m mmm refresh-input --data-dir data/synthetic --store output/mmm_input.sqlite
+    python -m mmm extend-features --config configs/local.yaml
+
+Flags override values from the config file. The snowflake backend needs
+snowflake-snowpark-python and a connection configured for Session.builder
+(e.g. a default connection in ~/.snowflake/connections.toml).
+"""
+import argparse
+import sys
+
+from .config import load_config
+
+
+def _snowpark_session():
+    from snowflake.snowpark import Session
+    return Session.builder.getOrCreate()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m mmm", description="Marketing Mix Model training")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    train = subparsers.add_parser("train", help="Train the MMM and save results")
+    train.add_argument("--config", help="YAML or JSON file with MMMConfig fields")
+    train.add_argument("--data-backend", choices=["snowflake", "csv"], help="Override data_backend")
+    train.add_argument("--data-dir", help="Override data_dir (csv backend)")
+    train.add_argument("--output-dir", help="Override output_dir (csv backend)")
+    train.add_argument("--input-store", help="Override input_store (csv backend, incremental weekly input)")
+    train.add_argument("--nevergrad-budget", type=int, help="Override nevergrad_budget")
+    train.add_argument("--num-workers", type=int, help="Override num_workers (optimizer process pool)")
+    train.add_argument("--n-bootstrap", type=int, help="Override n_bootstrap")
+    train.add_argument("--warm-start", action="store_true", default=None,
+                       help="Warm-start from the previous run's parameters (incremental refresh)")
+    train.add_argument("--warm-start-budget", type=int, help="Override warm_start_budget")
+    train.add_argument("--model-version", help="Override model_version")
+    
+    extend = subparsers.add_parser(
+        "extend-features", help="Append transformed features for weeks added since training"
+    )
+    extend.add_argument("--config", help="YAML or JSON file with MMMConfig fields (same as training)")
+    extend.add_argument("--data-backend", choices=["snowflake", "csv"], help="Override data_backend")
+    extend.add_argument("--data-dir", help="Override data_dir (csv backend)")
+    extend.add_argument("--output-dir", help="Override output_dir (csv backend)")
+    extend.add_argument("--input-store", help="Override input_store (csv backend)")
+    
+    refresh = subparsers.add_parser("refresh-input", help="Merge new extract rows into the local weekly input store")
+    refresh.add_argument("--data-dir", default="data/synthetic", help="Raw synthetic extracts")
+    refresh.add_argument("--store", default="output/mmm_input.sqlite", help="SQLite weekly input store")
+    refresh.add_argument("--full", action="store_true", help="Recompute every week, not only changed ones")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    
+    if args.command == "train":
+        from .pipeline import run_training
+        
+        config = load_config(
+            args.config,
+            data_backend=args.data_backend,
+            data_dir=args.data_dir,
+            output_dir=args.output_dir,
+            input_store=args.input_store,
+            nevergrad_budget=args.nevergrad_budget,
+            num_workers=args.num_workers,
+            n_bootstrap=args.n_bootstrap,
+            warm_start=args.warm_start,
+            warm_start_budget=args.warm_start_budget,
+            model_version=args.model_version,
+        )
+        session = _snowpark_session() if config.data_backend == "snowflake" else None
+        run_training(config, session=session)
+    elif args.command == "extend-features":
+        from .pipeline import extend_features
+        
+        config = load_config(
+            args.config,
+            data_backend=args.data_backend,
+            data_dir=args.data_dir,
+            output_dir=args.output_dir,
+            input_store=args.input_store,
+        )
+        session = _snowpark_session() if config.data_backend == "snowflake" else None
+        extend_features(config, session=session)
+    elif args.command == "refresh-input":
+        from .weekly_store import WeeklyInputStore
+        
+        with WeeklyInputStore(args.store) as store:
+            store.load_extracts(args.data_dir)
+            store.refresh(full=args.full)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+"""
+MMM training configuration.
+
+`MMMConfig` is shared by the training notebook and the headless CLI
+(`python -m mmm train --config ...`). Config files are YAML or JSON with
+keys matching the dataclass fields; unknown keys are rejected so typos
+don't silently fall back to defaults.
+"""
+import json
+import os
+from dataclasses import dataclass, field, fields
+from datetime import datetime
+from typing import List
+
+
+@dataclass
+class MMMConfig:
+    """
+    Configuration for MMM model training.
+    
+    GRANULARITY CHOICES:
+    - geo_level: Controls geographic aggregation. Options:
+        - "GLOBAL": Aggregate all regions (best for sparse data, ~10 channel groups)
+        - "SUPER_REGION": 3-4 regions per channel (needs 50+ weeks per combo)
+        - "REGION" or "COUNTRY": More granular (needs very rich data)
+      Rule of thumb: need ~50+ weeks of non-zero REVENUE per Channel×Geo combo.
+    
+    - product_level: SEGMENT (4 groups) vs CATEGORY (23 groups). More granular = 
+      more actionable but requires more data. Start with SEGMENT, drill down if R² holds.
+    
+    HYPERPARAMETER SEARCH:
+    - nevergrad_budget: 2000 iterations (Robyn uses 2000+). The objective refits with a
+      closed-form Ridge over cached control Gram blocks, so each evaluation costs well
+      under a millisecond. Increase further if CV MAPE is unstable.
+    - num_workers: candidates are asked in batches of nevergrad_batch_size and scored on a
+      process pool. Seeded by random_seed, so any worker count reproduces the same result.
+    - optimizer_portfolio / n_starts: run several Nevergrad optimizers and seeds side by side
+      (nevergrad_budget evaluations each) and keep the best. early_stop_patience ends runs
+      whose loss has plateaued, counting rounds only after warm-up: the optimizer's
+      initial population and early_stop_warmup of the run's budget (DE-style searches
+      sit on long plateaus early on). Every trial is written to the trial ledger.
+    
+    VALIDATION:
+    - cv_train_weeks=52: Full year captures seasonality (Q1 budget flush, Q4 holidays)
+    - cv_test_weeks=13: Quarter-out holdout mimics real forecasting use case
+    
+    BOOTSTRAP:
+    - bootstrap_method="moving_block" or "stationary" resamples runs of consecutive weeks
+      so adstock-driven autocorrelation survives; iid "index" resampling understates CIs.
+    - Chunks of bootstrap_chunk_size run on num_workers processes with SeedSequence-spawned
+      streams from random_seed (same draws for any worker count).
+    
+    BUDGET OPTIMIZER:
+    - budget_solver="slsqp" uses exact gradients of the steady-state response;
+      "water_filling" equalizes marginal ROI directly and stays in milliseconds
+      for hundreds of channel × geo × product keys.
+    
+    DATA BACKEND:
+    - data_backend="snowflake": read input_view through a Snowpark session (notebook)
+    - data_backend="csv": read local files (headless CLI). If input_csv is set it must
+      be an export of V_MMM_INPUT_WEEKLY; otherwise the weekly view is rebuilt from
+      the raw synthetic extracts in data_dir. With input_store set, data_dir is merged
+      into that SQLite file and only the weeks with new or changed rows are recomputed
+      (mmm/weekly_store.py, the local twin of sql/06_weekly_input_table.sql).
+    
+    INCREMENTAL REFRESH:
+    - warm_start=True loads the previous run's decoded params (MODEL_RESULTS / MODEL_METADATA,
+      or the CSVs in output_dir) and searches around them with warm_start_budget evaluations
+      per run instead of nevergrad_budget. If no weeks were added since that run, the search
+      is skipped and its params are reused. Falls back to a full search when there is no
+      previous run or its geo_level / product_level differ.
+    
+    DATA SPARSITY NOTE:
+    If CV MAPE > 50%, the data is likely too sparse for the chosen granularity.
+    Switch geo_level to "GLOBAL" to aggregate across regions and improve model stability.
+    """
+    # Data sources
+    input_view: str = "DIMENSIONAL.V_MMM_INPUT_WEEKLY"
+    output_table: str = "ATOMIC.MMM_MODEL_RESULT"
+    
+    # Local backend (headless CLI runs)
+    data_backend: str = "snowflake"   # snowflake or csv
+    data_dir: str = "data/synthetic"  # Raw synthetic extracts (csv backend)
+    input_csv: str = ""               # Optional export of V_MMM_INPUT_WEEKLY (csv backend)
+    input_store: str = ""             # Optional SQLite file materializing the weekly input (csv backend)
+    output_dir: str = "output"        # Where the csv backend writes results
+    
+    # Model granularity - use GLOBAL for channel-only modeling (most robust)
+    # Use SUPER_REGION only if you have 50+ weeks with revenue per channel-region
+    geo_level: str = "GLOBAL"         # GLOBAL (recommended), SUPER_REGION, REGION, or COUNTRY
+    product_level: str = "SEGMENT"    # SEGMENT, DIVISION, or CATEGORY
+    
+    # Hyperparameter optimization
+    nevergrad_budget: int = 2000      # Evolutionary algorithm iterations
+    adstock_backend: str = "lfilter"  # Batched adstock engine: lfilter, numpy, or numba (if installed)
+    num_workers: int = 1              # Processes scoring Nevergrad candidates (1 = in-process)
+    nevergrad_batch_size: int = 16    # Candidates per ask/tell round (fixes the search path across num_workers)
+    optimizer_portfolio: List[str] = field(default_factory=lambda: ["TwoPointsDE"])  # e.g. TwoPointsDE, CMA, DE, PSO
+    n_starts: int = 1                 # Seeds per portfolio optimizer (random_seed, random_seed + 1, ...)
+    early_stop_patience: int = 0      # Stop a run after N rounds without improvement after warm-up (0 = run full budget)
+    early_stop_tol: float = 1e-4      # Minimum loss improvement that resets the patience counter
+    early_stop_warmup: float = 0.25   # Fraction of each run's budget evaluated before early stopping can trigger
+    warm_start: bool = False          # Seed the search with the previous MODEL_VERSION's params
+    warm_start_budget: int = 200      # Evaluations per run when warm-starting (replaces nevergrad_budget)
+    warm_start_sigma: float = 0.3     # Search spread around the previous params (search box is [-5, 5])
+    # ridge_alpha: float = 10.0       # DEMO: Lower regularization → wilder ROI estimates (try this to show overfitting)
+    ridge_alpha: float = 50.0         # L2 penalty strength (stronger regularization → more conservative, realistic ROI)
+    random_seed: int = 42             # Reproducibility for bootstrap sampling
+    
+    # Time-series cross-validation (rolling window, never peek at future)
+    cv_train_weeks: int = 52          # 1 year training window
+    cv_test_weeks: int = 13           # 1 quarter holdout (13 weeks)
+    cv_step_weeks: int = 13           # Roll forward 1 quarter between folds
+    
+    # Bootstrap for uncertainty quantification
+    n_bootstrap: int = 1000           # Resamples (all solved as one batched linear-algebra pass)
+    bootstrap_method: str = "index"   # index, poisson, moving_block, or stationary (block modes keep autocorrelation)
+    bootstrap_block_length: int = 8   # Weeks per block (mean block length for stationary)
+    bootstrap_chunk_size: int = 1000  # Resamples per batched solve / per pool task (bounds memory)
+    confidence_level: float = 0.90    # 90% CI = 5th to 95th percentile
+    
+    # Budget optimizer constraints
+    budget_change_limit: float = 0.30 # ±30% per channel (realistic for CMO approval)
+    budget_solver: str = "slsqp"      # slsqp or water_filling (equal marginal ROI; scales to hundreds of keys)
+    
+    # Response curves
+    n_curve_points: int = 1000        # Points per channel in MMM.RESPONSE_CURVES
+    
+    # Model versioning (for tracking in MMM_MODEL_RESULT table and Model Registry)
+    # Uses semantic prefix + timestamp for auto-increment: v3_1_YYYYMMDD_HHMMSS
+    _version_prefix: str = "v3_1"
+    model_version: str = field(default_factory=lambda: f"v3_1_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+
+
+def load_config(path: str = None, **overrides) -> MMMConfig:
+    """
+    Build an MMMConfig from a YAML/JSON file plus keyword overrides.
+    
+    Overrides with value None are ignored so CLI flags that weren't passed
+    don't clobber values from the file.
+    """
+    values = {}
+    if path:
+        with open(path) as f:
+            if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+                import yaml
+                values = yaml.safe_load(f) or {}
+            else:
+                values = json.load(f)
+    values.update({k: v for k, v in overrides.items() if v is not None})
+    
+    known = {f.name for f in fields(MMMConfig)}
+    unknown = sorted(set(values) - known)
+    if unknown:
+        raise ValueError(f"Unknown MMMConfig keys: {unknown}")
+    return MMMConfig(**values)
@@ -0,0 +1,123 @@
+"""
+Spend → revenue response curves with CI bands and efficiency zones.
+
+Curves use the steady-state response of a channel held at a constant weekly
+spend s: adstock converges to s / (1 - θ), so
+
+    response(s) = coef · hill(s / (1 - θ); α, γ)
+    mROI(s)     = coef · hill'(s / (1 - θ); α, γ) / (1 - θ)
+
+Everything is evaluated on a (channels × points) grid in one pass, with the
+analytic Hill derivative for marginal ROI instead of a finite difference.
+"""
+import numpy as np
+import pandas as pd
+
+from .transforms import hill_saturation, hill_derivative
+
+# Marginal-ROI thresholds for EFFICIENCY_ZONE
+EFFICIENT_MROI = 1.5
+SATURATED_MROI = 0.8
+
+# z-score for the CI bands (90% two-sided)
+CI_Z = 1.645
+
+
+def _steady_state_input(spend, theta):
+    """Steady-state adstock s / (1 - θ) for a constant weekly spend s."""
+    theta = np.asarray(theta, dtype=float)
+    return np.where(theta < 1, spend / np.where(theta < 1, 1 - theta, 1.0), spend)
+
+
+def steady_state_response(spend, theta, alpha, gamma, coef):
+    """
+    Revenue per week at a constant weekly spend: coef · hill(s / (1 - θ)).
+    
+    Parameters broadcast against the last axis of spend, so a (points × channels)
+    or (scenarios × channels) spend array can be evaluated with per-channel arrays.
+    """
+    spend = np.maximum(np.asarray(spend, dtype=float), 0)
+    return np.asarray(coef, dtype=float) * hill_saturation(_steady_state_input(spend, theta), alpha, gamma)
+
+
+def steady_state_marginal_roi(spend, theta, alpha, gamma, coef):
+    """Exact derivative of steady_state_response with respect to weekly spend."""
+    spend = np.maximum(np.asarray(spend, dtype=float), 0)
+    theta = np.asarray(theta, dtype=float)
+    chain = np.where(theta < 1, 1 / np.where(theta < 1, 1 - theta, 1.0), 1.0)
+    return np.asarray(coef, dtype=float) * hill_derivative(_steady_state_input(spend, theta), alpha, gamma) * chain
+
+
+def efficiency_zone(marginal_roi) -> np.ndarray:
+    """EFFICIENT (mROI > 1.5), DIMINISHING (0.8-1.5), SATURATED (< 0.8)."""
+    return np.select(
+        [marginal_roi > EFFICIENT_MROI, marginal_roi >= SATURATED_MROI],
+        ['EFFICIENT', 'DIMINISHING'],
+        default='SATURATED'
+    )
+
+
+def generate_response_curves(X_media, channels, params, coefficients, roi_confidence, n_points=1000):
+    """
+    Generate response curves with confidence intervals and efficiency zones.
+    
+    Response curves show the spend → revenue relationship for each channel.
+    Marginal ROI is the slope of this curve at current spend level.
+    
+    ENHANCED OUTPUT INCLUDES:
+    - CI bands: Upper/lower predictions based on bootstrap coefficient variance
+    - Marginal ROI at each point: Answers "what's the next dollar worth HERE?"
+    - Efficiency zone: EFFICIENT (mROI > 1.5), DIMINISHING (0.8-1.5), SATURATED (< 0.8)
+    
+    coefficients are the unscaled media coefficients from fit_media_coefficients().
+    Each channel gets n_points evenly spaced spend levels from 0 to 3× its max
+    weekly spend. At zero spend, where the Hill slope is unbounded for α < 1,
+    marginal ROI is the average return of the first grid step.
+    """
+    n_ch = len(channels)
+    theta = np.array([params[ch]['theta'] for ch in channels], dtype=float)
+    alpha = np.array([params[ch]['alpha'] for ch in channels], dtype=float)
+    gamma = np.array([params[ch]['gamma'] for ch in channels], dtype=float)
+    coef = np.array([coefficients.get(ch, 0) for ch in channels], dtype=float)
+    
+    # Get coefficient uncertainty from bootstrap (for CI bands)
+    if roi_confidence is not None and 'COEF_STD' in roi_confidence.columns:
+        coef_std = roi_confidence.set_index('CHANNEL_KEY')['COEF_STD'].reindex(channels).fillna(0).to_numpy()
+    else:
+        coef_std = coef * 0.15  # Default 15% uncertainty
+    
+    spend_matrix = X_media[channels].to_numpy(dtype=float)
+    current_spend = spend_matrix.mean(axis=0)
+    max_spend = spend_matrix.max(axis=0) * 3
+    
+    # (points × channels) grid; parameters broadcast along the channel axis
+    grid = np.linspace(0, max_spend, n_points)
+    saturated = hill_saturation(_steady_state_input(grid, theta), alpha, gamma)
+    revenue = saturated * coef
+    
+    # CI bands (scale coefficient uncertainty through saturation transform)
+    ci_lower = saturated * np.maximum(0, coef - CI_Z * coef_std)
+    ci_upper = saturated * (coef + CI_Z * coef_std)
+    
+    # Marginal ROI at each spend level (analytic derivative)
+    mroi = steady_state_marginal_roi(grid, theta, alpha, gamma, coef)
+    if n_points > 1:
+        first_step = np.divide(revenue[1], grid[1], out=np.zeros(n_ch), where=grid[1] > 0)
+        mroi[0] = np.where(np.isfinite(mroi[0]), mroi[0], first_step)
+    
+    curves = pd.DataFrame({
+        'CHANNEL': np.repeat(np.asarray(channels, dtype=object), n_points),
+        'SPEND': grid.T.ravel(),
+        'PREDICTED_REVENUE': revenue.T.ravel(),
+        'PREDICTED_REVENUE_CI_LOWER': ci_lower.T.ravel(),
+        'PREDICTED_REVENUE_CI_UPPER': ci_upper.T.ravel(),
+        'MARGINAL_ROI_AT_SPEND': mroi.T.ravel(),
+        'EFFICIENCY_ZONE': efficiency_zone(mroi.T.ravel())
+    })
+    
+    # Marginal ROI at current spend (for summary)
+    current_mroi = steady_state_marginal_roi(current_spend, theta, alpha, gamma, coef)
+    current_mroi = np.where(current_spend > 0, current_mroi, 0.0)
+    marginal_roi = dict(zip(channels, current_mroi))
+    
+    return curves, marginal_roi
@@ -0,0 +1,321 @@
+"""
+Input loading and feature preparation.
+
+The model reads one long table at week × region × channel grain
+(DIMENSIONAL.V_MMM_INPUT_WEEKLY). With the "snowflake" backend it comes from a
+Snowpark session; with the "csv" backend it is either an export of that view
+or rebuilt locally from the raw synthetic extracts with the same joins as
+sql/05_fix_attribution.sql, so a headless run trains on the same shape of data
+as the notebook.
+"""
+import os
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .config import MMMConfig
+
+
+# Map view column names to expected model column names
+# The view uses _NAME/_CODE suffixes, but the model expects simple names
+COLUMN_MAPPING = {
+    'SUPER_REGION_NAME': 'SUPER_REGION',
+    'REGION_NAME': 'REGION',
+    'COUNTRY_NAME': 'COUNTRY',
+    'SEGMENT_NAME': 'SEGMENT',
+    'DIVISION_NAME': 'DIVISION',
+    'CATEGORY_NAME': 'CATEGORY',
+    'CHANNEL_CODE': 'CHANNEL',
+    'AVG_PMI': 'PMI_INDEX',
+    'AVG_COMPETITOR_SOV': 'COMPETITOR_SOV',
+    'AVG_INDUSTRY_GROWTH': 'INDUSTRY_GROWTH'
+}
+
+# Channel → CHANNEL_TYPE, as in the WEEKLY_SPEND CTE of V_MMM_INPUT_WEEKLY
+CHANNEL_TYPES = {
+    'LinkedIn': 'SOCIAL',
+    'Facebook': 'SOCIAL',
+    'Google Ads': 'SEARCH',
+    'Programmatic': 'PROGRAMMATIC',
+}
+
+# Output columns of V_MMM_INPUT_WEEKLY, in view order
+WEEKLY_INPUT_COLUMNS = [
+    'WEEK_START', 'SUPER_REGION_NAME', 'REGION_NAME', 'COUNTRY_NAME', 'SEGMENT_NAME',
+    'DIVISION_NAME', 'CATEGORY_NAME', 'CHANNEL_CODE', 'CHANNEL_TYPE', 'CAMPAIGN_OBJECTIVE',
+    'SPEND', 'IMPRESSIONS', 'CLICKS', 'VIDEO_VIEWS', 'ENGAGEMENTS', 'REVENUE',
+    'AVG_PMI', 'AVG_COMPETITOR_SOV', 'AVG_INDUSTRY_GROWTH'
+]
+
+
+def standardize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Uppercase column names and rename view columns to model column names."""
+    df = df.copy()
+    df.columns = df.columns.str.upper()
+    return df.rename(columns=COLUMN_MAPPING)
+
+
+def _week_start(dates: pd.Series) -> pd.Series:
+    """DATE_TRUNC('WEEK', ...) equivalent: Monday of the ISO week."""
+    dates = pd.to_datetime(dates).dt.normalize()
+    return dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')
+
+
+def build_weekly_input(data_dir: str) -> pd.DataFrame:
+    """
+    Rebuild V_MMM_INPUT_WEEKLY from the raw synthetic CSV extracts.
+    
+    Mirrors sql/03_load_data.sql + sql/05_fix_attribution.sql:
+    - Spend: daily Sprinklr spend joined to campaign metadata, summed per
+      week × region × channel × channel type × campaign objective
+    - Revenue: SAP invoices → Salesforce opportunity → campaign → channel
+    - Controls: weekly average PMI / competitor SOV per region
+    Spend and revenue are FULL OUTER joined on week × region × channel, then
+    controls are LEFT joined on week × region.
+    
+    Returns the view's raw column names (REGION_NAME, CHANNEL_CODE, AVG_PMI, ...).
+    """
+    # "NA" is North America, not a missing value
+    campaigns = pd.read_csv(os.path.join(data_dir, 'campaign_metadata.csv'), keep_default_na=False)
+    spend = pd.read_csv(os.path.join(data_dir, 'sprinklr_spend.csv'))
+    opps = pd.read_csv(os.path.join(data_dir, 'salesforce_opps.csv'))
+    revenue = pd.read_csv(os.path.join(data_dir, 'sap_revenue.csv'))
+    macro = pd.read_csv(os.path.join(data_dir, 'macro_indicators.csv'), keep_default_na=False)
+    
+    campaigns = campaigns.rename(columns={'CHANNEL': 'CHANNEL_CODE', 'REGION': 'REGION_NAME',
+                                          'TYPE': 'CAMPAIGN_OBJECTIVE'})
+    campaigns = campaigns[['CAMPAIGN_ID', 'REGION_NAME', 'CHANNEL_CODE', 'CAMPAIGN_OBJECTIVE']]
+    
+    # WEEKLY_SPEND
+    s = spend.drop(columns=['CHANNEL']).merge(campaigns, on='CAMPAIGN_ID', how='left')
+    s['WEEK_START'] = _week_start(s['DATE'])
+    s['CHANNEL_TYPE'] = s['CHANNEL_CODE'].map(CHANNEL_TYPES).fillna('OTHER')
+    weekly_spend = s.groupby(
+        ['WEEK_START', 'REGION_NAME', 'CHANNEL_CODE', 'CHANNEL_TYPE', 'CAMPAIGN_OBJECTIVE'],
+        dropna=False
+    ).agg(
+        SPEND=('SPEND_AMT', 'sum'),
+        IMPRESSIONS=('IMPRESSIONS', 'sum'),
+        CLICKS=('CLICKS', 'sum'),
+        VIDEO_VIEWS=('VIDEO_VIEWS_50', 'sum'),
+    ).reset_index()
+    
+    # WEEKLY_REVENUE_BY_CHANNEL
+    r = revenue.merge(opps[['OPPORTUNITY_ID', 'LEAD_SOURCE_CAMPAIGN']], on='OPPORTUNITY_ID', how='inner')
+    r = r.merge(campaigns, left_on='LEAD_SOURCE_CAMPAIGN', right_on='CAMPAIGN_ID', how='inner')
+    r['WEEK_START'] = _week_start(r['POSTING_DATE'])
+    weekly_revenue = r.groupby(['WEEK_START', 'REGION_NAME', 'CHANNEL_CODE']).agg(
+        REVENUE=('BOOKED_REVENUE', 'sum')
+    ).reset_index()
+    
+    # WEEKLY_INDICATORS
+    macro['WEEK_START'] = _week_start(macro['DATE'])
+    weekly_indicators = macro.groupby(['WEEK_START', 'REGION']).agg(
+        AVG_PMI=('PMI_INDEX', 'mean'),
+        AVG_COMPETITOR_SOV=('COMPETITOR_SOV', 'mean'),
+    ).reset_index().rename(columns={'REGION': 'REGION_NAME'})
+    
+    df = weekly_spend.merge(weekly_revenue, on=['WEEK_START', 'REGION_NAME', 'CHANNEL_CODE'], how='outer')
+    df = df.merge(weekly_indicators, on=['WEEK_START', 'REGION_NAME'], how='left')
+    
+    for col in ['SPEND', 'IMPRESSIONS', 'CLICKS', 'VIDEO_VIEWS', 'REVENUE']:
+        df[col] = df[col].fillna(0)
+    df['SUPER_REGION_NAME'] = df['REGION_NAME']
+    df['COUNTRY_NAME'] = None
+    df['SEGMENT_NAME'] = None
+    df['DIVISION_NAME'] = None
+    df['CATEGORY_NAME'] = None
+    df['ENGAGEMENTS'] = 0
+    df['AVG_INDUSTRY_GROWTH'] = 0
+    
+    return df[WEEKLY_INPUT_COLUMNS].sort_values('WEEK_START').reset_index(drop=True)
+
+
+def load_weekly_input(config: MMMConfig, session=None) -> pd.DataFrame:
+    """
+    Load the weekly MMM input for the configured backend, with model column names.
+    
+    - "snowflake": session.table(config.input_view) (session required)
+    - "csv": config.input_csv if set; otherwise config.input_store (the local
+      materialized table, refreshed incrementally from data_dir) if set;
+      otherwise build_weekly_input(config.data_dir)
+    """
+    if config.data_backend == "snowflake":
+        if session is None:
+            raise ValueError("data_backend='snowflake' requires a Snowpark session")
+        df_raw = session.table(config.input_view).to_pandas()
+    elif config.data_backend == "csv":
+        if config.input_csv:
+            df_raw = pd.read_csv(config.input_csv, keep_default_na=False, na_values=[''])
+        elif config.input_store:
+            from .weekly_store import WeeklyInputStore
+            with WeeklyInputStore(config.input_store) as store:
+                store.load_extracts(config.data_dir)
+                store.refresh()
+                df_raw = store.read()
+        else:
+            df_raw = build_weekly_input(config.data_dir)
+    else:
+        raise ValueError(f"Unknown data_backend '{config.data_backend}'. Use 'snowflake' or 'csv'.")
+    
+    return standardize_columns(df_raw)
+
+
+def prepare_mmm_data(df: pd.DataFrame, config: MMMConfig) -> pd.DataFrame:
+    """
+    Prepare data for MMM modeling with proper granularity and features.
+    
+    Features added:
+    - Composite keys for channel × region × product (granular attribution)
+    - Fourier seasonality (smooth annual/semi-annual patterns, 6 features vs 52 dummies)
+    - Linear trend (isolate organic growth from marketing impact)
+    - B2B fiscal flags (Q1 budget flush, Q3 push)
+    """
+    df = df.copy()
+    
+    # Ensure datetime
+    df['WEEK_START'] = pd.to_datetime(df['WEEK_START'])
+    
+    # Fill missing values
+    numeric_cols = ['SPEND', 'IMPRESSIONS', 'CLICKS', 'REVENUE', 'PMI_INDEX', 'COMPETITOR_SOV']
+    for col in numeric_cols:
+        if col in df.columns:
+            df[col] = df[col].fillna(0)
+    
+    # Create composite dimension keys based on config granularity
+    geo_col = config.geo_level
+    prod_col = config.product_level
+    
+    # Handle GLOBAL geo_level - aggregate all regions into single "GLOBAL" value
+    # This is recommended for sparse data to ensure sufficient sample size per channel
+    if geo_col == "GLOBAL":
+        print("  Using GLOBAL geo aggregation (channel-only modeling)")
+        df['GEO_KEY'] = 'GLOBAL'
+        geo_col = 'GEO_KEY'
+    else:
+        print(f"  Looking for geo_col='{geo_col}' in columns: {'YES' if geo_col in df.columns else 'NO'}")
+        if geo_col in df.columns:
+            df[geo_col] = df[geo_col].fillna('UNKNOWN')
+        else:
+            df[geo_col] = 'ALL'
+            print(f"  WARNING: {geo_col} column not found, using 'ALL'")
+    
+    # Debug: print what columns we have
+    print(f"  Looking for prod_col='{prod_col}' in columns: {'YES' if prod_col in df.columns else 'NO'}")
+    print(f"  Looking for 'CHANNEL' in columns: {'YES' if 'CHANNEL' in df.columns else 'NO'}")
+        
+    if prod_col in df.columns:
+        df[prod_col] = df[prod_col].fillna('ALL')  # Use 'ALL' for null product since we don't have segment data
+    else:
+        df[prod_col] = 'ALL'
+        print(f"  WARNING: {prod_col} column not found, using 'ALL'")
+        
+    if 'CHANNEL' in df.columns:
+        df['CHANNEL'] = df['CHANNEL'].fillna('UNKNOWN')
+    else:
+        df['CHANNEL'] = 'UNKNOWN'
+        print("  WARNING: CHANNEL column not found!")
+    
+    # Composite key: Channel_Region_Product
+    # With GLOBAL geo_level, this becomes Channel_GLOBAL_ALL (effectively channel-only)
+    df['CHANNEL_KEY'] = (
+        df['CHANNEL'].astype(str) + '_' + 
+        df[geo_col].astype(str) + '_' + 
+        df[prod_col].astype(str)
+    )
+    
+    # Add time features for seasonality
+    df['WEEK_OF_YEAR'] = df['WEEK_START'].dt.isocalendar().week.astype(int)
+    df['YEAR'] = df['WEEK_START'].dt.year
+    df['TREND'] = (df['WEEK_START'] - df['WEEK_START'].min()).dt.days / 365.25
+    
+    # Fourier terms for seasonality (annual cycle)
+    for k in [1, 2, 3]:
+        df[f'SIN_{k}'] = np.sin(2 * np.pi * k * df['WEEK_OF_YEAR'] / 52)
+        df[f'COS_{k}'] = np.cos(2 * np.pi * k * df['WEEK_OF_YEAR'] / 52)
+    
+    # Q1/Q3 seasonality flag (B2B budget cycles)
+    df['Q1_FLAG'] = ((df['WEEK_START'].dt.month >= 1) & (df['WEEK_START'].dt.month <= 3)).astype(int)
+    df['Q3_FLAG'] = ((df['WEEK_START'].dt.month >= 7) & (df['WEEK_START'].dt.month <= 9)).astype(int)
+    
+    return df
+
+
+def pivot_for_modeling(
+    df: pd.DataFrame, 
+    config: MMMConfig,
+    min_spend_threshold: float = 1000
+) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame, List[str]]:
+    """
+    Pivot data to wide format for regression modeling.
+    
+    Transforms long-format data (one row per week×channel) to wide format
+    (one row per week, one column per channel). Filters out low-spend channels.
+    
+    Returns:
+    --------
+    X_media : DataFrame - Media spend variables (to be adstock/saturation transformed)
+    y : Series - Target variable (total revenue per week)
+    X_control : DataFrame - Control variables (seasonality, PMI, SOV)
+    channels : List - Channel keys with sufficient data for modeling
+    """
+    # Aggregate by week and channel_key
+    df_agg = df.groupby(['WEEK_START', 'CHANNEL_KEY']).agg({
+        'SPEND': 'sum',
+        'IMPRESSIONS': 'sum',
+        'CLICKS': 'sum',
+        'REVENUE': 'sum'
+    }).reset_index()
+    
+    # Pivot spend to wide format
+    X_media = df_agg.pivot_table(
+        index='WEEK_START',
+        columns='CHANNEL_KEY',
+        values='SPEND',
+        aggfunc='sum'
+    ).fillna(0).sort_index()
+    
+    # Filter channels with minimum spend
+    channel_totals = X_media.sum()
+    valid_channels = channel_totals[channel_totals >= min_spend_threshold].index.tolist()
+    X_media = X_media[valid_channels]
+    
+    # Target: Total revenue per week
+    y = df.groupby('WEEK_START')['REVENUE'].sum().sort_index()
+    
+    # Control variables
+    control_cols = ['TREND', 'SIN_1', 'COS_1', 'SIN_2', 'COS_2', 'Q1_FLAG', 'Q3_FLAG']
+    if 'PMI_INDEX' in df.columns:
+        control_cols.append('PMI_INDEX')
+    if 'COMPETITOR_SOV' in df.columns:
+        control_cols.append('COMPETITOR_SOV')
+    
+    X_control = df.groupby('WEEK_START')[control_cols].first().sort_index()
+    
+    # Align indices
+    common_idx = X_media.index.intersection(y.index).intersection(X_control.index)
+    X_media = X_media.loc[common_idx]
+    y = y.loc[common_idx]
+    X_control = X_control.loc[common_idx]
+    
+    channels = X_media.columns.tolist()
+    
+    return X_media, y, X_control, channels
+
+
+def compute_observed_roas(df: pd.DataFrame, X_media: pd.DataFrame, channels: List[str]) -> Dict[str, float]:
+    """
+    Observed revenue / spend per channel key (ground truth for the optimizer's ROI constraint).
+    
+    Channels with no spend or no attributed revenue default to 1.0 (breakeven).
+    """
+    observed_roas = {}
+    for ch in channels:
+        spend = X_media[ch].sum()
+        revenue = df[df['CHANNEL_KEY'] == ch]['REVENUE'].sum() if 'REVENUE' in df.columns else 0
+        if spend > 0 and revenue > 0:
+            observed_roas[ch] = revenue / spend
+        else:
+            observed_roas[ch] = 1.0  # Default to breakeven if no data
+    return observed_roas
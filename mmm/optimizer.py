@@ -0,0 +1,330 @@
+"""
+Nevergrad hyperparameter search for per-channel adstock/saturation params.
+
+Each channel gets (theta, alpha, gamma) searched in an unbounded [-5, 5] box
+and mapped to valid ranges with a sigmoid; the objective refits a Ridge on the
+transformed media + controls and scores (1 - R²) plus economic penalties.
+The refit uses ControlGramRidge (closed form, control Gram blocks cached), so
+each evaluation is a few small NumPy products and one SPD solve.
+
+The search runs as batch ask/tell: Nevergrad proposes nevergrad_batch_size
+candidates, they are scored (serially or on a process pool of num_workers)
+and told back in ask order. The batch size, not the worker count, drives the
+optimizer's trajectory, so a seeded run gives the same result on any number
+of workers. Several optimizers/seeds can be run as a portfolio with plateau
+early stopping; every trial is kept in a ledger.
+
+Warm start (incremental refresh): optimize(init=...) samples every run around
+a previous run's parameters (encode_params) instead of the whole box, so a
+reduced budget is enough when only a few weeks were added.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+import nevergrad as ng
+
+from .ridge import ControlGramRidge
+from .transforms import batch_geometric_adstock, hill_saturation
+
+
+# Per-process copy of the optimizer, set once by the pool initializer so the
+# data isn't re-pickled with every candidate
+_WORKER_OPTIMIZER = None
+
+
+def _init_worker(mmm_optimizer):
+    global _WORKER_OPTIMIZER
+    _WORKER_OPTIMIZER = mmm_optimizer
+
+
+def _evaluate_in_worker(flat_params):
+    return _WORKER_OPTIMIZER._objective(flat_params)
+
+
+class MMMOptimizer:
+    """
+    Marketing Mix Model optimizer using Nevergrad evolutionary algorithm.
+    
+    Finds optimal (theta, alpha, gamma) for each channel by minimizing (1 - R²)
+    with a penalty for economically invalid negative coefficients.
+    """
+    
+    def __init__(self, X_media, X_control, y, channels, config, observed_roas=None):
+        self.X_media = X_media
+        self.X_control = X_control
+        self.y = y
+        self.channels = channels
+        self.config = config
+        self.n_params = len(channels) * 3  # 3 params per channel
+        # Store max spend per channel for gamma scaling
+        self.channel_max = {ch: max(X_media[ch].max(), 1) for ch in channels}
+        # Store observed ROAS for each channel (used in ROI constraint)
+        self.observed_roas = observed_roas if observed_roas else {}
+        
+        # Hot-path arrays: everything that doesn't depend on the candidate params
+        self._X_media = X_media[channels].to_numpy(dtype=float)
+        self._gamma_max = np.array([self.channel_max[ch] for ch in channels], dtype=float)
+        self._spend_totals = self._X_media.sum(axis=0)
+        # Allow 3x deviation from observed ROAS before penalty kicks in
+        # DEMO: Change 3 to 10 for looser constraints, or 1.5 for tighter
+        observed = np.array([self.observed_roas.get(ch, 1.0) for ch in channels], dtype=float)
+        self._max_allowed_roi = np.maximum(observed * 3, 5.0)  # At least 5x to allow some flexibility
+        self._ridge = ControlGramRidge(X_control, y, alpha=config.ridge_alpha)
+        
+    def _decode_arrays(self, flat_params):
+        """Sigmoid-decode the flat vector into (thetas, alphas, gammas) arrays, one entry per channel."""
+        raw = np.asarray(flat_params, dtype=float).reshape(len(self.channels), 3)
+        sig = 1 / (1 + np.exp(-raw))
+        thetas = sig[:, 0] * 0.95  # [0, 0.95]
+        alphas = 0.5 + sig[:, 1] * 2.5  # [0.5, 3.0]
+        gammas = np.maximum(sig[:, 2] * self._gamma_max, 1e-6)  # [0, max]
+        return thetas, alphas, gammas
+        
+    def _decode_params(self, flat_params):
+        """
+        Decode flat parameter array into structured dict.
+        
+        Uses sigmoid transform to map unbounded search space [-5, 5] to valid ranges:
+        - theta: [0, 0.95] (can't be 1.0 or adstock explodes)
+        - alpha: [0.5, 3.0] (reasonable S-curve shapes)
+        - gamma: [0, max_spend] (scaled to channel's observed range)
+        """
+        # Sigmoid: 1/(1+e^-x) maps (-∞,∞) → (0,1), then scale to target range
+        thetas, alphas, gammas = self._decode_arrays(flat_params)
+        params = {}
+        for i, ch in enumerate(self.channels):
+            params[ch] = {'theta': thetas[i], 'alpha': alphas[i], 'gamma': gammas[i]}
+        return params
+    
+    def encode_params(self, params):
+        """
+        Inverse of _decode_params: flat search vector for {channel: {theta, alpha, gamma}}.
+        
+        Gamma is scaled by the current channel max, so a channel whose spend range
+        grew starts at the same absolute half-saturation point. Channels missing
+        from params (new channel keys) start at the centre of the search box.
+        """
+        raw = np.zeros((len(self.channels), 3))
+        for i, ch in enumerate(self.channels):
+            if ch not in params:
+                continue
+            p = params[ch]
+            sig = np.array([p['theta'] / 0.95, (p['alpha'] - 0.5) / 2.5, p['gamma'] / self._gamma_max[i]])
+            sig = np.clip(sig, 1e-3, 1 - 1e-3)
+            raw[i] = np.log(sig / (1 - sig))
+        return np.clip(raw, -5, 5).ravel()
+    
+    def _objective(self, flat_params):
+        """
+        Objective function: Minimize (1 - R²) + penalty for negative coefficients + ROI constraint.
+        
+        Why (1 - R²)? We want to MAXIMIZE R², but optimizers MINIMIZE.
+        So we minimize (1 - R²), which is 0 when R² = 1 (perfect fit).
+        
+        Why the penalties?
+        1. Negative coefficient penalty: Marketing spend should never decrease revenue.
+        2. ROI constraint penalty: Model ROI should be within reasonable range of observed ROAS.
+           This prevents the model from assigning unrealistic attribution (e.g., 48x ROI on TikTok).
+        """
+        thetas, alphas, gammas = self._decode_arrays(flat_params)
+        X_media_trans = hill_saturation(
+            batch_geometric_adstock(self._X_media, thetas, backend=self.config.adstock_backend),
+            alphas, gammas
+        )
+        
+        # Closed-form Ridge: only the media block of the Gram matrix is rebuilt
+        media_coefs, r2 = self._ridge.fit_media(X_media_trans)
+        
+        # Penalize negative media coefficients (economically invalid)
+        negative_penalty = np.sum(np.minimum(media_coefs, 0) ** 2) * 10
+        
+        # ROI constraint: penalize ROI estimates far from observed ROAS
+        # This keeps model attribution grounded in reality
+        # DEMO: Set roi_penalty to 0 to see unconstrained ROI estimates (e.g., 48x TikTok)
+        contribution = X_media_trans.sum(axis=0) * media_coefs
+        model_roi = np.divide(contribution, self._spend_totals,
+                              out=np.zeros_like(contribution), where=self._spend_totals > 0)
+        excess = np.maximum(model_roi - self._max_allowed_roi, 0) / self._max_allowed_roi
+        roi_penalty = np.sum(excess ** 2)
+        
+        roi_penalty *= 5  # Scale penalty weight (DEMO: Set to 0 to disable ROI constraint entirely)
+        
+        return (1 - r2) + negative_penalty + roi_penalty
+    
+    def _new_run(self, optimizer_name, seed, budget, batch_size, init=None):
+        """Create one seeded Nevergrad optimizer for the portfolio (around init when warm-starting)."""
+        if optimizer_name not in ng.optimizers.registry:
+            raise ValueError(f"Unknown Nevergrad optimizer '{optimizer_name}'")
+        if init is None:
+            # Search space: unbounded, will be mapped via sigmoid in _decode_params
+            parametrization = ng.p.Array(shape=(self.n_params,)).set_bounds(-5, 5)
+        else:
+            # No bounds here: bounded arrays are sampled across the whole box, which
+            # would discard the warm start (the sigmoid decode accepts any value)
+            parametrization = ng.p.Array(init=init).set_mutation(sigma=self.config.warm_start_sigma)
+        parametrization.random_state = np.random.RandomState(seed)
+        optimizer = ng.optimizers.registry[optimizer_name](
+            parametrization=parametrization, budget=budget, num_workers=batch_size
+        )
+        if init is not None:
+            optimizer.suggest(init)  # First candidate is the previous optimum itself
+        # Early stopping only counts rounds that start after the initial population
+        # (DE/PSO expose it as llambda) and early_stop_warmup of the budget
+        population = getattr(optimizer, 'llambda', None) or batch_size
+        warmup = max(int(population), math.ceil(self.config.early_stop_warmup * budget))
+        return {
+            'optimizer_name': optimizer_name, 'seed': seed, 'optimizer': optimizer,
+            'remaining': budget, 'warmup': warmup, 'best_loss': np.inf, 'stale_rounds': 0,
+            'stopped_early': False, 'trial_values': [], 'trial_losses': [],
+        }
+    
+    def optimize(self, budget=2000, init=None):
+        """
+        Run Nevergrad optimization.
+        
+        TwoPointsDE (Two-Points Differential Evolution):
+        - Population-based evolutionary algorithm
+        - Creates new candidates by combining existing good solutions
+        - Robust to non-smooth, non-convex objective landscapes
+        - 2000 iterations affordable now that each evaluation is a closed-form solve
+        
+        PORTFOLIO MODE: every optimizer in config.optimizer_portfolio is started
+        config.n_starts times (seeds random_seed, random_seed + 1, ...), each with
+        `budget` evaluations. Runs advance in lockstep: each round every active run
+        asks config.nevergrad_batch_size candidates and the combined batch is scored
+        on config.num_workers processes (1 = in-process). A run stops early once its
+        best loss hasn't improved by early_stop_tol for early_stop_patience rounds.
+        Patience is counted in rounds after warm-up: a round only counts once the
+        optimizer's initial population (e.g. TwoPointsDE's llambda candidates) and
+        config.early_stop_warmup of the budget have been evaluated before it.
+        The run with the lowest recommended loss wins.
+        
+        Every evaluated candidate is recorded in self.trial_ledger (one row per
+        trial × channel with the decoded theta/alpha/gamma).
+        
+        WARM START: with init (encode_params of a previous run) every run samples
+        around init with config.warm_start_sigma, and init is kept if no run
+        beats it on the current data.
+        """
+        num_workers = max(1, self.config.num_workers)
+        batch_size = max(1, self.config.nevergrad_batch_size)
+        patience = self.config.early_stop_patience
+        
+        runs = [
+            self._new_run(name, self.config.random_seed + start, budget, batch_size, init=init)
+            for name in self.config.optimizer_portfolio
+            for start in range(max(1, self.config.n_starts))
+        ]
+        print(f"\nOptimizing {self.n_params} parameters ({len(self.channels)} channels × 3 params)...")
+        if init is not None:
+            print(f"  Warm start: searching around the previous parameters (sigma={self.config.warm_start_sigma})")
+        if len(runs) > 1:
+            print(f"  Portfolio: {len(runs)} runs ({', '.join(self.config.optimizer_portfolio)} "
+                  f"× {max(1, self.config.n_starts)} seeds), {budget} evaluations each")
+        if num_workers > 1:
+            print(f"  Evaluating batches of {batch_size} candidates per run on {num_workers} worker processes")
+        
+        pool = (
+            ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker, initargs=(self,))
+            if num_workers > 1 else nullcontext()
+        )
+        with pool:
+            active = [run for run in runs if run['remaining'] > 0]
+            while active:
+                asked = [
+                    (run, run['optimizer'].ask())
+                    for run in active
+                    for _ in range(min(batch_size, run['remaining']))
+                ]
+                values = [candidate.value for _, candidate in asked]
+                if num_workers > 1:
+                    chunksize = math.ceil(len(values) / num_workers)
+                    losses = list(pool.map(_evaluate_in_worker, values, chunksize=chunksize))
+                else:
+                    losses = [self._objective(v) for v in values]
+                
+                # Tell in ask order so the trajectory is independent of completion order
+                round_losses = {id(run): [] for run in active}
+                for (run, candidate), value, loss in zip(asked, values, losses):
+                    run['optimizer'].tell(candidate, loss)
+                    run['trial_values'].append(value)
+                    run['trial_losses'].append(loss)
+                    run['remaining'] -= 1
+                    round_losses[id(run)].append(loss)
+                
+                # Loss-plateau early stopping, checked once per round after warm-up
+                for run in active:
+                    round_best = min(round_losses[id(run)])
+                    if round_best < run['best_loss'] - self.config.early_stop_tol:
+                        run['best_loss'] = round_best
+                        run['stale_rounds'] = 0
+                    elif len(run['trial_losses']) - len(round_losses[id(run)]) >= run['warmup']:
+                        run['stale_rounds'] += 1
+                    if patience > 0 and run['stale_rounds'] >= patience and run['remaining'] > 0:
+                        run['stopped_early'] = True
+                        run['remaining'] = 0
+                active = [run for run in active if run['remaining'] > 0]
+        
+        summary = []
+        for run_id, run in enumerate(runs):
+            recommendation = run['optimizer'].provide_recommendation()
+            run['recommendation'] = recommendation.value
+            run['final_loss'] = self._objective(recommendation.value)
+            summary.append({
+                'RUN_ID': run_id,
+                'OPTIMIZER': run['optimizer_name'],
+                'SEED': run['seed'],
+                'N_EVALUATIONS': len(run['trial_losses']),
+                'STOPPED_EARLY': run['stopped_early'],
+                'FINAL_LOSS': run['final_loss'],
+            })
+        run_summary = pd.DataFrame(summary)
+        best_run_id = int(run_summary['FINAL_LOSS'].idxmin())
+        best = runs[best_run_id]
+        self.trial_ledger = self._build_ledger(runs)
+        
+        if len(runs) > 1:
+            print(run_summary.to_string(index=False))
+        best_params = self._decode_params(best['recommendation'])
+        final_loss = best['final_loss']
+        
+        warm_start_loss = self._objective(init) if init is not None else None
+        if warm_start_loss is not None and warm_start_loss <= final_loss:
+            print(f"  No run improved on the previous parameters (loss {warm_start_loss:.4f}); keeping them")
+            best_params, final_loss, best_run_id = self._decode_params(init), warm_start_loss, None
+        
+        print(f"Optimization complete. Final loss: {final_loss:.4f} (R² ≈ {1 - final_loss:.4f})")
+        return best_params, {
+            'final_loss': final_loss,
+            'best_run': best_run_id,
+            'warm_start_loss': warm_start_loss,
+            'n_evaluations': int(run_summary['N_EVALUATIONS'].sum()),
+            'runs': run_summary,
+        }
+    
+    def _build_ledger(self, runs):
+        """Long-format trial ledger: one row per (run, trial, channel)."""
+        frames = []
+        n_ch = len(self.channels)
+        for run_id, run in enumerate(runs):
+            n_trials = len(run['trial_losses'])
+            if n_trials == 0:
+                continue
+            raw = np.asarray(run['trial_values'], dtype=float).reshape(n_trials, n_ch, 3)
+            sig = 1 / (1 + np.exp(-raw))
+            frames.append(pd.DataFrame({
+                'MODEL_VERSION': self.config.model_version,
+                'RUN_ID': run_id,
+                'OPTIMIZER': run['optimizer_name'],
+                'SEED': run['seed'],
+                'TRIAL': np.repeat(np.arange(n_trials), n_ch),
+                'LOSS': np.repeat(np.asarray(run['trial_losses'], dtype=float), n_ch),
+                'CHANNEL': np.tile(self.channels, n_trials),
+                'THETA': (sig[:, :, 0] * 0.95).ravel(),
+                'ALPHA': (0.5 + sig[:, :, 1] * 2.5).ravel(),
+                'GAMMA': np.maximum(sig[:, :, 2] * self._gamma_max, 1e-6).ravel(),
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,232 @@
+"""
+End-to-end training run: load → features → hyperparameter search → fit →
+bootstrap → curves → budget → results → save.
+
+This is the same sequence as notebooks/01_mmm_training.ipynb without the
+notebook-only steps (charts, Feature Store, Model Registry, ML Observability).
+
+With config.warm_start the hyperparameter search starts from the previous
+MODEL_VERSION's parameters with a reduced budget (incremental refresh), and is
+skipped when no weeks were added since that run.
+
+Every run also saves the terminal adstock state; extend_features() uses it to
+append MMM_FEATURES_TRANSFORMED rows for weeks loaded after training, filtering
+only the new weeks.
+"""
+from dataclasses import replace
+
+import numpy as np
+import pandas as pd
+
+from .bootstrap import bootstrap_roi_confidence
+from .budget import optimize_budget
+from .config import MMMConfig
+from .curves import generate_response_curves
+from .data import compute_observed_roas, load_weekly_input, pivot_for_modeling, prepare_mmm_data
+from .optimizer import MMMOptimizer
+from .results import prepare_model_results
+from .storage import (
+    append_transformed_features,
+    append_transformed_features_local,
+    build_transformed_features,
+    load_adstock_state,
+    load_previous_run,
+    save_adstock_state,
+    save_adstock_state_local,
+    save_to_local,
+    save_bootstrap_draws,
+    save_to_snowflake,
+    save_trial_ledger,
+    save_transformed_features,
+)
+from .training import fit_media_coefficients, train_final_model
+from .transforms import AdstockState, hill_saturation
+from .validation import time_series_cv_split
+
+
+def _warm_start_source(config: MMMConfig, session=None):
+    """Previous run to warm-start from, or None if disabled, missing or trained at another granularity."""
+    if not config.warm_start:
+        return None
+    previous = load_previous_run(config, session=session)
+    if previous is None:
+        return None
+    if (previous['geo_level'], previous['product_level']) != (config.geo_level, config.product_level):
+        print(f"  Previous run {previous['model_version']} used {previous['geo_level']}/"
+              f"{previous['product_level']}; running a full search")
+        return None
+    return previous
+
+
+def _search_params(optimizer: MMMOptimizer, config: MMMConfig, previous, data_end_week: str):
+    """Hyperparameter search: full, warm-started around previous, or skipped if nothing changed."""
+    if previous is None:
+        return optimizer.optimize(budget=config.nevergrad_budget)
+    
+    channels = optimizer.channels
+    if previous['data_end_week'] == data_end_week and set(previous['params']) == set(channels):
+        print(f"\nNo new weeks since {previous['model_version']} (data ends {data_end_week}); "
+              f"reusing its parameters")
+        optimizer.trial_ledger = pd.DataFrame()
+        best_params = {ch: dict(previous['params'][ch]) for ch in channels}
+        return best_params, {'final_loss': None, 'best_run': None, 'warm_start_loss': None,
+                             'n_evaluations': 0, 'runs': pd.DataFrame()}
+    
+    new_channels = [ch for ch in channels if ch not in previous['params']]
+    print(f"\nWarm start from {previous['model_version']} (data ended {previous['data_end_week'] or 'unknown'}), "
+          f"{config.warm_start_budget} evaluations per run"
+          + (f"; {len(new_channels)} new channel keys start cold" if new_channels else ""))
+    return optimizer.optimize(budget=config.warm_start_budget, init=optimizer.encode_params(previous['params']))
+
+
+def run_training(config: MMMConfig, session=None) -> dict:
+    """
+    Train the MMM and persist results for the configured backend.
+    
+    Parameters:
+    -----------
+    config : MMMConfig - Run configuration (data_backend selects input and output)
+    session : Snowpark Session - Required when data_backend="snowflake"
+    
+    Returns:
+    --------
+    dict with best_params, optimizer_runs, warm_start_from, trial_ledger, metrics, roi_confidence,
+    bootstrap_draws, response_curves, marginal_roi, budget_recommendations and model_results
+    """
+    np.random.seed(config.random_seed)  # Reproducibility for bootstrap sampling
+    print(f"MMM training run: {config.model_version} (backend={config.data_backend})")
+    previous = _warm_start_source(config, session=session)
+    
+    df_raw = load_weekly_input(config, session=session)
+    print(f"Loaded {len(df_raw):,} rows "
+          f"({df_raw['WEEK_START'].min()} to {df_raw['WEEK_START'].max()})")
+    
+    df = prepare_mmm_data(df_raw, config)
+    X_media, y, X_control, channels = pivot_for_modeling(df, config)
+    print(f"Modeling {len(channels)} channel keys over {len(y)} weeks")
+    
+    cv_splits = time_series_cv_split(
+        n_samples=len(y),
+        train_size=config.cv_train_weeks,
+        test_size=config.cv_test_weeks,
+        step_size=config.cv_step_weeks
+    )
+    
+    observed_roas = compute_observed_roas(df, X_media, channels)
+    optimizer = MMMOptimizer(X_media, X_control, y, channels, config, observed_roas=observed_roas)
+    data_end_week = str(pd.Timestamp(y.index.max()).date())
+    best_params, opt_metrics = _search_params(optimizer, config, previous, data_end_week)
+    
+    model, scaler, X_transformed, metrics = train_final_model(
+        X_media, X_control, y, channels, best_params, cv_splits, config
+    )
+    print(f"In-sample R²: {metrics['in_sample']['R2']:.4f}, "
+          f"CV MAPE: {metrics['cv_mean'].get('MAPE', float('nan')):.1f}%")
+    metrics['data_end_week'] = data_end_week
+    metrics['warm_start_from'] = previous['model_version'] if previous else None
+    metrics['n_evaluations'] = opt_metrics['n_evaluations']
+    
+    roi_confidence, bootstrap_draws = bootstrap_roi_confidence(
+        X_media, X_control, y, channels, best_params, config, return_draws=True
+    )
+    
+    coefficients = fit_media_coefficients(X_media, X_control, y, channels, best_params, config)
+    response_curves, marginal_roi = generate_response_curves(
+        X_media, channels, best_params, coefficients, roi_confidence, n_points=config.n_curve_points
+    )
+    budget_recommendations = optimize_budget(
+        X_media, channels, best_params, coefficients, marginal_roi, config.budget_change_limit,
+        solver=config.budget_solver
+    )
+    
+    model_results = prepare_model_results(
+        roi_confidence, marginal_roi, budget_recommendations, best_params, config, metrics, X_media,
+        coefficients=coefficients
+    )
+    
+    adstock_state = AdstockState.from_history(
+        X_media[channels], [best_params[ch]['theta'] for ch in channels], channels,
+        backend=config.adstock_backend
+    )
+    
+    if config.data_backend == "snowflake":
+        save_to_snowflake(session, model_results, response_curves, config, metrics)
+        save_transformed_features(session, X_transformed, X_control, y, df, channels, config)
+        save_trial_ledger(session, optimizer.trial_ledger)
+        save_bootstrap_draws(session, bootstrap_draws, config)
+        save_adstock_state(session, adstock_state, config)
+    else:
+        features_df = build_transformed_features(X_transformed, X_control, y, df, channels, config)
+        save_to_local(config.output_dir, model_results, response_curves, config, metrics, features_df,
+                      trial_ledger=optimizer.trial_ledger, bootstrap_draws=bootstrap_draws,
+                      adstock_state=adstock_state)
+    
+    return {
+        'best_params': best_params,
+        'optimizer_runs': opt_metrics['runs'],
+        'warm_start_from': metrics['warm_start_from'],
+        'trial_ledger': optimizer.trial_ledger,
+        'metrics': metrics,
+        'roi_confidence': roi_confidence,
+        'bootstrap_draws': bootstrap_draws,
+        'response_curves': response_curves,
+        'marginal_roi': marginal_roi,
+        'budget_recommendations': budget_recommendations,
+        'model_results': model_results,
+        'adstock_state': adstock_state,
+    }
+
+
+def extend_features(config: MMMConfig, session=None) -> pd.DataFrame:
+    """
+    Append MMM_FEATURES_TRANSFORMED rows for weeks loaded since the last training run.
+    
+    The saved adstock state is extended over the new weeks only (O(new weeks)),
+    saturated with the saved alpha/gamma and appended under the trained
+    MODEL_VERSION; the state is then saved through the new last week. Controls
+    (trend, seasonality, PMI/SOV) are rebuilt from the full input, as in training.
+    
+    Parameters:
+    -----------
+    config : MMMConfig - Same data settings as the training run
+    session : Snowpark Session - Required when data_backend="snowflake"
+    
+    Returns:
+    --------
+    DataFrame of appended feature rows (empty if there were no new weeks)
+    """
+    saved = load_adstock_state(config, session=session)
+    previous = load_previous_run(config, session=session)
+    if saved is None or previous is None:
+        raise ValueError("No saved model / adstock state: run `python -m mmm train` first")
+    model_version, state = saved
+    if model_version != previous['model_version'] or not state.matches(previous['params']):
+        raise ValueError(f"Adstock state ({model_version}) does not match the saved model "
+                         f"({previous['model_version']}); retrain to rebuild it")
+    
+    df = prepare_mmm_data(load_weekly_input(config, session=session), config)
+    X_media, y, X_control, _ = pivot_for_modeling(df, config)
+    new_weeks = X_media.index[X_media.index > state.last_week]
+    print(f"Extending features of {model_version}: {len(new_weeks)} new weeks after "
+          f"{state.last_week.date()}")
+    if len(new_weeks) == 0:
+        return pd.DataFrame()
+    
+    channels = state.channels
+    alphas = np.array([previous['params'][ch]['alpha'] for ch in channels])
+    gammas = np.array([previous['params'][ch]['gamma'] for ch in channels])
+    adstocked = state.extend(X_media.loc[new_weeks])
+    X_new = pd.DataFrame(hill_saturation(adstocked, alphas, gammas), index=new_weeks, columns=channels)
+    
+    run_config = replace(config, model_version=model_version)
+    features_df = build_transformed_features(
+        X_new, X_control.loc[new_weeks], y.loc[new_weeks], df[df['WEEK_START'].isin(new_weeks)],
+        channels, run_config
+    )
+    if config.data_backend == "snowflake":
+        append_transformed_features(session, features_df)
+        save_adstock_state(session, state, run_config)
+    else:
+        append_transformed_features_local(config.output_dir, features_df)
+        save_adstock_state_local(config.output_dir, state, run_config)
+    return features_df
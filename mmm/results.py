@@ -0,0 +1,101 @@
+"""
+Assemble the channel-level MODEL_RESULTS table.
+"""
+from datetime import datetime
+
+import pandas as pd
+
+
+def parse_channel_key(channel_key):
+    """
+    Parse composite channel key back to dimensions.
+    E.g., "LINKEDIN_EMEA_SI" → {CHANNEL: LINKEDIN, GEO: EMEA, PRODUCT: SI}
+    """
+    parts = channel_key.split('_')
+    if len(parts) >= 3:
+        return {'CHANNEL': parts[0], 'GEO': parts[1], 'PRODUCT': parts[2]}
+    elif len(parts) == 2:
+        return {'CHANNEL': parts[0], 'GEO': parts[1], 'PRODUCT': 'ALL'}
+    else:
+        return {'CHANNEL': parts[0] if parts else 'UNKNOWN', 'GEO': 'ALL', 'PRODUCT': 'ALL'}
+
+
+def prepare_model_results(roi_confidence, marginal_roi, budget_recommendations, params, config, metrics, X_media,
+                          coefficients=None):
+    """
+    Prepare final results DataFrame for saving to MMM.MODEL_RESULTS.
+    
+    ENHANCED OUTPUT now includes:
+    - Full uncertainty quantification (CI bounds, significance)
+    - Learned MMM parameters (adstock decay, saturation shape/scale)
+    - Model quality metrics (R², CV MAPE)
+    - Spend context (current spend, share of budget)
+    - Response parameters (point coefficient, bootstrap std, curve range) so the
+      app can evaluate coef × hill(s / (1 - θ)) directly instead of reading
+      MMM.RESPONSE_CURVES
+    
+    coefficients are the unscaled media coefficients from fit_media_coefficients()
+    (the ones the response curves use); bootstrap COEF_MEAN is used when omitted.
+    """
+    
+    results = []
+    ci_level = int(config.confidence_level * 100)
+    
+    # Calculate total spend across all channels for share calculation
+    total_spend_all = sum(row['TOTAL_SPEND'] for _, row in roi_confidence.iterrows())
+    
+    for _, row in roi_confidence.iterrows():
+        ch = row['CHANNEL_KEY']
+        dims = parse_channel_key(ch)
+        p = params.get(ch, {'theta': 0, 'alpha': 1, 'gamma': 1})
+        
+        budget_row = budget_recommendations[budget_recommendations['CHANNEL_KEY'] == ch]
+        optimal_spend = budget_row['RECOMMENDED_SPEND'].values[0] if len(budget_row) > 0 else row['TOTAL_SPEND']
+        
+        # Calculate spend share
+        spend_share = row['TOTAL_SPEND'] / total_spend_all if total_spend_all > 0 else 0
+        
+        # Count observations for this channel
+        n_obs = len(X_media[ch].dropna()) if ch in X_media.columns else 0
+        max_weekly_spend = float(X_media[ch].max()) if ch in X_media.columns else 0.0
+        response_coef = coefficients.get(ch, row['COEF_MEAN']) if coefficients is not None else row['COEF_MEAN']
+        
+        results.append({
+            # Identifiers
+            'MODEL_RUN_DATE': datetime.now().strftime('%Y-%m-%d'),
+            'MODEL_VERSION': config.model_version,
+            'CHANNEL_CODE': dims['CHANNEL'],
+            'GEO_CODE': dims['GEO'],
+            'PRODUCT_CODE': dims['PRODUCT'],
+            'CHANNEL_KEY': ch,
+            
+            # Core metrics
+            'COEFFICIENT_WEIGHT': row['COEF_MEAN'],
+            'ROI': row['ROI_MEAN'],
+            'MARGINAL_ROI': marginal_roi.get(ch, 0),
+            
+            # Confidence intervals (90% CI from bootstrap)
+            'ROI_CI_LOWER': row[f'ROI_CI_LOWER_{ci_level}'],
+            'ROI_CI_UPPER': row[f'ROI_CI_UPPER_{ci_level}'],
+            'IS_SIGNIFICANT': row['IS_SIGNIFICANT'],
+            
+            # Learned MMM parameters
+            'ADSTOCK_DECAY_RATE': p['theta'],
+            'SATURATION_ALPHA': p['alpha'],  # Hill shape parameter
+            'SATURATION_POINT': p['gamma'],   # Half-saturation spend level
+            'RESPONSE_COEF': response_coef,     # Revenue per unit of saturation (response curves)
+            'RESPONSE_COEF_STD': row['COEF_STD'],
+            
+            # Model quality
+            'MODEL_R2_INSAMPLE': metrics['in_sample']['R2'],
+            'MODEL_MAPE_CV': metrics['cv_mean'].get('MAPE', None),
+            'N_OBSERVATIONS': n_obs,
+            
+            # Spend context
+            'CURRENT_SPEND': row['TOTAL_SPEND'],
+            'SPEND_SHARE': spend_share,
+            'OPTIMAL_SPEND_SUGGESTION': optimal_spend,
+            'MAX_WEEKLY_SPEND': max_weekly_spend  # Response curves span 0 to 3× this
+        })
+    
+    return pd.DataFrame(results)
@@ -0,0 +1,108 @@
+"""
+Closed-form Ridge for the hyperparameter search hot path.
+
+MMMOptimizer._objective refits a StandardScaler + Ridge on [media | controls]
+for every Nevergrad candidate, but only the media block changes between
+evaluations. With standardized, centered features Z = [Zm | Zc] the Ridge
+normal equations are
+
+    [Zm'Zm + λI   Zm'Zc    ] [βm]   [Zm'y]
+    [Zc'Zm        Zc'Zc + λI] [βc] = [Zc'y]
+
+so Zc'Zc and Zc'y are computed once and each evaluation only builds the
+media rows/columns and solves one small (p + k) × (p + k) SPD system in NumPy.
+Results match StandardScaler + Ridge(alpha=λ) (fit_intercept=True) to
+floating-point precision; the sklearn pair is still used for the final model.
+"""
+import numpy as np
+from scipy.linalg import solve, LinAlgError
+
+
+def _column_scale(X: np.ndarray, mean: np.ndarray) -> np.ndarray:
+    """Population std per column with StandardScaler's near-constant → 1.0 rule."""
+    n = X.shape[0]
+    var = X.var(axis=0)
+    eps = np.finfo(X.dtype).eps
+    constant = var <= n * eps * var + (n * mean * eps) ** 2
+    scale = np.sqrt(var)
+    scale[constant] = 1.0
+    return scale
+
+
+class ControlGramRidge:
+    """
+    Ridge regression with the control-variable Gram blocks cached.
+
+    Parameters:
+    -----------
+    X_control : array (weeks × k) - Fixed control variables (trend, seasonality, PMI, ...)
+    y : array (weeks,) - Target
+    alpha : float - L2 penalty (same meaning as sklearn Ridge alpha)
+
+    Usage:
+    ------
+    ridge = ControlGramRidge(X_control, y, alpha=50.0)
+    media_coefs, r2 = ridge.fit_media(X_media_transformed)
+    """
+
+    def __init__(self, X_control, y, alpha: float):
+        Xc = np.asarray(X_control, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.alpha = float(alpha)
+        self.n_samples = len(y)
+
+        # Standardize controls once (mean 0 → already centered for the intercept)
+        mean_c = Xc.mean(axis=0)
+        self.Zc = (Xc - mean_c) / _column_scale(Xc, mean_c)
+
+        self.y_mean = y.mean()
+        self.yc = y - self.y_mean
+        self.ss_tot = float(self.yc @ self.yc)
+
+        # Cached blocks: Zc'Zc + λI and Zc'y
+        self.n_control = self.Zc.shape[1]
+        self.gram_cc = self.Zc.T @ self.Zc + self.alpha * np.eye(self.n_control)
+        self.rhs_c = self.Zc.T @ self.yc
+
+    def fit_media(self, X_media):
+        """
+        Solve the Ridge system for a new media block.
+
+        Parameters:
+        -----------
+        X_media : array (weeks × p) - Transformed media columns (adstock + saturation applied)
+
+        Returns:
+        --------
+        media_coefs : array (p,) - Unscaled media coefficients (coef_ / scale_, as in the notebook)
+        r2 : float - In-sample R² of the full model
+        """
+        Xm = np.asarray(X_media, dtype=float)
+        p = Xm.shape[1]
+        mean_m = Xm.mean(axis=0)
+        scale_m = _column_scale(Xm, mean_m)
+        Zm = (Xm - mean_m) / scale_m
+
+        k = p + self.n_control
+        gram = np.empty((k, k))
+        gram[:p, :p] = Zm.T @ Zm
+        gram[:p, :p].flat[::p + 1] += self.alpha
+        cross = Zm.T @ self.Zc
+        gram[:p, p:] = cross
+        gram[p:, :p] = cross.T
+        gram[p:, p:] = self.gram_cc
+
+        rhs = np.empty(k)
+        rhs[:p] = Zm.T @ self.yc
+        rhs[p:] = self.rhs_c
+
+        try:
+            beta = solve(gram, rhs, assume_a='pos', check_finite=False)
+        except LinAlgError:
+            beta = np.linalg.lstsq(gram, rhs, rcond=None)[0]
+
+        resid = self.yc - Zm @ beta[:p] - self.Zc @ beta[p:]
+        ss_res = float(resid @ resid)
+        r2 = 1 - ss_res / self.ss_tot if self.ss_tot > 0 else 0.0
+
+        return beta[:p] / scale_m, r2
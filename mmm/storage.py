@@ -0,0 +1,429 @@
+"""
+Persist training outputs.
+
+Snowflake tables (all overwrite mode for idempotent execution):
+- MMM.MODEL_RESULTS: channel-level ROI, confidence intervals and parameters
+- MMM.RESPONSE_CURVES: spend → revenue curves with CI bands and efficiency zones
+- MMM.MODEL_METADATA: model configuration and quality metrics
+- MMM.MMM_FEATURES_TRANSFORMED: transformed features for SQL inference
+- MMM.OPTIMIZER_TRIALS: hyperparameter search ledger (append mode, keyed by MODEL_VERSION)
+- MMM.BOOTSTRAP_DRAWS: per-resample coefficient and ROI draws (replaced per MODEL_VERSION)
+- MMM.ADSTOCK_STATE: terminal adstock value per channel and θ (overwrite), so
+  MMM_FEATURES_TRANSFORMED can be extended for new weeks without a retrain
+
+The csv backend writes the same tables as files under MMMConfig.output_dir.
+Bootstrap draws are written there as one float32 NPY array plus a JSON header
+(BOOTSTRAP_DRAWS.npy / .json) so load_bootstrap_draws() can memory-map them.
+"""
+import json
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .transforms import AdstockState
+
+BOOTSTRAP_DRAWS_FILE = "BOOTSTRAP_DRAWS.npy"
+BOOTSTRAP_DRAWS_HEADER = "BOOTSTRAP_DRAWS.json"
+
+
+def model_results_for_db(model_results: pd.DataFrame) -> pd.DataFrame:
+    """Map prepare_model_results() columns to the MMM.MODEL_RESULTS table schema."""
+    results_clean = model_results.copy()
+    
+    # Map DataFrame columns to table columns
+    results_for_db = pd.DataFrame({
+        'MODEL_VERSION': results_clean['MODEL_VERSION'],
+        'CHANNEL': results_clean['CHANNEL_KEY'],
+        'COEFF_WEIGHT': results_clean['COEFFICIENT_WEIGHT'],
+        'ROI': results_clean['ROI'],
+        'MARGINAL_ROI': results_clean['MARGINAL_ROI'],
+        'OPTIMAL_SPEND': results_clean['OPTIMAL_SPEND_SUGGESTION'],
+        # Confidence intervals
+        'ROI_CI_LOWER': results_clean['ROI_CI_LOWER'],
+        'ROI_CI_UPPER': results_clean['ROI_CI_UPPER'],
+        'IS_SIGNIFICANT': results_clean['IS_SIGNIFICANT'],
+        # Learned parameters
+        'ADSTOCK_DECAY': results_clean['ADSTOCK_DECAY_RATE'],
+        'SATURATION_ALPHA': results_clean['SATURATION_ALPHA'],
+        'SATURATION_GAMMA': results_clean['SATURATION_POINT'],
+        'RESPONSE_COEF': results_clean['RESPONSE_COEF'],
+        'RESPONSE_COEF_STD': results_clean['RESPONSE_COEF_STD'],
+        # Model quality
+        'CV_MAPE': results_clean['MODEL_MAPE_CV'],
+        'R_SQUARED': results_clean['MODEL_R2_INSAMPLE'],
+        'N_OBSERVATIONS': results_clean['N_OBSERVATIONS'],
+        # Spend context
+        'CURRENT_SPEND': results_clean['CURRENT_SPEND'],
+        'SPEND_SHARE': results_clean['SPEND_SHARE'],
+        'MAX_WEEKLY_SPEND': results_clean['MAX_WEEKLY_SPEND']
+    })
+    return results_for_db
+
+
+def model_metadata(model_results: pd.DataFrame, config, metrics: dict) -> pd.DataFrame:
+    """Single-row MMM.MODEL_METADATA record: run configuration and quality metrics."""
+    return pd.DataFrame([{
+        'MODEL_VERSION': config.model_version,
+        'MODEL_RUN_DATE': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'GEO_LEVEL': config.geo_level,
+        'PRODUCT_LEVEL': config.product_level,
+        'N_CHANNELS': len(model_results),
+        'R2_INSAMPLE': metrics['in_sample']['R2'],
+        'MAPE_CV': metrics['cv_mean'].get('MAPE', None),
+        'NEVERGRAD_BUDGET': metrics.get('n_evaluations', config.nevergrad_budget),  # Evaluations spent (0 = search skipped)
+        'N_BOOTSTRAP': config.n_bootstrap,
+        'CONFIDENCE_LEVEL': config.confidence_level,
+        'DATA_END_WEEK': metrics.get('data_end_week'),
+        'WARM_START_FROM': metrics.get('warm_start_from')
+    }])
+
+
+def load_previous_run(config, session=None):
+    """
+    Decoded parameters of the last saved run, for warm-starting (None if there is none).
+    
+    Reads MMM.MODEL_RESULTS / MMM.MODEL_METADATA through the session (snowflake
+    backend) or MODEL_RESULTS.csv / MODEL_METADATA.csv in config.output_dir.
+    
+    Returns:
+    --------
+    dict with model_version, geo_level, product_level, data_end_week (None for
+    runs saved before it was recorded) and params {channel: {theta, alpha, gamma}}
+    """
+    try:
+        if config.data_backend == "snowflake":
+            results = session.table("MMM.MODEL_RESULTS").to_pandas()
+            metadata = session.table("MMM.MODEL_METADATA").to_pandas()
+        else:
+            results = pd.read_csv(os.path.join(config.output_dir, "MODEL_RESULTS.csv"))
+            metadata = pd.read_csv(os.path.join(config.output_dir, "MODEL_METADATA.csv"), keep_default_na=False)
+    except Exception as e:
+        print(f"  No previous run to warm-start from ({type(e).__name__})")
+        return None
+    if results.empty or metadata.empty:
+        return None
+    
+    meta = metadata.iloc[0]
+    data_end = meta.get('DATA_END_WEEK')
+    results = results.dropna(subset=['ADSTOCK_DECAY', 'SATURATION_ALPHA', 'SATURATION_GAMMA'])
+    params = {
+        row.CHANNEL: {'theta': row.ADSTOCK_DECAY, 'alpha': row.SATURATION_ALPHA, 'gamma': row.SATURATION_GAMMA}
+        for row in results.itertuples(index=False)
+    }
+    return {
+        'model_version': meta['MODEL_VERSION'],
+        'geo_level': meta['GEO_LEVEL'],
+        'product_level': meta['PRODUCT_LEVEL'],
+        'data_end_week': str(data_end)[:10] if pd.notna(data_end) and str(data_end) else None,
+        'params': params,
+    }
+
+
+def save_to_snowflake(session, model_results, response_curves, config, metrics):
+    """
+    Save model results and response curves to Snowflake.
+    
+    OUTPUT TABLES:
+    - MMM.MODEL_RESULTS: Channel-level ROI with confidence intervals and parameters
+    - MMM.RESPONSE_CURVES: Detailed curves with CI bands and efficiency zones
+    - MMM.MODEL_METADATA: Model configuration and quality metrics
+    """
+    print("\nSaving results to Snowflake...")
+    
+    # 1. Save main results to MMM.MODEL_RESULTS (enhanced schema)
+    results_for_db = model_results_for_db(model_results)
+    
+    results_sf = session.create_dataframe(results_for_db)
+    results_sf.write.mode("overwrite").save_as_table("MMM.MODEL_RESULTS")
+    print(f"  ✓ Saved {len(results_for_db)} rows to MMM.MODEL_RESULTS")
+    
+    # Legacy ATOMIC table save removed - schema incompatible with flat output
+    # Use MMM.MODEL_RESULTS as the primary results table
+    print("  ✓ Skipping legacy ATOMIC.MMM_MODEL_RESULT (use MMM.MODEL_RESULTS instead)")
+    
+    # 2. Save enhanced response curves (with CI bands and efficiency zones)
+    # Dense curves (n_curve_points per channel) go through write_pandas, which
+    # bulk-loads via a staged Parquet file instead of an inline VALUES insert
+    curves_clean = response_curves.copy()
+    curves_clean.insert(0, 'MODEL_VERSION', config.model_version)
+    
+    session.write_pandas(
+        curves_clean, "RESPONSE_CURVES", schema="MMM",
+        auto_create_table=True, overwrite=True
+    )
+    print(f"  ✓ Saved {len(curves_clean)} rows to MMM.RESPONSE_CURVES")
+    print("    → Includes: CI bands, marginal ROI at each point, efficiency zones")
+    
+    # 3. Save model metadata
+    metadata = model_metadata(model_results, config, metrics)
+    
+    metadata_sf = session.create_dataframe(metadata)
+    metadata_sf.write.mode("overwrite").save_as_table("MMM.MODEL_METADATA")
+    print("  ✓ Saved model metadata to MMM.MODEL_METADATA")
+    
+    print("\n" + "="*60)
+    print("SAVE COMPLETE")
+    print("="*60)
+    print("\nEnhanced outputs include:")
+    print("  • 90% confidence intervals on all ROI estimates")
+    print("  • Learned adstock decay and saturation parameters per channel")
+    print("  • Response curve CI bands and efficiency zone classifications")
+
+
+def sanitize_sql_identifier(name: str) -> str:
+    """Sanitize a channel/control name into a valid SQL column identifier."""
+    sanitized = re.sub(r'[^A-Za-z0-9_]', '_', name)
+    if sanitized and sanitized[0].isdigit():
+        sanitized = '_' + sanitized
+    return re.sub(r'_+', '_', sanitized)
+
+
+def build_transformed_features(X_transformed, X_control, y, df, channels, config) -> pd.DataFrame:
+    """One row per week: actual revenue, transformed media columns, and controls."""
+    # Get week dates
+    weeks = df.groupby('WEEK_START').first().reset_index()['WEEK_START'].values[:len(y)]
+    
+    # Build the features dataframe
+    features_df = pd.DataFrame({
+        'MODEL_VERSION': config.model_version,
+        'WEEK_START': weeks,
+        'ACTUAL_REVENUE': y.values
+    })
+    
+    # Add transformed media columns (these have adstock + saturation applied)
+    for ch in channels:
+        col_name = sanitize_sql_identifier(ch)
+        features_df[col_name] = X_transformed[ch].values
+    
+    # Add control columns
+    for col in X_control.columns:
+        col_name = sanitize_sql_identifier(col)
+        features_df[col_name] = X_control[col].values
+    
+    return features_df
+
+
+def save_transformed_features(session, X_transformed, X_control, y, df, channels, config):
+    """
+    Save the transformed features (adstock + saturation applied) to Snowflake.
+    This enables SQL inference using the base MMM_CHANNEL_ROI model.
+    """
+    print("\n" + "="*60)
+    print("SAVING TRANSFORMED FEATURES FOR SQL INFERENCE")
+    print("="*60)
+    
+    features_df = build_transformed_features(X_transformed, X_control, y, df, channels, config)
+    
+    # Save to Snowflake
+    features_sf = session.create_dataframe(features_df)
+    features_sf.write.mode("overwrite").save_as_table("MMM.MMM_FEATURES_TRANSFORMED")
+    
+    print(f"  ✓ Saved {len(features_df)} rows to MMM.MMM_FEATURES_TRANSFORMED")
+    print(f"  Columns: {len(features_df.columns)}")
+    print("    - Model version + metadata: 3")
+    print(f"    - Transformed media channels: {len(channels)}")
+    print(f"    - Control variables: {len(X_control.columns)}")
+    print("\n  SQL INFERENCE ENABLED:")
+    print("    SELECT MMM.MMM_CHANNEL_ROI!PREDICT(...)")
+    print("    FROM MMM.MMM_FEATURES_TRANSFORMED")
+    print("    WHERE PMI_INDEX IS NOT NULL;")
+    
+    return features_df
+
+
+def save_trial_ledger(session, trial_ledger):
+    """
+    Append the optimizer trial ledger to MMM.OPTIMIZER_TRIALS.
+    
+    One row per (run, trial, channel) with the loss and decoded theta/alpha/gamma.
+    Appended rather than overwritten so convergence can be compared across model
+    versions; filter on MODEL_VERSION.
+    """
+    if trial_ledger is None or trial_ledger.empty:
+        return
+    ledger_sf = session.create_dataframe(trial_ledger)
+    ledger_sf.write.mode("append").save_as_table("MMM.OPTIMIZER_TRIALS")
+    n_trials = trial_ledger.groupby('RUN_ID')['TRIAL'].nunique().sum()
+    print(f"  ✓ Appended {n_trials} trials ({len(trial_ledger)} rows) to MMM.OPTIMIZER_TRIALS")
+
+
+def bootstrap_draws_frame(draws, config) -> pd.DataFrame:
+    """Long MMM.BOOTSTRAP_DRAWS rows: one per (draw, channel) with float32 COEF and ROI."""
+    n_draws, n_channels = draws['coef'].shape
+    return pd.DataFrame({
+        'MODEL_VERSION': config.model_version,
+        'DRAW_ID': np.repeat(np.arange(n_draws, dtype=np.int32), n_channels),
+        'CHANNEL': np.tile(np.asarray(draws['channels'], dtype=object), n_draws),
+        'COEF': draws['coef'].astype(np.float32).ravel(),
+        'ROI': draws['roi'].astype(np.float32).ravel()
+    })
+
+
+def save_bootstrap_draws(session, draws, config):
+    """
+    Replace this MODEL_VERSION's rows in MMM.BOOTSTRAP_DRAWS with the new draws.
+    
+    Other versions are kept (like MMM.OPTIMIZER_TRIALS), so consumers filter on
+    MODEL_VERSION. Rows are bulk-loaded through write_pandas (staged Parquet).
+    """
+    if draws is None:
+        return
+    draws_df = bootstrap_draws_frame(draws, config)
+    session.sql(
+        "DELETE FROM MMM.BOOTSTRAP_DRAWS WHERE MODEL_VERSION = ?", params=[config.model_version]
+    ).collect()
+    session.write_pandas(draws_df, "BOOTSTRAP_DRAWS", schema="MMM", auto_create_table=True)
+    print(f"  ✓ Saved {len(draws_df)} rows ({draws['coef'].shape[0]} draws) to MMM.BOOTSTRAP_DRAWS")
+
+
+def save_bootstrap_draws_local(output_dir, draws, config):
+    """
+    Write bootstrap draws as BOOTSTRAP_DRAWS.npy (float32, 2 × draws × channels:
+    [coef, roi]) with a BOOTSTRAP_DRAWS.json header (model version, channel order).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stacked = np.stack([draws['coef'], draws['roi']]).astype(np.float32)
+    np.save(os.path.join(output_dir, BOOTSTRAP_DRAWS_FILE), stacked)
+    header = {
+        'model_version': config.model_version,
+        'channels': list(draws['channels']),
+        'layout': ['coef', 'roi'],
+        'n_draws': int(stacked.shape[1]),
+        'dtype': 'float32'
+    }
+    with open(os.path.join(output_dir, BOOTSTRAP_DRAWS_HEADER), 'w') as f:
+        json.dump(header, f, indent=2)
+    print(f"  ✓ Saved {stacked.shape[1]} bootstrap draws × {stacked.shape[2]} channels "
+          f"to {BOOTSTRAP_DRAWS_FILE} ({stacked.nbytes / 1024:,.0f} KB)")
+
+
+def load_bootstrap_draws(output_dir, mmap=True) -> dict:
+    """
+    Load draws written by save_bootstrap_draws_local().
+    
+    Parameters:
+    -----------
+    output_dir : str - Directory holding BOOTSTRAP_DRAWS.npy / .json
+    mmap : bool - Memory-map the array read-only (zero-copy) instead of reading it
+    
+    Returns:
+    --------
+    dict with model_version, channels and coef / roi arrays (draws × channels),
+    views into the mapped file when mmap=True
+    """
+    with open(os.path.join(output_dir, BOOTSTRAP_DRAWS_HEADER)) as f:
+        header = json.load(f)
+    stacked = np.load(os.path.join(output_dir, BOOTSTRAP_DRAWS_FILE), mmap_mode='r' if mmap else None)
+    return {
+        'model_version': header['model_version'],
+        'channels': header['channels'],
+        'coef': stacked[0],
+        'roi': stacked[1],
+    }
+
+
+def save_adstock_state(session, state, config):
+    """Overwrite MMM.ADSTOCK_STATE with the run's terminal adstock state (AdstockState.to_frame rows)."""
+    if state is None:
+        return
+    state_df = state.to_frame()
+    state_df.insert(0, 'MODEL_VERSION', config.model_version)
+    session.create_dataframe(state_df).write.mode("overwrite").save_as_table("MMM.ADSTOCK_STATE")
+    print(f"  ✓ Saved adstock state for {len(state_df)} channels to MMM.ADSTOCK_STATE "
+          f"(through {state_df['LAST_WEEK'].iloc[0]})")
+
+
+def save_adstock_state_local(output_dir, state, config):
+    """Write the terminal adstock state as ADSTOCK_STATE.csv (csv backend)."""
+    if state is None:
+        return
+    os.makedirs(output_dir, exist_ok=True)
+    state_df = state.to_frame()
+    state_df.insert(0, 'MODEL_VERSION', config.model_version)
+    state_df.to_csv(os.path.join(output_dir, "ADSTOCK_STATE.csv"), index=False)
+    print(f"  ✓ Saved adstock state for {len(state_df)} channels to ADSTOCK_STATE.csv "
+          f"(through {state_df['LAST_WEEK'].iloc[0]})")
+
+
+def load_adstock_state(config, session=None):
+    """
+    Saved terminal adstock state (None if there is none).
+    
+    Returns:
+    --------
+    (model_version, AdstockState) read from MMM.ADSTOCK_STATE (snowflake backend)
+    or ADSTOCK_STATE.csv in config.output_dir
+    """
+    try:
+        if config.data_backend == "snowflake":
+            state_df = session.table("MMM.ADSTOCK_STATE").to_pandas()
+        else:
+            state_df = pd.read_csv(os.path.join(config.output_dir, "ADSTOCK_STATE.csv"))
+    except Exception as e:
+        print(f"  No saved adstock state ({type(e).__name__})")
+        return None
+    if state_df.empty:
+        return None
+    return state_df['MODEL_VERSION'].iloc[0], AdstockState.from_frame(state_df, backend=config.adstock_backend)
+
+
+def append_transformed_features(session, features_df):
+    """Append new weeks to MMM.MMM_FEATURES_TRANSFORMED (incremental feature update)."""
+    if features_df is None or features_df.empty:
+        return
+    session.create_dataframe(features_df).write.mode("append").save_as_table("MMM.MMM_FEATURES_TRANSFORMED")
+    print(f"  ✓ Appended {len(features_df)} weeks to MMM.MMM_FEATURES_TRANSFORMED")
+
+
+def append_transformed_features_local(output_dir, features_df):
+    """Append new weeks to MMM_FEATURES_TRANSFORMED.csv (csv backend)."""
+    if features_df is None or features_df.empty:
+        return
+    path = os.path.join(output_dir, "MMM_FEATURES_TRANSFORMED.csv")
+    features_df.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+    print(f"  ✓ Appended {len(features_df)} weeks to MMM_FEATURES_TRANSFORMED.csv")
+
+
+def save_to_local(output_dir, model_results, response_curves, config, metrics, features_df=None,
+                  trial_ledger=None, bootstrap_draws=None, adstock_state=None):
+    """
+    Write the save_to_snowflake() / save_transformed_features() tables as CSVs (csv backend).
+    
+    Files are named after the Snowflake tables (MODEL_RESULTS.csv, ...) and
+    overwritten on every run, matching the overwrite mode of the Snowflake save.
+    OPTIMIZER_TRIALS.csv is appended, like MMM.OPTIMIZER_TRIALS.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    print(f"\nSaving results to {output_dir}...")
+    
+    results_for_db = model_results_for_db(model_results)
+    results_for_db.to_csv(os.path.join(output_dir, "MODEL_RESULTS.csv"), index=False)
+    print(f"  ✓ Saved {len(results_for_db)} rows to MODEL_RESULTS.csv")
+    
+    curves_clean = response_curves.copy()
+    curves_clean['MODEL_VERSION'] = config.model_version
+    curves_clean.to_csv(os.path.join(output_dir, "RESPONSE_CURVES.csv"), index=False)
+    print(f"  ✓ Saved {len(curves_clean)} rows to RESPONSE_CURVES.csv")
+    
+    model_metadata(model_results, config, metrics).to_csv(
+        os.path.join(output_dir, "MODEL_METADATA.csv"), index=False
+    )
+    print("  ✓ Saved model metadata to MODEL_METADATA.csv")
+    
+    if features_df is not None:
+        features_df.to_csv(os.path.join(output_dir, "MMM_FEATURES_TRANSFORMED.csv"), index=False)
+        print(f"  ✓ Saved {len(features_df)} rows to MMM_FEATURES_TRANSFORMED.csv")
+    
+    if trial_ledger is not None and not trial_ledger.empty:
+        path = os.path.join(output_dir, "OPTIMIZER_TRIALS.csv")
+        trial_ledger.to_csv(path, mode='a', header=not os.path.exists(path), index=False)
+        print(f"  ✓ Appended {len(trial_ledger)} rows to OPTIMIZER_TRIALS.csv")
+    
+    if bootstrap_draws is not None:
+        save_bootstrap_draws_local(output_dir, bootstrap_draws, config)
+    
+    if adstock_state is not None:
+        save_adstock_state_local(output_dir, adstock_state, config)
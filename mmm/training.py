@@ -0,0 +1,84 @@
+"""
+Final model fit and media coefficient extraction.
+"""
+from typing import Dict, List
+
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.preprocessing import StandardScaler
+
+from .transforms import apply_media_transformations
+from .validation import calculate_metrics
+
+
+def train_final_model(X_media, X_control, y, channels, params, cv_splits, config):
+    """
+    Train final model and compute both in-sample and cross-validation metrics.
+    
+    In-sample metrics show model fit; CV metrics show predictive accuracy.
+    Large gap between them indicates overfitting.
+    """
+    # Transform media with optimized hyperparameters
+    X_media_trans = apply_media_transformations(X_media, params, channels, backend=config.adstock_backend)
+    X_full = pd.concat([X_media_trans, X_control], axis=1)
+    
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X_full)
+    
+    # In-Sample Fit
+    model = Ridge(alpha=config.ridge_alpha)
+    model.fit(X_scaled, y)
+    y_pred_insample = model.predict(X_scaled)
+    insample_metrics = calculate_metrics(y.values, y_pred_insample)
+    
+    # Cross-Validation
+    cv_metrics_list = []
+    y_values = y.values
+    
+    for fold_idx, (train_idx, test_idx) in enumerate(cv_splits):
+        X_train, X_test = X_scaled[train_idx], X_scaled[test_idx]
+        y_train, y_test = y_values[train_idx], y_values[test_idx]
+        
+        cv_model = Ridge(alpha=config.ridge_alpha)
+        cv_model.fit(X_train, y_train)
+        y_pred = cv_model.predict(X_test)
+        
+        fold_metrics = calculate_metrics(y_test, y_pred)
+        fold_metrics['fold'] = fold_idx + 1
+        cv_metrics_list.append(fold_metrics)
+    
+    cv_metrics_df = pd.DataFrame(cv_metrics_list)
+    cv_metrics_avg = cv_metrics_df.drop('fold', axis=1).mean().to_dict()
+    cv_metrics_std = cv_metrics_df.drop('fold', axis=1).std().to_dict()
+    
+    metrics = {
+        'in_sample': insample_metrics,
+        'cv_mean': cv_metrics_avg,
+        'cv_std': cv_metrics_std
+    }
+    
+    return model, scaler, X_full, metrics
+
+
+def fit_media_coefficients(
+    X_media: pd.DataFrame,
+    X_control: pd.DataFrame,
+    y: pd.Series,
+    channels: List[str],
+    params: Dict[str, Dict[str, float]],
+    config
+) -> Dict[str, float]:
+    """
+    Re-fit the Ridge on transformed media + controls and return per-unit media coefficients.
+    
+    Coefficients are unscaled (divided by the StandardScaler std) so they multiply
+    the saturated [0, 1] channel value directly: revenue contribution = coef × hill(x).
+    Response curves and the budget optimizer both evaluate contributions this way.
+    """
+    X_media_trans = apply_media_transformations(X_media, params, channels, backend=config.adstock_backend)
+    X_full = pd.concat([X_media_trans, X_control], axis=1)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X_full)
+    model = Ridge(alpha=config.ridge_alpha)
+    model.fit(X_scaled, y)
+    return dict(zip(channels, model.coef_[:len(channels)] / scaler.scale_[:len(channels)]))
@@ -0,0 +1,305 @@
+"""
+Adstock and saturation transforms.
+
+Geometric adstock is a first-order IIR filter, y[t] = x[t] + θ·y[t-1], so the
+whole week × channel spend matrix is filtered in one call instead of a Python
+loop per channel per week. Backends (select with MMMConfig.adstock_backend):
+
+- "lfilter": scipy.signal.lfilter (compiled C filter, one call per channel)
+- "numpy":   2-D recurrence, one vectorized step per week across ALL channels
+- "numba":   JIT-compiled loop, registered only if numba is installed
+
+Custom backends can be added with register_adstock_backend(name, fn) where
+fn(X: (weeks, channels) array, thetas: (channels,) array) -> adstocked array.
+
+The recurrence only needs the previous adstocked week, so AdstockState keeps
+the terminal value per channel and θ and extend() filters appended weeks in
+O(new weeks): y[t] = filter(x)[t] + θ^(t+1)·state, on top of any backend.
+"""
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+
+def _adstock_lfilter(X: np.ndarray, thetas: np.ndarray) -> np.ndarray:
+    """IIR filter per channel via scipy.signal.lfilter (y[t] = x[t] + θ·y[t-1])."""
+    out = np.empty_like(X)
+    for j in range(X.shape[1]):
+        out[:, j] = lfilter([1.0], [1.0, -thetas[j]], X[:, j])
+    return out
+
+
+def _adstock_numpy(X: np.ndarray, thetas: np.ndarray) -> np.ndarray:
+    """2-D recurrence: each step updates every channel at once."""
+    out = np.empty_like(X)
+    if len(X) == 0:
+        return out
+    out[0] = X[0]
+    for t in range(1, len(X)):
+        out[t] = X[t] + thetas * out[t - 1]
+    return out
+
+
+ADSTOCK_BACKENDS = {
+    'lfilter': _adstock_lfilter,
+    'numpy': _adstock_numpy,
+}
+
+try:
+    import numba
+
+    @numba.njit(cache=True)
+    def _adstock_numba(X, thetas):
+        out = np.empty_like(X)
+        n_weeks, n_channels = X.shape
+        for j in range(n_channels):
+            carry = 0.0
+            for t in range(n_weeks):
+                carry = X[t, j] + thetas[j] * carry
+                out[t, j] = carry
+        return out
+
+    ADSTOCK_BACKENDS['numba'] = _adstock_numba
+except ImportError:
+    pass
+
+
+def register_adstock_backend(name: str, fn) -> None:
+    """Register a custom adstock backend: fn(X[weeks, channels], thetas[channels]) -> array."""
+    ADSTOCK_BACKENDS[name] = fn
+
+
+def batch_geometric_adstock(X: np.ndarray, thetas, backend: str = 'lfilter', initial_state=None) -> np.ndarray:
+    """
+    Geometric adstock for a whole spend matrix in one call.
+    
+    Parameters:
+    -----------
+    X : array (weeks × channels) - Raw weekly spend, one column per channel
+    thetas : float or array (channels,) - Decay rate per channel
+    backend : str - Key into ADSTOCK_BACKENDS
+    initial_state : float or array (channels,) - Adstocked value of the week before
+                    X[0] (carry-forward from earlier weeks); None starts from zero
+    
+    Returns:
+    --------
+    X_adstocked : array (weeks × channels) - Same result as geometric_adstock per column
+    """
+    if backend not in ADSTOCK_BACKENDS:
+        raise ValueError(f"Unknown adstock backend '{backend}'. Available: {sorted(ADSTOCK_BACKENDS)}")
+    X = np.asarray(X, dtype=float)
+    squeeze = X.ndim == 1
+    if squeeze:
+        X = X[:, None]
+    thetas = np.broadcast_to(np.asarray(thetas, dtype=float), (X.shape[1],))
+    out = ADSTOCK_BACKENDS[backend](np.ascontiguousarray(X), np.ascontiguousarray(thetas))
+    if initial_state is not None:
+        # The carried state decays like an impulse one week before X[0]
+        decay = thetas ** np.arange(1, len(X) + 1)[:, None]
+        out = out + decay * np.broadcast_to(np.asarray(initial_state, dtype=float), (X.shape[1],))
+    return out[:, 0] if squeeze else out
+
+
+def geometric_adstock(x: np.ndarray, theta: float, backend: str = 'lfilter', initial_state=None) -> np.ndarray:
+    """
+    Geometric Adstock Transformation (Carryover Effect).
+    
+    Models the "memory" of advertising: this week's effective spend includes
+    decayed contributions from all prior weeks. Equivalent to an infinite
+    geometric series: x_eff[t] = x[t] + θ*x[t-1] + θ²*x[t-2] + ...
+    
+    Formula: x_adstocked[t] = x[t] + theta * x_adstocked[t-1]
+    
+    Parameters:
+    -----------
+    x : array - Raw spend values (weekly)
+    theta : float - Decay rate (0 to 1). The "half-life" is ln(0.5)/ln(θ) weeks.
+                   - LinkedIn B2B: 0.7-0.9 (long consideration cycle)
+                   - Paid Search: 0.1-0.3 (immediate intent, fast decay)
+                   - Display: 0.4-0.6 (awareness, medium decay)
+    backend : str - Adstock backend (see ADSTOCK_BACKENDS)
+    initial_state : float - Adstocked value of the week before x[0] (None = start from zero)
+    
+    Returns:
+    --------
+    x_adstocked : array - Transformed values reflecting cumulative exposure
+    """
+    return batch_geometric_adstock(x, theta, backend=backend, initial_state=initial_state)
+
+
+class AdstockState:
+    """
+    Terminal adstock value per channel and θ, for appending weeks without refiltering history.
+    
+        state = AdstockState.from_history(X_media, thetas, channels, last_week=...)
+        new_adstocked = state.extend(X_new_weeks)            # O(new weeks), advances the state
+        forecast = state.extend(X_plan, advance=False)       # scenario, state unchanged
+    
+    to_frame() / from_frame() persist it (one row per channel: CHANNEL, THETA,
+    STATE, N_WEEKS, LAST_WEEK), see storage.save_adstock_state.
+    """
+    
+    def __init__(self, channels: Sequence[str], thetas, state=None, n_weeks: int = 0,
+                 last_week=None, backend: str = 'lfilter'):
+        self.channels = list(channels)
+        self.thetas = np.broadcast_to(np.asarray(thetas, dtype=float), (len(self.channels),)).copy()
+        self.state = np.zeros(len(self.channels)) if state is None else np.asarray(state, dtype=float).copy()
+        self.n_weeks = n_weeks
+        self.last_week = None if last_week is None else pd.Timestamp(last_week)
+        self.backend = backend
+    
+    @classmethod
+    def from_history(cls, X, thetas, channels: Sequence[str], last_week=None,
+                     backend: str = 'lfilter') -> "AdstockState":
+        """State after filtering a full spend history (X: weeks × channels, DataFrame or array)."""
+        state = cls(channels, thetas, backend=backend)
+        state.extend(X, last_week=last_week)
+        return state
+    
+    def extend(self, new_weeks, last_week=None, advance: bool = True) -> np.ndarray:
+        """
+        Adstock appended weeks, continuing from the stored state.
+        
+        Parameters:
+        -----------
+        new_weeks : DataFrame or array (new weeks × channels) - Raw spend; DataFrame
+                    columns are matched to self.channels (missing channels = 0 spend)
+        last_week : Week of the last new row (defaults to the DataFrame's last index
+                    value when it is a date)
+        advance : bool - Move the state past these weeks (False for forecast scenarios)
+        
+        Returns:
+        --------
+        X_adstocked : array (new weeks × channels) - Identical to adstocking the full
+                      history and keeping the last rows
+        """
+        if isinstance(new_weeks, pd.DataFrame):
+            if last_week is None and len(new_weeks) and isinstance(new_weeks.index, pd.DatetimeIndex):
+                last_week = new_weeks.index[-1]
+            new_weeks = new_weeks.reindex(columns=self.channels, fill_value=0.0).to_numpy(dtype=float)
+        X = np.asarray(new_weeks, dtype=float).reshape(-1, len(self.channels))
+        out = batch_geometric_adstock(X, self.thetas, backend=self.backend, initial_state=self.state)
+        if advance and len(X):
+            self.state = out[-1].copy()
+            self.n_weeks += len(X)
+            if last_week is not None:
+                self.last_week = pd.Timestamp(last_week)
+        return out
+    
+    def to_frame(self) -> pd.DataFrame:
+        """One row per channel with its θ and terminal adstocked value."""
+        return pd.DataFrame({
+            'CHANNEL': self.channels,
+            'THETA': self.thetas,
+            'STATE': self.state,
+            'N_WEEKS': self.n_weeks,
+            'LAST_WEEK': self.last_week.strftime('%Y-%m-%d') if self.last_week is not None else None
+        })
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, backend: str = 'lfilter') -> "AdstockState":
+        """Rebuild a state saved with to_frame()."""
+        df = df.rename(columns=str.upper)
+        last_week = df['LAST_WEEK'].iloc[0] if len(df) else None
+        return cls(
+            df['CHANNEL'].tolist(), df['THETA'].to_numpy(dtype=float), df['STATE'].to_numpy(dtype=float),
+            n_weeks=int(df['N_WEEKS'].iloc[0]) if len(df) else 0,
+            last_week=last_week if pd.notna(last_week) and str(last_week) else None,
+            backend=backend
+        )
+    
+    def matches(self, params: Dict[str, Dict[str, float]], tol: float = 1e-9) -> bool:
+        """True if params have the same channels and θ this state was filtered with."""
+        return (set(self.channels) == set(params)
+                and all(abs(params[ch]['theta'] - t) <= tol for ch, t in zip(self.channels, self.thetas)))
+
+
+def hill_saturation(x: np.ndarray, alpha, gamma) -> np.ndarray:
+    """
+    Hill Function for Saturation (Diminishing Returns).
+    
+    Maps spend to a 0-1 scale representing "response intensity". At gamma spend,
+    response is exactly 0.5 (50% of maximum possible). This is the "half-EC50"
+    concept from pharmacology applied to marketing.
+    
+    Formula: x^α / (x^α + γ^α)
+    
+    Parameters:
+    -----------
+    x : array - Adstocked spend values (apply adstock FIRST, then saturation)
+    alpha : float or array - Shape/slope parameter (typically 0.5 to 3.0)
+                   - alpha < 1: Concave from origin (quick saturation)
+                   - alpha = 1: Standard hyperbolic
+                   - alpha > 1: S-curve with inflection point (slow start, then steep)
+    gamma : float or array - Half-saturation point. Spend level where response = 50% of max.
+                   Typically set relative to observed spend range (e.g., median spend).
+    
+    Arrays of alpha/gamma broadcast against the last axis of x, so a
+    (weeks × channels) matrix can be saturated with per-channel parameters.
+    
+    Returns:
+    --------
+    x_saturated : array - Values in [0, 1] representing response intensity
+    
+    Note: Final revenue contribution = coefficient × saturated_value
+    """
+    x = np.asarray(x, dtype=float)
+    x = np.maximum(x, 0)  # No negative spend
+    gamma = np.maximum(gamma, 1e-10)  # Avoid division by zero
+    
+    # Hill function: asymptotes to 1 as x → ∞
+    x_alpha = x ** alpha
+    x_saturated = x_alpha / (x_alpha + gamma ** alpha)
+    return x_saturated
+
+
+def hill_derivative(x: np.ndarray, alpha, gamma) -> np.ndarray:
+    """
+    Derivative of hill_saturation with respect to x.
+    
+    f'(x) = α·γ^α·x^(α-1) / (x^α + γ^α)², evaluated in the stable form
+    f'(x) = α·f(x)·(1 - f(x)) / x for x > 0. At x = 0 the limit is
+    +inf for α < 1, 1/γ for α = 1 and 0 for α > 1.
+    
+    Broadcasts like hill_saturation (per-channel alpha/gamma on the last axis).
+    """
+    x = np.maximum(np.asarray(x, dtype=float), 0)
+    alpha = np.asarray(alpha, dtype=float)
+    gamma = np.maximum(gamma, 1e-10)
+    f = hill_saturation(x, alpha, gamma)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = alpha * f * (1 - f) / x
+    at_zero = np.where(alpha < 1, np.inf, np.where(alpha == 1, 1 / gamma, 0.0))
+    return np.where(x > 0, slope, at_zero)
+
+
+def apply_media_transformations(
+    X: pd.DataFrame, 
+    params: Dict[str, Dict[str, float]], 
+    channels: List[str],
+    backend: str = 'lfilter'
+) -> pd.DataFrame:
+    """
+    Apply adstock and saturation transformations to all media channels.
+    
+    All modeled channels are adstocked in a single batch_geometric_adstock call
+    and saturated with per-channel (alpha, gamma) broadcasting.
+    """
+    X_transformed = X.copy()
+    cols = [ch for ch in channels if ch in X.columns and ch in params]
+    if not cols:
+        return X_transformed
+    
+    thetas = np.array([params[ch]['theta'] for ch in cols])
+    alphas = np.array([params[ch]['alpha'] for ch in cols])
+    gammas = np.array([params[ch]['gamma'] for ch in cols])
+    
+    # Step 1: Adstock (carryover) for the whole week × channel matrix
+    x_adstocked = batch_geometric_adstock(X[cols].to_numpy(dtype=float), thetas, backend=backend)
+    
+    # Step 2: Saturation (diminishing returns)
+    X_transformed[cols] = hill_saturation(x_adstocked, alphas, gammas)
+    
+    return X_transformed
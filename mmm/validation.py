@@ -0,0 +1,58 @@
+"""
+Time-series cross-validation splits and regression metrics.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+
+
+def time_series_cv_split(
+    n_samples: int,
+    train_size: int,
+    test_size: int,
+    step_size: int
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Generate time-series cross-validation splits (rolling window).
+    
+    Unlike k-fold, this NEVER lets the model see future data during training.
+    Each fold trains on [t, t+train_size) and tests on [t+train_size, t+train_size+test_size).
+    
+    With train=52, test=13, step=13:
+    - ~4 folds per 2 years of data
+    - Each fold predicts a full quarter ahead
+    - Realistic for "next quarter budget planning" use case
+    """
+    splits = []
+    start = 0
+    while start + train_size + test_size <= n_samples:
+        train_idx = np.arange(start, start + train_size)
+        test_idx = np.arange(start + train_size, start + train_size + test_size)
+        splits.append((train_idx, test_idx))
+        start += step_size
+    return splits
+
+
+def calculate_metrics(y_true: np.ndarray, y_pred: np.ndarray) -> Dict[str, float]:
+    """
+    Calculate regression metrics for model evaluation.
+    
+    Returns dict with:
+    - R²: Proportion of variance explained (1.0 = perfect, can be negative if worse than mean)
+    - RMSE: Root Mean Squared Error in dollars (same units as y)
+    - MAE: Mean Absolute Error in dollars (less sensitive to outliers than RMSE)
+    - MAPE: Mean Absolute Percentage Error (the "headline" metric for MMM)
+    - NRMSE: Normalized RMSE as % of mean (allows comparison across scales)
+    """
+    y_true = np.asarray(y_true)
+    y_pred = np.asarray(y_pred)
+    mask = y_true != 0  # Avoid division by zero in MAPE
+    
+    return {
+        'R2': r2_score(y_true, y_pred),
+        'RMSE': np.sqrt(mean_squared_error(y_true, y_pred)),
+        'MAE': mean_absolute_error(y_true, y_pred),
+        'MAPE': np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100 if mask.sum() > 0 else np.nan,
+        'NRMSE': np.sqrt(mean_squared_error(y_true, y_pred)) / y_true.mean() * 100
+    }
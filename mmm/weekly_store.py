@@ -0,0 +1,372 @@
+"""
+Local materialized weekly input (stand-in for sql/06_weekly_input_table.sql).
+
+build_weekly_input() recomputes the whole V_MMM_INPUT_WEEKLY aggregation from
+the raw extracts on every run. WeeklyInputStore keeps the ATOMIC tables and the
+materialized MMM_INPUT_WEEKLY table in one SQLite file and refreshes only the
+weeks whose source rows changed, like the Snowflake stream + task pipeline:
+
+    with WeeklyInputStore("output/mmm_input.sqlite") as store:
+        store.load_extracts("data/synthetic")   # upsert new / changed extract rows
+        store.refresh()                         # recompute the dirty weeks only
+        df = store.read()                       # plain scan, view column names
+
+Triggers on the ATOMIC tables play the role of the streams: every insert,
+update or delete records the affected weeks in MMM_INPUT_DIRTY_WEEKS. Unlike
+the Snowflake pipeline, campaign and opportunity changes are tracked too
+(their spend / revenue weeks are marked dirty), so no full refresh is needed
+after re-attribution.
+"""
+import os
+import sqlite3
+from typing import Dict
+
+import pandas as pd
+
+from .data import CHANNEL_TYPES, WEEKLY_INPUT_COLUMNS
+
+
+# DATE_TRUNC('WEEK', d): Monday on or before d
+def _week(column: str) -> str:
+    return f"date({column}, '-6 days', 'weekday 1')"
+
+
+_CHANNEL_TYPE_SQL = "CASE " + " ".join(
+    f"WHEN c.CHANNEL = '{channel}' THEN '{channel_type}'" for channel, channel_type in CHANNEL_TYPES.items()
+) + " ELSE 'OTHER' END"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS MARKETING_CAMPAIGN_FLAT (
+    CAMPAIGN_ID TEXT PRIMARY KEY,
+    REGION TEXT,
+    CHANNEL TEXT,
+    CAMPAIGN_TYPE TEXT
+);
+CREATE TABLE IF NOT EXISTS MEDIA_SPEND_DAILY (
+    SPEND_DATE TEXT,
+    CAMPAIGN_ID TEXT,
+    SPEND_AMOUNT REAL,
+    IMPRESSIONS INTEGER,
+    CLICKS INTEGER,
+    VIDEO_VIEWS INTEGER,
+    PRIMARY KEY (SPEND_DATE, CAMPAIGN_ID)
+);
+CREATE INDEX IF NOT EXISTS MEDIA_SPEND_DAILY_CAMPAIGN ON MEDIA_SPEND_DAILY (CAMPAIGN_ID);
+CREATE TABLE IF NOT EXISTS OPPORTUNITY (
+    OPPORTUNITY_ID TEXT PRIMARY KEY,
+    CAMPAIGN_ID TEXT
+);
+CREATE TABLE IF NOT EXISTS ACTUAL_FINANCIAL_RESULT (
+    INVOICE_ID TEXT PRIMARY KEY,
+    OPPORTUNITY_ID TEXT,
+    REVENUE_AMOUNT REAL,
+    POSTING_DATE TEXT
+);
+CREATE INDEX IF NOT EXISTS ACTUAL_FINANCIAL_RESULT_DATE ON ACTUAL_FINANCIAL_RESULT (POSTING_DATE);
+CREATE INDEX IF NOT EXISTS ACTUAL_FINANCIAL_RESULT_OPP ON ACTUAL_FINANCIAL_RESULT (OPPORTUNITY_ID);
+CREATE TABLE IF NOT EXISTS MARKET_SIGNAL (
+    SIGNAL_DATE TEXT,
+    SIGNAL_TYPE TEXT,
+    SIGNAL_VALUE REAL,
+    REGION TEXT,
+    PRIMARY KEY (SIGNAL_DATE, SIGNAL_TYPE, REGION)
+);
+CREATE TABLE IF NOT EXISTS MMM_INPUT_WEEKLY (
+    WEEK_START TEXT,
+    SUPER_REGION_NAME TEXT,
+    REGION_NAME TEXT,
+    COUNTRY_NAME TEXT,
+    SEGMENT_NAME TEXT,
+    DIVISION_NAME TEXT,
+    CATEGORY_NAME TEXT,
+    CHANNEL_CODE TEXT,
+    CHANNEL_TYPE TEXT,
+    CAMPAIGN_OBJECTIVE TEXT,
+    SPEND REAL,
+    IMPRESSIONS INTEGER,
+    CLICKS INTEGER,
+    VIDEO_VIEWS INTEGER,
+    ENGAGEMENTS INTEGER,
+    REVENUE REAL,
+    AVG_PMI REAL,
+    AVG_COMPETITOR_SOV REAL,
+    AVG_INDUSTRY_GROWTH REAL
+);
+CREATE INDEX IF NOT EXISTS MMM_INPUT_WEEKLY_WEEK ON MMM_INPUT_WEEKLY (WEEK_START);
+CREATE TABLE IF NOT EXISTS MMM_INPUT_DIRTY_WEEKS (
+    WEEK_START TEXT
+);
+CREATE INDEX IF NOT EXISTS MMM_INPUT_DIRTY_WEEKS_WEEK ON MMM_INPUT_DIRTY_WEEKS (WEEK_START);
+"""
+
+# Change tracking (the streams): (table, date column) → weeks touched by each row
+_FACT_TABLES = {
+    'MEDIA_SPEND_DAILY': 'SPEND_DATE',
+    'ACTUAL_FINANCIAL_RESULT': 'POSTING_DATE',
+    'MARKET_SIGNAL': 'SIGNAL_DATE',
+}
+
+# Re-attribution: weeks whose spend / revenue rows go through a changed campaign or opportunity
+_CAMPAIGN_WEEKS = f"""
+    SELECT {_week('SPEND_DATE')} AS WEEK_START FROM MEDIA_SPEND_DAILY WHERE CAMPAIGN_ID = OLD_OR_NEW.CAMPAIGN_ID
+    UNION
+    SELECT {_week('r.POSTING_DATE')} FROM ACTUAL_FINANCIAL_RESULT r
+    JOIN OPPORTUNITY o ON r.OPPORTUNITY_ID = o.OPPORTUNITY_ID
+    WHERE o.CAMPAIGN_ID = OLD_OR_NEW.CAMPAIGN_ID
+"""
+_OPPORTUNITY_WEEKS = f"""
+    SELECT {_week('POSTING_DATE')} AS WEEK_START FROM ACTUAL_FINANCIAL_RESULT WHERE OPPORTUNITY_ID = OLD_OR_NEW.OPPORTUNITY_ID
+"""
+
+
+def _mark_dirty(weeks: str) -> str:
+    # Not INSERT OR IGNORE: the upsert's conflict policy would override it inside the trigger
+    return (
+        f"INSERT INTO MMM_INPUT_DIRTY_WEEKS SELECT DISTINCT WEEK_START FROM ({weeks}) "
+        "WHERE WEEK_START NOT IN (SELECT WEEK_START FROM MMM_INPUT_DIRTY_WEEKS); "
+    )
+
+
+def _triggers() -> str:
+    weeks_by_table = {
+        table: f"SELECT {_week(f'OLD_OR_NEW.{date_col}')} AS WEEK_START"
+        for table, date_col in _FACT_TABLES.items()
+    }
+    weeks_by_table['MARKETING_CAMPAIGN_FLAT'] = _CAMPAIGN_WEEKS
+    weeks_by_table['OPPORTUNITY'] = _OPPORTUNITY_WEEKS
+    
+    statements = []
+    for table, weeks in weeks_by_table.items():
+        for event, rows in (('INSERT', ['NEW']), ('UPDATE', ['OLD', 'NEW']), ('DELETE', ['OLD'])):
+            body = "".join(_mark_dirty(weeks.replace('OLD_OR_NEW', row)) for row in rows)
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_{event} AFTER {event} ON {table} BEGIN {body}END;"
+            )
+    return "\n".join(statements)
+
+
+# V_MMM_INPUT_WEEKLY restricted to the dirty weeks (sql/06_weekly_input_table.sql,
+# MMM_INPUT_WEEKLY_BETWEEN). SQLite before 3.39 has no FULL OUTER JOIN, so it is
+# spend LEFT JOIN revenue plus the revenue rows without spend.
+_REFRESH_SQL = f"""
+WITH DIRTY AS (
+    SELECT WEEK_START FROM MMM_INPUT_DIRTY_WEEKS
+),
+BOUNDS AS (
+    SELECT MIN(WEEK_START) AS FROM_WEEK, date(MAX(WEEK_START), '+7 days') AS TO_DATE FROM DIRTY
+),
+WEEKLY_SPEND AS (
+    SELECT
+        {_week('s.SPEND_DATE')} AS WEEK_START,
+        c.REGION AS REGION_NAME,
+        c.CHANNEL AS CHANNEL_CODE,
+        {_CHANNEL_TYPE_SQL} AS CHANNEL_TYPE,
+        c.CAMPAIGN_TYPE AS CAMPAIGN_OBJECTIVE,
+        SUM(s.SPEND_AMOUNT) AS TOTAL_SPEND,
+        SUM(s.IMPRESSIONS) AS TOTAL_IMPRESSIONS,
+        SUM(s.CLICKS) AS TOTAL_CLICKS,
+        SUM(s.VIDEO_VIEWS) AS TOTAL_VIDEO_VIEWS
+    FROM MEDIA_SPEND_DAILY s
+    LEFT JOIN MARKETING_CAMPAIGN_FLAT c ON s.CAMPAIGN_ID = c.CAMPAIGN_ID
+    WHERE s.SPEND_DATE >= (SELECT FROM_WEEK FROM BOUNDS) AND s.SPEND_DATE < (SELECT TO_DATE FROM BOUNDS)
+    GROUP BY 1, 2, 3, 4, 5
+),
+WEEKLY_REVENUE_BY_CHANNEL AS (
+    SELECT
+        {_week('r.POSTING_DATE')} AS WEEK_START,
+        c.REGION AS REGION_NAME,
+        c.CHANNEL AS CHANNEL_CODE,
+        SUM(r.REVENUE_AMOUNT) AS TOTAL_REVENUE
+    FROM ACTUAL_FINANCIAL_RESULT r
+    JOIN OPPORTUNITY o ON r.OPPORTUNITY_ID = o.OPPORTUNITY_ID
+    JOIN MARKETING_CAMPAIGN_FLAT c ON o.CAMPAIGN_ID = c.CAMPAIGN_ID
+    WHERE r.POSTING_DATE >= (SELECT FROM_WEEK FROM BOUNDS) AND r.POSTING_DATE < (SELECT TO_DATE FROM BOUNDS)
+    GROUP BY 1, 2, 3
+),
+WEEKLY_INDICATORS AS (
+    SELECT
+        {_week('SIGNAL_DATE')} AS WEEK_START,
+        REGION AS REGION_NAME,
+        AVG(CASE WHEN SIGNAL_TYPE = 'PMI' THEN SIGNAL_VALUE END) AS AVG_PMI,
+        AVG(CASE WHEN SIGNAL_TYPE = 'SOV' THEN SIGNAL_VALUE END) AS AVG_COMPETITOR_SOV
+    FROM MARKET_SIGNAL
+    WHERE SIGNAL_DATE >= (SELECT FROM_WEEK FROM BOUNDS) AND SIGNAL_DATE < (SELECT TO_DATE FROM BOUNDS)
+    GROUP BY 1, 2
+),
+JOINED AS (
+    SELECT
+        s.WEEK_START, s.REGION_NAME, s.CHANNEL_CODE, s.CHANNEL_TYPE, s.CAMPAIGN_OBJECTIVE,
+        s.TOTAL_SPEND, s.TOTAL_IMPRESSIONS, s.TOTAL_CLICKS, s.TOTAL_VIDEO_VIEWS, r.TOTAL_REVENUE
+    FROM WEEKLY_SPEND s
+    LEFT JOIN WEEKLY_REVENUE_BY_CHANNEL r
+        ON s.WEEK_START = r.WEEK_START
+        AND s.REGION_NAME = r.REGION_NAME
+        AND s.CHANNEL_CODE = r.CHANNEL_CODE
+    UNION ALL
+    SELECT
+        r.WEEK_START, r.REGION_NAME, r.CHANNEL_CODE, NULL, NULL,
+        NULL, NULL, NULL, NULL, r.TOTAL_REVENUE
+    FROM WEEKLY_REVENUE_BY_CHANNEL r
+    WHERE NOT EXISTS (
+        SELECT 1 FROM WEEKLY_SPEND s
+        WHERE s.WEEK_START = r.WEEK_START
+        AND s.REGION_NAME = r.REGION_NAME
+        AND s.CHANNEL_CODE = r.CHANNEL_CODE
+    )
+)
+INSERT INTO MMM_INPUT_WEEKLY
+SELECT
+    j.WEEK_START,
+    j.REGION_NAME AS SUPER_REGION_NAME,
+    j.REGION_NAME,
+    NULL AS COUNTRY_NAME,
+    NULL AS SEGMENT_NAME,
+    NULL AS DIVISION_NAME,
+    NULL AS CATEGORY_NAME,
+    j.CHANNEL_CODE,
+    j.CHANNEL_TYPE,
+    j.CAMPAIGN_OBJECTIVE,
+    COALESCE(j.TOTAL_SPEND, 0) AS SPEND,
+    COALESCE(j.TOTAL_IMPRESSIONS, 0) AS IMPRESSIONS,
+    COALESCE(j.TOTAL_CLICKS, 0) AS CLICKS,
+    COALESCE(j.TOTAL_VIDEO_VIEWS, 0) AS VIDEO_VIEWS,
+    0 AS ENGAGEMENTS,
+    COALESCE(j.TOTAL_REVENUE, 0) AS REVENUE,
+    i.AVG_PMI,
+    i.AVG_COMPETITOR_SOV,
+    0 AS AVG_INDUSTRY_GROWTH
+FROM JOINED j
+LEFT JOIN WEEKLY_INDICATORS i
+    ON j.WEEK_START = i.WEEK_START
+    AND j.REGION_NAME = i.REGION_NAME
+WHERE j.WEEK_START IN (SELECT WEEK_START FROM DIRTY)
+"""
+
+
+def _upsert_sql(table: str, columns: list, key: list) -> str:
+    """INSERT ... ON CONFLICT DO UPDATE that only touches rows whose values changed."""
+    values = [c for c in columns if c not in key]
+    changed = " OR ".join(f"{c} IS NOT excluded.{c}" for c in values)
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+        f"ON CONFLICT ({', '.join(key)}) DO UPDATE SET "
+        f"{', '.join(f'{c} = excluded.{c}' for c in values)} WHERE {changed}"
+    )
+
+
+class WeeklyInputStore:
+    """
+    SQLite file holding the ATOMIC extracts and the materialized weekly input.
+
+    Parameters:
+    -----------
+    path : SQLite file (created on first use; ":memory:" for a throwaway store)
+    """
+
+    def __init__(self, path: str):
+        if path != ":memory:" and os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(_SCHEMA + _triggers())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def load_extracts(self, data_dir: str) -> Dict[str, int]:
+        """
+        Upsert the raw synthetic CSV extracts into the ATOMIC tables.
+
+        Column mapping follows sql/03_load_data.sql (macro indicators are
+        unpivoted into PMI / SOV market signals). Rows already loaded with the
+        same values are left untouched, so re-running on a grown extract only
+        marks the new or revised weeks dirty.
+
+        Returns:
+        --------
+        Dict of rows inserted or changed per table
+        """
+        # "NA" is North America, not a missing value
+        campaigns = pd.read_csv(os.path.join(data_dir, 'campaign_metadata.csv'), keep_default_na=False)
+        spend = pd.read_csv(os.path.join(data_dir, 'sprinklr_spend.csv'))
+        opps = pd.read_csv(os.path.join(data_dir, 'salesforce_opps.csv'))
+        revenue = pd.read_csv(os.path.join(data_dir, 'sap_revenue.csv'))
+        macro = pd.read_csv(os.path.join(data_dir, 'macro_indicators.csv'), keep_default_na=False)
+
+        signals = pd.concat([
+            macro.assign(SIGNAL_TYPE='PMI', SIGNAL_VALUE=macro['PMI_INDEX']),
+            macro.assign(SIGNAL_TYPE='SOV', SIGNAL_VALUE=macro['COMPETITOR_SOV']),
+        ])
+
+        # Dimensions first so new fact rows join on insert
+        tables = [
+            ('MARKETING_CAMPAIGN_FLAT', ['CAMPAIGN_ID'],
+             campaigns[['CAMPAIGN_ID', 'REGION', 'CHANNEL', 'TYPE']],
+             ['CAMPAIGN_ID', 'REGION', 'CHANNEL', 'CAMPAIGN_TYPE']),
+            ('OPPORTUNITY', ['OPPORTUNITY_ID'],
+             opps[['OPPORTUNITY_ID', 'LEAD_SOURCE_CAMPAIGN']],
+             ['OPPORTUNITY_ID', 'CAMPAIGN_ID']),
+            ('MEDIA_SPEND_DAILY', ['SPEND_DATE', 'CAMPAIGN_ID'],
+             spend[['DATE', 'CAMPAIGN_ID', 'SPEND_AMT', 'IMPRESSIONS', 'CLICKS', 'VIDEO_VIEWS_50']],
+             ['SPEND_DATE', 'CAMPAIGN_ID', 'SPEND_AMOUNT', 'IMPRESSIONS', 'CLICKS', 'VIDEO_VIEWS']),
+            ('ACTUAL_FINANCIAL_RESULT', ['INVOICE_ID'],
+             revenue[['INVOICE_ID', 'OPPORTUNITY_ID', 'BOOKED_REVENUE', 'POSTING_DATE']],
+             ['INVOICE_ID', 'OPPORTUNITY_ID', 'REVENUE_AMOUNT', 'POSTING_DATE']),
+            ('MARKET_SIGNAL', ['SIGNAL_DATE', 'SIGNAL_TYPE', 'REGION'],
+             signals[['DATE', 'SIGNAL_TYPE', 'SIGNAL_VALUE', 'REGION']],
+             ['SIGNAL_DATE', 'SIGNAL_TYPE', 'SIGNAL_VALUE', 'REGION']),
+        ]
+
+        changed = {}
+        with self.conn:
+            for table, key, frame, columns in tables:
+                frame = frame.astype(object).where(frame.notna(), None)
+                cursor = self.conn.executemany(_upsert_sql(table, columns, key), frame.itertuples(index=False, name=None))
+                changed[table] = cursor.rowcount
+
+        print(f"  ✓ Loaded extracts from {data_dir}: " +
+              ", ".join(f"{table} {n:,}" for table, n in changed.items()))
+        return changed
+
+    def refresh(self, full: bool = False) -> int:
+        """
+        Recompute MMM_INPUT_WEEKLY for the weeks marked dirty since the last refresh.
+
+        Parameters:
+        -----------
+        full : Mark every week dirty first (rebuild the whole table)
+
+        Returns:
+        --------
+        Number of weeks recomputed
+        """
+        with self.conn:
+            if full:
+                self.conn.execute(_mark_dirty(
+                    " UNION ".join(f"SELECT {_week(col)} AS WEEK_START FROM {table}" for table, col in _FACT_TABLES.items())
+                    + " UNION SELECT WEEK_START FROM MMM_INPUT_WEEKLY"
+                ))
+            n_weeks = self.conn.execute("SELECT COUNT(DISTINCT WEEK_START) FROM MMM_INPUT_DIRTY_WEEKS").fetchone()[0]
+            if n_weeks:
+                self.conn.execute(
+                    "DELETE FROM MMM_INPUT_WEEKLY WHERE WEEK_START IN (SELECT WEEK_START FROM MMM_INPUT_DIRTY_WEEKS)"
+                )
+                self.conn.execute(_REFRESH_SQL)
+                self.conn.execute("DELETE FROM MMM_INPUT_DIRTY_WEEKS")
+
+        print(f"  ✓ Refreshed {n_weeks} weeks of MMM_INPUT_WEEKLY")
+        return n_weeks
+
+    def read(self) -> pd.DataFrame:
+        """Scan MMM_INPUT_WEEKLY with V_MMM_INPUT_WEEKLY column names, ordered by week."""
+        df = pd.read_sql_query(
+            f"SELECT {', '.join(WEEKLY_INPUT_COLUMNS)} FROM MMM_INPUT_WEEKLY ORDER BY WEEK_START", self.conn
+        )
+        df['WEEK_START'] = pd.to_datetime(df['WEEK_START'])
+        return df
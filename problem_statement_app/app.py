@@ -20,37 +20,46 @@ st.set_page_config(
 def get_session():
     return get_active_session()
 
-@st.cache_data(ttl=600)
-def load_weekly_data():
-    session = get_session()
-    df = session.sql("""
-        SELECT 
-            WEEK_START,
-            CHANNEL_CODE AS CHANNEL,
-            SUM(SPEND) AS WEEKLY_SPEND,
-            SUM(REVENUE) AS WEEKLY_REVENUE
-        FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY
-        WHERE CHANNEL_CODE IS NOT NULL
-        GROUP BY WEEK_START, CHANNEL_CODE
-        ORDER BY WEEK_START, CHANNEL_CODE
-    """).to_pandas()
-    return df
+# Weekly grains summed in Snowflake; each chart declares the grain it reads so
+# only SPEND/REVENUE at that grain is transferred (never the full view)
+GRAINS = {
+    "week": ("WEEK_START",),
+    "week_channel": ("WEEK_START", "CHANNEL_CODE"),
+    "week_region": ("WEEK_START", "REGION_NAME"),
+}
+
+CHART_GRAINS = {
+    "naive_correlation": "week",
+    "feature_engineering_gain": "week",
+    "data_inventory_channels": "week_channel",
+    "data_inventory_regions": "week_region",
+    "segment_filters_channels": "week_channel",
+    "segment_filters_regions": "week_region",
+    "transform_by_channel": "week_channel",
+}
 
 @st.cache_data(ttl=600)
-def load_total_weekly():
+def load_grain(grain):
+    keys = ", ".join(GRAINS[grain])
     session = get_session()
-    df = session.sql("""
-        SELECT 
-            WEEK_START,
-            SUM(SPEND) AS TOTAL_SPEND,
-            SUM(REVENUE) AS REVENUE
+    df = session.sql(f"""
+        SELECT {keys}, SUM(SPEND) AS SPEND, SUM(REVENUE) AS REVENUE
         FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY
-        GROUP BY WEEK_START
-        HAVING SUM(SPEND) > 0 OR SUM(REVENUE) > 0
-        ORDER BY WEEK_START
+        GROUP BY {keys}
+        ORDER BY {keys}
     """).to_pandas()
     return df
 
+def load_chart_data(chart):
+    return load_grain(CHART_GRAINS[chart])
+
+def load_total_weekly(chart):
+    df = load_chart_data(chart).rename(columns={"SPEND": "TOTAL_SPEND"})
+    return df[(df['TOTAL_SPEND'] > 0) | (df['REVENUE'] > 0)]
+
+def distinct_values(chart, column):
+    return sorted(load_chart_data(chart)[column].dropna().unique().tolist())
+
 st.title("🎯 The Marketing Attribution Problem")
 
 st.markdown("""
@@ -79,7 +88,7 @@ with tab1:
     """)
     
     try:
-        df_total = load_total_weekly()
+        df_total = load_total_weekly("naive_correlation")
         
         correlation = df_total['TOTAL_SPEND'].corr(df_total['REVENUE'])
         
@@ -339,28 +348,17 @@ with tab4:
         st.markdown("### 📊 Your Real Data")
         
         try:
-            session = get_session()
-            
-            channels_df = session.sql("""
-                SELECT DISTINCT CHANNEL_CODE 
-                FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY 
-                WHERE CHANNEL_CODE IS NOT NULL
-            """).to_pandas()
+            channel_codes = distinct_values("data_inventory_channels", "CHANNEL_CODE")
+            region_names = distinct_values("data_inventory_regions", "REGION_NAME")
             
-            regions_df = session.sql("""
-                SELECT DISTINCT REGION_NAME 
-                FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY 
-                WHERE REGION_NAME IS NOT NULL
-            """).to_pandas()
-            
-            n_channels = len(channels_df)
-            n_regions = len(regions_df)
+            n_channels = len(channel_codes)
+            n_regions = len(region_names)
             
             st.metric("Channels", n_channels)
-            st.caption(", ".join(channels_df['CHANNEL_CODE'].tolist()))
+            st.caption(", ".join(channel_codes))
             
             st.metric("Regions", n_regions)
-            st.caption(", ".join(regions_df['REGION_NAME'].tolist()[:5]) + ("..." if n_regions > 5 else ""))
+            st.caption(", ".join(region_names[:5]) + ("..." if n_regions > 5 else ""))
             
         except:
             n_channels = 4
@@ -479,19 +477,8 @@ with tab4:
         try:
             session = get_session()
             
-            all_channels = session.sql("""
-                SELECT DISTINCT CHANNEL_CODE 
-                FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY 
-                WHERE CHANNEL_CODE IS NOT NULL
-                ORDER BY CHANNEL_CODE
-            """).to_pandas()['CHANNEL_CODE'].tolist()
-            
-            all_regions = session.sql("""
-                SELECT DISTINCT REGION_NAME 
-                FROM DIMENSIONAL.V_MMM_INPUT_WEEKLY 
-                WHERE REGION_NAME IS NOT NULL
-                ORDER BY REGION_NAME
-            """).to_pandas()['REGION_NAME'].tolist()
+            all_channels = distinct_values("segment_filters_channels", "CHANNEL_CODE")
+            all_regions = distinct_values("segment_filters_regions", "REGION_NAME")
             
             filter_col1, filter_col2 = st.columns(2)
             
@@ -675,7 +662,7 @@ with tab5:
     """)
     
     try:
-        df_total = load_total_weekly()
+        df_total = load_total_weekly("feature_engineering_gain")
         raw_corr = df_total['TOTAL_SPEND'].corr(df_total['REVENUE'])
         transformed_corr = 0.757
         
@@ -709,21 +696,8 @@ with tab5:
         """)
         
         try:
-            @st.cache_data(ttl=300)
-            def load_channel_weekly():
-                return session.sql("""
-                    SELECT 
-                        WEEK_START,
-                        CHANNEL_CODE,
-                        SUM(SPEND) as SPEND,
-                        SUM(REVENUE) as REVENUE
-                    FROM GLOBAL_B2B_MMM.DIMENSIONAL.V_MMM_INPUT_WEEKLY
-                    GROUP BY WEEK_START, CHANNEL_CODE
-                    ORDER BY CHANNEL_CODE, WEEK_START
-                """).to_pandas()
-            
-            df_channel = load_channel_weekly()
-            channels = sorted(df_channel['CHANNEL_CODE'].unique().tolist())
+            df_channel = load_chart_data("transform_by_channel")
+            channels = sorted(df_channel['CHANNEL_CODE'].dropna().unique().tolist())
             
             selected_channel = st.selectbox(
                 "📺 Select Channel", 
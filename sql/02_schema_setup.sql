@@ -641,13 +641,16 @@ CREATE TABLE IF NOT EXISTS MODEL_RESULTS (
     ADSTOCK_DECAY FLOAT COMMENT 'Geometric decay rate theta (0-1), higher = longer carryover',
     SATURATION_ALPHA FLOAT COMMENT 'Hill function shape parameter, controls curve steepness',
     SATURATION_GAMMA FLOAT COMMENT 'Half-saturation spend level where response = 50% of max',
+    RESPONSE_COEF FLOAT COMMENT 'Unscaled media coefficient: weekly revenue = coef × hill(spend / (1 - decay))',
+    RESPONSE_COEF_STD FLOAT COMMENT 'Bootstrap standard deviation of the media coefficient',
     -- Model Quality Metrics
     CV_MAPE FLOAT COMMENT 'Cross-validation Mean Absolute Percentage Error',
     R_SQUARED FLOAT COMMENT 'In-sample coefficient of determination',
     N_OBSERVATIONS INT COMMENT 'Number of weekly observations for this channel',
     -- Spend Context
     CURRENT_SPEND FLOAT COMMENT 'Current period total spend for this channel',
-    SPEND_SHARE FLOAT COMMENT 'Percentage of total marketing budget'
+    SPEND_SHARE FLOAT COMMENT 'Percentage of total marketing budget',
+    MAX_WEEKLY_SPEND FLOAT COMMENT 'Largest observed weekly spend (response curves span 0 to 3x this)'
 );
 
 CREATE TABLE IF NOT EXISTS RESPONSE_CURVES (
@@ -664,6 +667,27 @@ CREATE TABLE IF NOT EXISTS RESPONSE_CURVES (
     EFFICIENCY_ZONE VARCHAR(20) COMMENT 'EFFICIENT, DIMINISHING, or SATURATED'
 );
 
+-- Per-resample bootstrap draws (one row per draw × channel, replaced per MODEL_VERSION)
+CREATE TABLE IF NOT EXISTS BOOTSTRAP_DRAWS (
+    MODEL_VERSION VARCHAR(50),
+    DRAW_ID INT COMMENT 'Bootstrap resample index (same across channels: draws are joint)',
+    CHANNEL VARCHAR(50),
+    COEF FLOAT COMMENT 'Unscaled media coefficient refit on this resample',
+    ROI FLOAT COMMENT 'Channel ROI on this resample'
+)
+CLUSTER BY (MODEL_VERSION);
+
+-- Terminal adstock state of the current model (one row per channel, overwritten per run)
+-- python -m mmm extend-features continues the recurrence from here for newly loaded weeks
+CREATE TABLE IF NOT EXISTS ADSTOCK_STATE (
+    MODEL_VERSION VARCHAR(50),
+    CHANNEL VARCHAR(50),
+    THETA FLOAT COMMENT 'Adstock decay rate the state was filtered with',
+    STATE FLOAT COMMENT 'Adstocked spend of the last filtered week',
+    N_WEEKS INT COMMENT 'Weeks filtered so far',
+    LAST_WEEK VARCHAR(10) COMMENT 'Last filtered WEEK_START (YYYY-MM-DD)'
+);
+
 -- View for model results with significance interpretation
 CREATE OR REPLACE VIEW V_MODEL_RESULTS_INTERPRETED AS
 SELECT
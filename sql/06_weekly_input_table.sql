@@ -0,0 +1,244 @@
+-- 06_weekly_input_table.sql
+-- Materialize V_MMM_INPUT_WEEKLY as a table refreshed incrementally from streams
+-- Run after 02_schema_setup.sql / 05_fix_attribution.sql and 03_load_data.sql
+-- (re-run it after either of them, since they redefine V_MMM_INPUT_WEEKLY)
+--
+-- The view used to recompute the spend / revenue → opportunity → campaign /
+-- indicator aggregation and its FULL OUTER JOIN on every query (training
+-- notebook, every Streamlit page, the problem-statement app, Cortex Analyst).
+-- Now:
+--   MMM_INPUT_WEEKLY_BETWEEN(from, to)  the aggregation, restricted to a week range
+--   MMM_INPUT_WEEKLY                    materialized result (week × region × channel)
+--   *_STREAM on the three fact tables   which weeks changed since the last refresh
+--   REFRESH_MMM_INPUT_WEEKLY()          recomputes only those weeks (delete + insert)
+--   V_MMM_INPUT_WEEKLY                  plain scan of the table, same columns as before
+--
+-- Changes to MARKETING_CAMPAIGN_FLAT or OPPORTUNITY re-attribute past weeks and
+-- are not tracked by the streams: CALL DIMENSIONAL.REFRESH_MMM_INPUT_WEEKLY(TRUE)
+-- after editing them. The local stand-in is mmm/weekly_store.py (SQLite).
+--
+-- Expects the project database to be current (deploy.sh sets it, as for 03_load_data.sql).
+
+USE SCHEMA DIMENSIONAL;
+
+-- =============================================================================
+-- 1. Weekly aggregation for a range of weeks (same logic as 05_fix_attribution.sql)
+--    Every CTE filters its fact table on the range so a refresh only scans new weeks
+-- =============================================================================
+CREATE OR REPLACE FUNCTION MMM_INPUT_WEEKLY_BETWEEN(FROM_WEEK DATE, TO_WEEK DATE)
+RETURNS TABLE (
+    WEEK_START DATE,
+    SUPER_REGION_NAME VARCHAR,
+    REGION_NAME VARCHAR,
+    COUNTRY_NAME VARCHAR,
+    SEGMENT_NAME VARCHAR,
+    DIVISION_NAME VARCHAR,
+    CATEGORY_NAME VARCHAR,
+    CHANNEL_CODE VARCHAR,
+    CHANNEL_TYPE VARCHAR,
+    CAMPAIGN_OBJECTIVE VARCHAR,
+    SPEND FLOAT,
+    IMPRESSIONS NUMBER,
+    CLICKS NUMBER,
+    VIDEO_VIEWS NUMBER,
+    ENGAGEMENTS NUMBER,
+    REVENUE FLOAT,
+    AVG_PMI FLOAT,
+    AVG_COMPETITOR_SOV FLOAT,
+    AVG_INDUSTRY_GROWTH FLOAT
+)
+AS
+$$
+WITH WEEKLY_SPEND AS (
+    SELECT
+        DATE_TRUNC('WEEK', s.SPEND_DATE) AS WEEK_START,
+        c.REGION AS REGION_NAME,
+        c.CHANNEL AS CHANNEL_CODE,
+        CASE
+            WHEN c.CHANNEL = 'LinkedIn' THEN 'SOCIAL'
+            WHEN c.CHANNEL = 'Facebook' THEN 'SOCIAL'
+            WHEN c.CHANNEL = 'Google Ads' THEN 'SEARCH'
+            WHEN c.CHANNEL = 'Programmatic' THEN 'PROGRAMMATIC'
+            ELSE 'OTHER'
+        END AS CHANNEL_TYPE,
+        c.CAMPAIGN_TYPE AS CAMPAIGN_OBJECTIVE,
+        SUM(s.SPEND_AMOUNT) AS TOTAL_SPEND,
+        SUM(s.IMPRESSIONS) AS TOTAL_IMPRESSIONS,
+        SUM(s.CLICKS) AS TOTAL_CLICKS,
+        SUM(s.VIDEO_VIEWS) AS TOTAL_VIDEO_VIEWS
+    FROM ATOMIC.MEDIA_SPEND_DAILY s
+    LEFT JOIN ATOMIC.MARKETING_CAMPAIGN_FLAT c ON s.CAMPAIGN_ID = c.CAMPAIGN_ID
+    WHERE s.SPEND_DATE >= FROM_WEEK AND s.SPEND_DATE < DATEADD('DAY', 7, TO_WEEK)
+    GROUP BY 1, 2, 3, 4, 5
+),
+WEEKLY_REVENUE_BY_CHANNEL AS (
+    SELECT
+        DATE_TRUNC('WEEK', r.POSTING_DATE) AS WEEK_START,
+        c.REGION AS REGION_NAME,
+        c.CHANNEL AS CHANNEL_CODE,
+        SUM(r.REVENUE_AMOUNT) AS TOTAL_REVENUE
+    FROM ATOMIC.ACTUAL_FINANCIAL_RESULT r
+    JOIN ATOMIC.OPPORTUNITY o ON r.OPPORTUNITY_ID = o.OPPORTUNITY_ID
+    JOIN ATOMIC.MARKETING_CAMPAIGN_FLAT c ON o.CAMPAIGN_ID = c.CAMPAIGN_ID
+    WHERE r.POSTING_DATE >= FROM_WEEK AND r.POSTING_DATE < DATEADD('DAY', 7, TO_WEEK)
+    GROUP BY 1, 2, 3
+),
+WEEKLY_INDICATORS AS (
+    SELECT
+        DATE_TRUNC('WEEK', ms.SIGNAL_DATE) AS WEEK_START,
+        ms.REGION AS REGION_NAME,
+        AVG(CASE WHEN ms.SIGNAL_TYPE = 'PMI' THEN ms.SIGNAL_VALUE END) AS AVG_PMI,
+        AVG(CASE WHEN ms.SIGNAL_TYPE = 'SOV' THEN ms.SIGNAL_VALUE END) AS AVG_COMPETITOR_SOV
+    FROM ATOMIC.MARKET_SIGNAL ms
+    WHERE ms.SIGNAL_DATE >= FROM_WEEK AND ms.SIGNAL_DATE < DATEADD('DAY', 7, TO_WEEK)
+    GROUP BY 1, 2
+)
+SELECT
+    COALESCE(s.WEEK_START, r.WEEK_START) AS WEEK_START,
+    COALESCE(s.REGION_NAME, r.REGION_NAME) AS SUPER_REGION_NAME,
+    COALESCE(s.REGION_NAME, r.REGION_NAME) AS REGION_NAME,
+    NULL::VARCHAR AS COUNTRY_NAME,
+    NULL::VARCHAR AS SEGMENT_NAME,
+    NULL::VARCHAR AS DIVISION_NAME,
+    NULL::VARCHAR AS CATEGORY_NAME,
+    COALESCE(s.CHANNEL_CODE, r.CHANNEL_CODE) AS CHANNEL_CODE,
+    s.CHANNEL_TYPE,
+    s.CAMPAIGN_OBJECTIVE,
+    ZEROIFNULL(s.TOTAL_SPEND) AS SPEND,
+    ZEROIFNULL(s.TOTAL_IMPRESSIONS) AS IMPRESSIONS,
+    ZEROIFNULL(s.TOTAL_CLICKS) AS CLICKS,
+    ZEROIFNULL(s.TOTAL_VIDEO_VIEWS) AS VIDEO_VIEWS,
+    0 AS ENGAGEMENTS,
+    ZEROIFNULL(r.TOTAL_REVENUE) AS REVENUE,
+    i.AVG_PMI,
+    i.AVG_COMPETITOR_SOV,
+    0 AS AVG_INDUSTRY_GROWTH
+FROM WEEKLY_SPEND s
+FULL OUTER JOIN WEEKLY_REVENUE_BY_CHANNEL r
+    ON s.WEEK_START = r.WEEK_START
+    AND s.REGION_NAME = r.REGION_NAME
+    AND s.CHANNEL_CODE = r.CHANNEL_CODE
+LEFT JOIN WEEKLY_INDICATORS i
+    ON COALESCE(s.WEEK_START, r.WEEK_START) = i.WEEK_START
+    AND COALESCE(s.REGION_NAME, r.REGION_NAME) = i.REGION_NAME
+$$;
+
+-- =============================================================================
+-- 2. Materialized table, change-tracking streams and initial backfill
+--    Streams are created before the backfill so rows loaded in between are
+--    picked up by the first refresh instead of being missed
+-- =============================================================================
+CREATE TABLE IF NOT EXISTS MMM_INPUT_WEEKLY (
+    WEEK_START DATE,
+    SUPER_REGION_NAME VARCHAR,
+    REGION_NAME VARCHAR,
+    COUNTRY_NAME VARCHAR,
+    SEGMENT_NAME VARCHAR,
+    DIVISION_NAME VARCHAR,
+    CATEGORY_NAME VARCHAR,
+    CHANNEL_CODE VARCHAR,
+    CHANNEL_TYPE VARCHAR,
+    CAMPAIGN_OBJECTIVE VARCHAR,
+    SPEND FLOAT,
+    IMPRESSIONS NUMBER,
+    CLICKS NUMBER,
+    VIDEO_VIEWS NUMBER,
+    ENGAGEMENTS NUMBER,
+    REVENUE FLOAT,
+    AVG_PMI FLOAT,
+    AVG_COMPETITOR_SOV FLOAT,
+    AVG_INDUSTRY_GROWTH FLOAT
+)
+CLUSTER BY (WEEK_START)
+COMMENT = 'Materialized weekly MMM input; maintained by REFRESH_MMM_INPUT_WEEKLY';
+
+-- Weeks waiting to be recomputed (filled from the streams inside the refresh transaction)
+CREATE TABLE IF NOT EXISTS MMM_INPUT_DIRTY_WEEKS (
+    WEEK_START DATE
+);
+
+CREATE OR REPLACE STREAM ATOMIC.MEDIA_SPEND_DAILY_STREAM ON TABLE ATOMIC.MEDIA_SPEND_DAILY;
+CREATE OR REPLACE STREAM ATOMIC.ACTUAL_FINANCIAL_RESULT_STREAM ON TABLE ATOMIC.ACTUAL_FINANCIAL_RESULT;
+CREATE OR REPLACE STREAM ATOMIC.MARKET_SIGNAL_STREAM ON TABLE ATOMIC.MARKET_SIGNAL;
+
+INSERT OVERWRITE INTO MMM_INPUT_WEEKLY
+SELECT * FROM TABLE(MMM_INPUT_WEEKLY_BETWEEN('1900-01-01'::DATE, '2999-12-31'::DATE));
+
+-- =============================================================================
+-- 3. Incremental refresh: recompute only the weeks touched since the last run
+--    FULL_REFRESH => TRUE marks every week dirty (after dimension changes)
+-- =============================================================================
+CREATE OR REPLACE PROCEDURE REFRESH_MMM_INPUT_WEEKLY(FULL_REFRESH BOOLEAN DEFAULT FALSE)
+RETURNS VARCHAR
+LANGUAGE SQL
+AS
+$$
+BEGIN
+    BEGIN TRANSACTION;
+
+    -- Reading the streams in DML advances their offsets when the transaction commits
+    INSERT INTO DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS
+        SELECT DATE_TRUNC('WEEK', SPEND_DATE) FROM ATOMIC.MEDIA_SPEND_DAILY_STREAM
+        UNION
+        SELECT DATE_TRUNC('WEEK', POSTING_DATE) FROM ATOMIC.ACTUAL_FINANCIAL_RESULT_STREAM
+        UNION
+        SELECT DATE_TRUNC('WEEK', SIGNAL_DATE) FROM ATOMIC.MARKET_SIGNAL_STREAM;
+
+    IF (FULL_REFRESH) THEN
+        INSERT INTO DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS
+            SELECT DATE_TRUNC('WEEK', SPEND_DATE) FROM ATOMIC.MEDIA_SPEND_DAILY
+            UNION
+            SELECT DATE_TRUNC('WEEK', POSTING_DATE) FROM ATOMIC.ACTUAL_FINANCIAL_RESULT
+            UNION
+            SELECT DATE_TRUNC('WEEK', SIGNAL_DATE) FROM ATOMIC.MARKET_SIGNAL
+            UNION
+            SELECT WEEK_START FROM DIMENSIONAL.MMM_INPUT_WEEKLY;
+    END IF;
+
+    LET from_week DATE := (SELECT MIN(WEEK_START) FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS);
+    LET to_week DATE := (SELECT MAX(WEEK_START) FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS);
+    LET n_weeks INTEGER := (SELECT COUNT(DISTINCT WEEK_START) FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS);
+
+    IF (n_weeks > 0) THEN
+        DELETE FROM DIMENSIONAL.MMM_INPUT_WEEKLY
+        WHERE WEEK_START IN (SELECT WEEK_START FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS);
+
+        INSERT INTO DIMENSIONAL.MMM_INPUT_WEEKLY
+        SELECT * FROM TABLE(DIMENSIONAL.MMM_INPUT_WEEKLY_BETWEEN(:from_week, :to_week))
+        WHERE WEEK_START IN (SELECT WEEK_START FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS);
+
+        DELETE FROM DIMENSIONAL.MMM_INPUT_DIRTY_WEEKS;
+    END IF;
+
+    COMMIT;
+    RETURN 'Refreshed ' || n_weeks || ' weeks';
+END;
+$$;
+
+-- Runs only when a stream has data. Serverless by default; to use the project
+-- warehouse instead: ALTER TASK REFRESH_MMM_INPUT_WEEKLY_TASK SET WAREHOUSE = <warehouse>
+-- (a DYNAMIC TABLE with TARGET_LAG over the same query is the alternative, but
+-- the FULL OUTER JOIN keeps it in full-refresh mode)
+CREATE OR REPLACE TASK REFRESH_MMM_INPUT_WEEKLY_TASK
+    USER_TASK_MANAGED_INITIAL_WAREHOUSE_SIZE = 'XSMALL'
+    SCHEDULE = '60 MINUTE'
+    COMMENT = 'Merge new MEDIA_SPEND_DAILY / ACTUAL_FINANCIAL_RESULT / MARKET_SIGNAL rows into MMM_INPUT_WEEKLY'
+WHEN
+    SYSTEM$STREAM_HAS_DATA('ATOMIC.MEDIA_SPEND_DAILY_STREAM')
+    OR SYSTEM$STREAM_HAS_DATA('ATOMIC.ACTUAL_FINANCIAL_RESULT_STREAM')
+    OR SYSTEM$STREAM_HAS_DATA('ATOMIC.MARKET_SIGNAL_STREAM')
+AS
+    CALL DIMENSIONAL.REFRESH_MMM_INPUT_WEEKLY(FALSE);
+
+ALTER TASK REFRESH_MMM_INPUT_WEEKLY_TASK RESUME;
+
+-- =============================================================================
+-- 4. Readers: the view keeps its name and columns, now a plain table scan
+-- =============================================================================
+CREATE OR REPLACE VIEW V_MMM_INPUT_WEEKLY AS
+SELECT * FROM DIMENSIONAL.MMM_INPUT_WEEKLY;
+
+COMMENT ON VIEW V_MMM_INPUT_WEEKLY IS
+    'Weekly MMM input (scan of MMM_INPUT_WEEKLY, refreshed incrementally by REFRESH_MMM_INPUT_WEEKLY_TASK)';
+
+SELECT 'Weekly input materialized: ' || COUNT(*) || ' rows' AS status FROM MMM_INPUT_WEEKLY;
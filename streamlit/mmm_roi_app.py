@@ -17,6 +17,7 @@ logger = logging.getLogger(__name__)
 # Add current directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 from utils.data_loader import run_queries_parallel
+from utils.data_store import load_shared
 from utils.styling import (
     inject_custom_css,
     render_persona_card,
@@ -38,15 +39,21 @@ inject_custom_css()
 
 
 @st.cache_data(ttl=300)
-def load_summary_stats(_session):
-    """Load quick summary stats for the landing page."""
+def load_channel_count(_session):
+    """Count distinct channel codes in the weekly input."""
     queries = {
-        "ROI": "SELECT CHANNEL, TOTAL_SPEND, ATTRIBUTED_REVENUE, ROAS FROM GLOBAL_B2B_MMM.MMM.V_ROI_BY_CHANNEL",
         "CHANNELS": "SELECT COUNT(DISTINCT CHANNEL_CODE) as CNT FROM GLOBAL_B2B_MMM.DIMENSIONAL.V_MMM_INPUT_WEEKLY"
     }
     return run_queries_parallel(_session, queries)
 
 
+def load_summary_stats(session):
+    """Load quick summary stats for the landing page (ROI is shared with the persona pages)."""
+    data = load_shared(session, ["ROI"])
+    data.update(load_channel_count(session))
+    return data
+
+
 def main():
     # --- Session ---
     try:
@@ -21,7 +21,8 @@ from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.data_loader import run_queries_parallel
+from utils.data_loader import chart_queries, invalidate_cache
+from utils.data_store import load_shared, clear_shared
 from utils.styling import (
     inject_custom_css,
     render_story_section,
@@ -52,19 +53,9 @@ st.set_page_config(
 inject_custom_css()
 
 
-@st.cache_data(ttl=300)
-def load_dashboard_data(_session):
-    """Load all data needed for the executive dashboard including CI data."""
-    # Import centralized queries from data_loader
-    from utils.data_loader import QUERIES, DATABASE
-    
-    queries = {
-        "ROI": QUERIES["ROI"],
-        "WEEKLY": QUERIES["WEEKLY"],
-        "RESULTS": QUERIES["RESULTS"],
-        "RESULTS_INTERPRETED": f"SELECT * FROM {DATABASE}.MMM.V_MODEL_RESULTS_INTERPRETED",
-    }
-    return run_queries_parallel(_session, queries)
+def load_dashboard_data(session):
+    """Load all data needed for the executive dashboard including CI data (shared across pages)."""
+    return load_shared(session, ["ROI", "RESULTS", "RESULTS_INTERPRETED"] + chart_queries(["dashboard_trend"]))
 
 
 def generate_recommendation_with_confidence(df_results: pd.DataFrame, df_roi: pd.DataFrame, min_spend_pct: float = 10) -> dict:
@@ -211,6 +202,8 @@ def main():
     # Sidebar controls
     with st.sidebar:
         if st.button("Refresh Data", help="Clear cache and reload data"):
+            invalidate_cache()
+            clear_shared()
             st.cache_data.clear()
             st.rerun()
         
@@ -233,7 +226,7 @@ def main():
     with st.spinner("Loading executive dashboard..."):
         data = load_dashboard_data(session)
         df_roi = data.get("ROI", pd.DataFrame())
-        df_weekly = data.get("WEEKLY", pd.DataFrame())
+        df_weekly = data.get("WEEKLY_BY_WEEK", pd.DataFrame())
         df_results = data.get("RESULTS", pd.DataFrame())
         df_interpreted = data.get("RESULTS_INTERPRETED", pd.DataFrame())
     
@@ -581,11 +574,10 @@ def main():
     if not df_weekly.empty:
         st.markdown("### Performance Trends")
         
-        df_weekly_filtered = df_weekly.copy()
+        # Already summed per week in Snowflake (WEEKLY_BY_WEEK)
+        df_trend = df_weekly
         
-        if not df_weekly_filtered.empty:
-            df_trend = df_weekly_filtered.groupby('WEEK_START')[['SPEND', 'REVENUE']].sum().reset_index()
-            
+        if not df_trend.empty:
             fig_trend = go.Figure()
             fig_trend.add_trace(go.Scatter(
                 x=df_trend['WEEK_START'],
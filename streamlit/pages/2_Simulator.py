@@ -10,12 +10,20 @@ ENHANCED FEATURES:
 - CI bands on predictions
 - Adstock decay visualization per channel
 - Quick action presets (Optimize, Maximize, Balance)
+- Constraint-aware optimizer over the engine's response (budget, floors/caps, ±% limits)
+- Parametric response engine: revenue, exact marginal ROI and CI evaluated from the
+  learned θ/α/γ in MODEL_RESULTS (RESPONSE_CURVES is only loaded as a fallback)
+- Monte Carlo portfolio uncertainty: 90% band and P(lift > 0) from joint coefficient draws
+  (the training run's bootstrap draws when MMM.BOOTSTRAP_DRAWS has them)
+- Batch scenario evaluation: score an uploaded or generated N × channels spend matrix in one pass
+- Efficient frontier: optimal allocation and revenue for a sweep of total budgets
 - Educational panels on MMM concepts
 """
 import streamlit as st
 import pandas as pd
 import numpy as np
 import math
+import time
 import logging
 import plotly.graph_objects as go
 from snowflake.snowpark.context import get_active_session
@@ -29,7 +37,8 @@ logger.setLevel(logging.INFO)
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.data_loader import run_queries_parallel
+from utils.data_loader import invalidate_cache
+from utils.data_store import load_shared, clear_shared
 from utils.styling import (
     inject_custom_css,
     render_story_section,
@@ -49,6 +58,26 @@ from utils.styling import (
     BG_CARD
 )
 from utils.explanations import get_explanation
+from utils.curve_index import CurveIndex
+from utils.response_model import ResponseModel
+from utils.uncertainty import PortfolioUncertainty
+from utils.scenarios import (
+    scenario_hash,
+    scenario_template,
+    parse_scenario_csv,
+    scenario_grid,
+    efficiency_scores,
+    evaluate_scenarios,
+    frontier_table
+)
+from utils.budget_optimizer import (
+    efficient_frontier,
+    optimize_allocation,
+    optimize_response,
+    response_frontier,
+    allocation_bounds,
+    InfeasibleBudgetError
+)
 
 # --- Page Config ---
 st.set_page_config(
@@ -69,118 +98,133 @@ def log_event(session, event_type: str, message: str, details: dict = None):
         pass
 
 
-@st.cache_data(ttl=300)
-def load_simulator_data(_session):
-    """Load response curves and model results for simulation (with enhanced fields)."""
-    from utils.data_loader import QUERIES, DATABASE
-    
-    queries = {
-        "CURVES": QUERIES["CURVES"],
-        "RESULTS": QUERIES["RESULTS"],
-        "WEEKLY": QUERIES["WEEKLY"],
-    }
-    
-    return run_queries_parallel(_session, queries)
+def load_simulator_data(session):
+    """Load model results (learned parameters drive the parametric response engine)."""
+    return load_shared(session, ["RESULTS"])
+
+
+def load_simulator_curves(session):
+    """Load response curves (fallback when MODEL_RESULTS lacks learned parameters)."""
+    return load_shared(session, ["CURVES"])
+
+
+def results_cache_key(df_results: pd.DataFrame) -> tuple:
+    """Identify the loaded model results (model version + channels) for caching."""
+    version = str(df_results['MODEL_VERSION'].iloc[0]) if 'MODEL_VERSION' in df_results.columns else ""
+    channels = tuple(df_results['CHANNEL']) if 'CHANNEL' in df_results.columns else ()
+    return (version, len(df_results), channels)
+
+
+@st.cache_resource(show_spinner=False)
+def get_response_model(_df_results: pd.DataFrame, results_key: tuple):
+    """Parametric response engine, built once per model results load (None if params are missing)."""
+    return ResponseModel.from_results(_df_results)
+
+
+def curves_cache_key(df_curves: pd.DataFrame) -> tuple:
+    """Identify the loaded response curves (model version + shape) for caching."""
+    version = str(df_curves['MODEL_VERSION'].iloc[0]) if 'MODEL_VERSION' in df_curves.columns else ""
+    return (version, len(df_curves), tuple(df_curves['CHANNEL'].unique()))
+
 
+@st.cache_resource(show_spinner=False)
+def get_curve_index(_df_curves: pd.DataFrame, curves_key: tuple) -> CurveIndex:
+    """Per-channel curve arrays, built once per curves load and shared across reruns."""
+    return CurveIndex.from_frame(_df_curves)
 
-def interpolate_revenue(df_curve: pd.DataFrame, spend: float, 
-                         return_ci: bool = False) -> tuple:
+
+def load_bootstrap_draws(session):
+    """Load the current model's bootstrap coefficient draws (long: DRAW_ID, CHANNEL, COEF)."""
+    return load_shared(session, ["BOOTSTRAP_DRAWS"])
+
+
+@st.cache_resource(show_spinner=False)
+def get_portfolio_uncertainty(_engine, engine_key: tuple, _df_draws: pd.DataFrame) -> PortfolioUncertainty:
     """
-    Interpolate predicted revenue from response curve.
-    Optionally return CI bounds if available.
+    Coefficient draws for Monte Carlo bands, built once per response engine.
     
-    Note: Floors revenue at 0 since negative revenue predictions indicate
-    model uncertainty rather than actual negative returns.
+    Uses the stored bootstrap draws when they cover every channel of the
+    parametric engine; otherwise draws independently from each channel's CI.
     """
-    if df_curve.empty:
-        if return_ci:
-            return 0.0, 0.0, 0.0
-        return 0.0
-    
-    df_sorted = df_curve.sort_values('SPEND')
-    revenue = max(0.0, float(np.interp(spend, df_sorted['SPEND'], df_sorted['PREDICTED_REVENUE'])))
-    
-    if return_ci:
-        if 'PREDICTED_REVENUE_CI_LOWER' in df_sorted.columns:
-            ci_lower = max(0.0, float(np.interp(spend, df_sorted['SPEND'], 
-                                       df_sorted['PREDICTED_REVENUE_CI_LOWER'].fillna(revenue * 0.85))))
-            ci_upper = max(0.0, float(np.interp(spend, df_sorted['SPEND'], 
-                                       df_sorted['PREDICTED_REVENUE_CI_UPPER'].fillna(revenue * 1.15))))
-        else:
-            ci_lower = max(0.0, revenue * 0.85)
-            ci_upper = max(0.0, revenue * 1.15)
-        return revenue, ci_lower, ci_upper
-    
-    return revenue
+    if isinstance(_engine, ResponseModel) and not _df_draws.empty:
+        samples = _df_draws.pivot_table(index='DRAW_ID', columns='CHANNEL', values='COEF')
+        if set(_engine.channels).issubset(samples.columns):
+            return PortfolioUncertainty.from_samples(
+                samples[_engine.channels].to_numpy(dtype=float), _engine.coef
+            )
+    return PortfolioUncertainty.from_engine(_engine)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def run_scenario_batch(_engine, engine_key: tuple, scenario_key: str, _names: list,
+                       _spend: np.ndarray, _baseline: np.ndarray, _uncertainty) -> pd.DataFrame:
+    """Evaluate a scenario batch (cached per response engine and scenario hash)."""
+    return evaluate_scenarios(_engine, _names, _spend, _baseline, _uncertainty)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def run_efficient_frontier(_engine, engine_key: tuple, budgets: tuple,
+                           lower: tuple, upper: tuple) -> np.ndarray:
+    """Optimal allocation for every budget in a sweep (cached per response engine and inputs)."""
+    if isinstance(_engine, ResponseModel):
+        return response_frontier(_engine, budgets, lower, upper)
+    return efficient_frontier(tuple(_engine.curve(c) for c in _engine.channels), budgets, lower, upper)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def run_budget_optimizer(_engine, engine_key: tuple, total_budget: float,
+                         lower: tuple, upper: tuple) -> np.ndarray:
+    """Optimal allocation for a budget and bounds (cached per response engine and inputs)."""
+    if isinstance(_engine, ResponseModel):
+        return optimize_response(_engine, total_budget, lower, upper)
+    return optimize_allocation(tuple(_engine.curve(c) for c in _engine.channels), total_budget, lower, upper)
+
 
+def zones_at_spend(engine, spend: np.ndarray, gammas: np.ndarray) -> list:
+    """Efficiency zone per channel; spend-vs-γ bands when the curves carry no zones."""
+    if getattr(engine, 'zones', True) is not None:
+        return engine.zones_at(spend)
+    return np.select(
+        [spend < gammas * 0.5, spend < gammas * 1.5],
+        ["EFFICIENT", "DIMINISHING"],
+        default="SATURATED"
+    ).tolist()
 
-def calculate_efficiency_score(channel_impacts: list, channel_params: dict) -> dict:
+
+def calculate_efficiency_score(channels: list, spend: np.ndarray, marginal_roi: np.ndarray,
+                               zones: list) -> dict:
     """
     Calculate portfolio efficiency score based on ACTUAL marginal ROI at simulated spend level.
     
-    Uses Hill saturation parameters to compute true mROI at each spend point,
-    accounting for diminishing returns as channels approach saturation.
+    Marginal ROI comes from the response engine (exact Hill derivative of the
+    steady-state response), so diminishing returns are fully accounted for.
     
     Returns:
     - score: 0-100 (100 = perfect allocation)
     - interpretation: text description
     - details: per-channel efficiency metrics
     """
-    if not channel_impacts:
+    if len(channels) == 0:
         return {"score": 50, "interpretation": "No data", "details": []}
     
-    total_spend = sum(c['Simulated Spend'] for c in channel_impacts)
+    total_spend = float(np.sum(spend))
     if total_spend == 0:
         return {"score": 0, "interpretation": "No spend allocated", "details": []}
     
-    weighted_mroi = 0
-    details = []
+    # Zero-spend channels carry no weight (their mROI at 0 can be unbounded)
+    weights = np.asarray(spend, dtype=float) / total_spend
+    weighted_mroi, score = efficiency_scores(np.asarray(spend, dtype=float), marginal_roi)
+    weighted_mroi, score = float(weighted_mroi), float(score)
     
-    for c in channel_impacts:
-        ch = c['Channel']
-        spend = c['Simulated Spend']
-        params = channel_params.get(ch, {})
-        
-        alpha = params.get('saturation_alpha', 2.5)
-        gamma = params.get('saturation_gamma', 50000)
-        base_mroi = params.get('marginal_roi', 1.0)
-        weekly_spend = params.get('weekly_spend', gamma)
-        
-        x_alpha = spend ** alpha
-        gamma_alpha = gamma ** alpha
-        saturation = x_alpha / (x_alpha + gamma_alpha)
-        
-        if weekly_spend > 0:
-            base_x_alpha = weekly_spend ** alpha
-            base_saturation = base_x_alpha / (base_x_alpha + gamma_alpha)
-        else:
-            base_saturation = 0.5
-        
-        if spend > 0 and weekly_spend > 0:
-            ratio = ((1 - saturation) / (1 - base_saturation)) * (weekly_spend / spend) ** (alpha - 1)
-            mroi_at_spend = base_mroi * min(ratio, 2.0)
-        else:
-            mroi_at_spend = base_mroi
-        
-        weight = spend / total_spend
-        weighted_mroi += mroi_at_spend * weight
-        
-        if saturation < 0.3:
-            efficiency = "EFFICIENT"
-        elif saturation < 0.7:
-            efficiency = "DIMINISHING"
-        else:
-            efficiency = "SATURATED"
-        
-        details.append({
+    details = [
+        {
             "channel": ch,
-            "spend_share": weight,
-            "marginal_roi": mroi_at_spend,
-            "saturation": saturation,
-            "efficiency": efficiency
-        })
-    
-    score = min(100, max(0, (weighted_mroi - 0.5) / 1.5 * 100))
+            "spend_share": weights[i],
+            "marginal_roi": marginal_roi[i],
+            "efficiency": zones[i]
+        }
+        for i, ch in enumerate(channels)
+    ]
     
     if score >= 80:
         interpretation = "Excellent allocation - High marginal returns across portfolio"
@@ -211,24 +255,39 @@ def main():
         return
     
     logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] MAIN_START: version={DEPLOY_VERSION}, db={DATABASE}")
-    logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] CURVES_QUERY: {QUERIES['CURVES']}")
     
     # Clear cache button for debugging
     if st.sidebar.button("Clear Cache & Reload"):
+        invalidate_cache()
+        clear_shared()
         st.cache_data.clear()
+        st.cache_resource.clear()
         st.rerun()
     
     with st.spinner("Loading simulator data..."):
         data = load_simulator_data(session)
-        df_curves = data.get("CURVES", pd.DataFrame())
         df_results = data.get("RESULTS", pd.DataFrame())
-        df_weekly = data.get("WEEKLY", pd.DataFrame())
     
-    logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] DATA_LOADED: curves_empty={df_curves.empty}, curves_rows={len(df_curves)}, results_rows={len(df_results)}, weekly_rows={len(df_weekly)}")
+    # Response engine: parametric from MODEL_RESULTS; fall back to the curves table
+    # for results written without learned parameters
+    engine_key = ("parametric",) + results_cache_key(df_results)
+    engine = get_response_model(df_results, engine_key)
+    engine_label = "parametric"
+    if engine is None:
+        logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] CURVES_QUERY: {QUERIES['CURVES']}")
+        with st.spinner("Loading response curves..."):
+            df_curves = load_simulator_curves(session).get("CURVES", pd.DataFrame())
+        if not df_curves.empty:
+            engine_key = ("curves",) + curves_cache_key(df_curves)
+            engine = get_curve_index(df_curves, engine_key)
+            engine_label = f"curves={len(df_curves)}"
     
-    if not df_curves.empty:
-        logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] CURVES_COLS: {list(df_curves.columns)}")
-        logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] CURVES_SAMPLE: {df_curves.head(1).to_dict()}")
+    # Bootstrap draws feed the Monte Carlo band (only usable with the parametric engine)
+    df_draws = pd.DataFrame()
+    if isinstance(engine, ResponseModel):
+        df_draws = load_bootstrap_draws(session).get("BOOTSTRAP_DRAWS", pd.DataFrame())
+    
+    logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] DATA_LOADED: results_rows={len(df_results)}, engine={engine_label if engine is not None else None}, draws_rows={len(df_draws)}")
 
     # --- Header ---
     st.markdown(f"""
@@ -237,13 +296,13 @@ def main():
         <p style="color: rgba(255,255,255,0.6); font-size: 1.1rem;">
             Model "what-if" scenarios to predict revenue impact with confidence intervals
         </p>
-        <p style="color: rgba(255,255,255,0.3); font-size: 0.7rem;">v{DEPLOY_VERSION[:8]} | curves={len(df_curves)}</p>
+        <p style="color: rgba(255,255,255,0.3); font-size: 0.7rem;">v{DEPLOY_VERSION[:8]} | {engine_label}</p>
     </div>
     """, unsafe_allow_html=True)
 
-    if df_curves.empty:
-        logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] NO_CURVES: DataFrame is empty, showing warning")
-        st.warning("No response curves found. Please run the MMM training pipeline first.")
+    if engine is None:
+        logger.info(f"[SIMULATOR][{DEPLOY_VERSION[:8]}] NO_MODEL: no model results or curves, showing warning")
+        st.warning("No trained model found. Please run the MMM training pipeline first.")
         st.markdown(
             render_story_section(
                 "Getting Started",
@@ -254,15 +313,6 @@ def main():
         )
         return
 
-    # Process channels - extract base channel from names like "Facebook_GLOBAL_ALL"
-    def extract_base_channel(channel_name):
-        parts = channel_name.split('_')
-        if len(parts) >= 2:
-            return parts[0]  # Facebook, LinkedIn, Google Ads, Programmatic
-        return channel_name
-    
-    df_curves['Base_Channel'] = df_curves['CHANNEL'].apply(extract_base_channel)
-
     # --- Scenario Context ---
     st.markdown(
         render_story_section(
@@ -274,7 +324,7 @@ def main():
     )
 
     # Use all channels (no regional filtering since data is GLOBAL)
-    channels = df_curves['CHANNEL'].unique().tolist()
+    channels = engine.channels
 
     if not channels:
         st.info("No channels available.")
@@ -286,7 +336,8 @@ def main():
         for _, row in df_results.iterrows():
             ch = row.get('CHANNEL', '')
             current_spend = row.get('CURRENT_SPEND', 0)
-            weekly_spend = current_spend / 260 if current_spend > 0 else 0
+            weeks = row.get('N_OBSERVATIONS') or 260
+            weekly_spend = current_spend / weeks if current_spend > 0 else 0
             channel_params[ch] = {
                 'adstock_decay': row.get('ADSTOCK_DECAY', 0.5),
                 'saturation_alpha': row.get('SATURATION_ALPHA', 2.5),
@@ -296,9 +347,19 @@ def main():
                 'weekly_spend': weekly_spend
             }
     
+    # Baseline weekly spend: actual spend from MODEL_RESULTS (CURRENT_SPEND / training weeks),
+    # falling back to the engine's mean spend
+    baseline_spend = np.array([channel_params.get(ch, {}).get('weekly_spend', 0) for ch in channels], dtype=float)
+    baseline_spend = np.where(baseline_spend == 0, engine.mean_spend, baseline_spend)
+    baseline_allocation = dict(zip(channels, baseline_spend))
+    total_baseline = float(baseline_spend.sum())
+    slider_max = engine.max_spend * 1.5
+    gammas = np.array([channel_params.get(ch, {}).get('saturation_gamma', 50000) for ch in channels], dtype=float)
+    
     # --- Reset All Button (outside expander) ---
     if st.button("Reset All", use_container_width=False, help="Reset budget and all channel allocations to baseline"):
         st.session_state['budget_adjustment'] = 0
+        st.session_state.pop('optimizer_summary', None)
         for key in list(st.session_state.keys()):
             if key.startswith("slider_"):
                 del st.session_state[key]
@@ -312,16 +373,6 @@ def main():
             unsafe_allow_html=True
         )
         
-        # Calculate baseline total for reference
-        temp_total_baseline = 0
-        for ch in channels:
-            params_temp = channel_params.get(ch, {})
-            ch_curve = df_curves[df_curves['CHANNEL'] == ch]
-            base_spend = params_temp.get('weekly_spend', 0)
-            if base_spend == 0:
-                base_spend = float(ch_curve['SPEND'].mean())
-            temp_total_baseline += base_spend
-        
         # Initialize budget adjustment in session state
         if 'budget_adjustment' not in st.session_state:
             st.session_state['budget_adjustment'] = 0
@@ -341,7 +392,7 @@ def main():
             )
             st.session_state['budget_adjustment'] = budget_pct
         
-        target_budget = temp_total_baseline * (1 + budget_pct / 100)
+        target_budget = total_baseline * (1 + budget_pct / 100)
         
         with col_info:
             change_color = COLOR_SUCCESS if budget_pct >= 0 else COLOR_DANGER
@@ -349,7 +400,7 @@ def main():
                 f"<div style='background: rgba(255,255,255,0.05); padding: 0.75rem; border-radius: 8px; text-align: center;'>"
                 f"<span style='color: rgba(255,255,255,0.5); font-size: 0.8rem;'>Target Budget</span><br>"
                 f"<span style='font-size: 1.3rem; font-weight: 700; color: {change_color};'>${target_budget:,.0f}</span><br>"
-                f"<span style='color: rgba(255,255,255,0.4); font-size: 0.75rem;'>Baseline: ${temp_total_baseline:,.0f}</span>"
+                f"<span style='color: rgba(255,255,255,0.4); font-size: 0.75rem;'>Baseline: ${total_baseline:,.0f}</span>"
                 f"</div>",
                 unsafe_allow_html=True
             )
@@ -364,122 +415,114 @@ def main():
                                                help="Use baseline proportions at target budget")
         with qa2:
             optimize_clicked = st.button("Optimize ROI", use_container_width=True,
-                                         help="Allocate target budget toward higher-ROI channels")
+                                         help="Revenue-maximizing allocation of the target budget "
+                                              "over the response curves, within the limits below")
         with qa3:
             balance_clicked = st.button("Balance", use_container_width=True,
                                         help="Distribute target budget evenly across channels")
         with qa4:
             scale_up = st.button("Scale +20%", use_container_width=True,
                                  help="Increase all current spend by 20% (ignores target budget)")
+        
+        # Optimizer constraints (used by Optimize ROI)
+        col_limit, col_bounds = st.columns([2, 1])
+        with col_limit:
+            change_limit_label = st.select_slider(
+                "Optimize: max change per channel",
+                options=["±10%", "±20%", "±30%", "±50%", "±100%", "No limit"],
+                value="±30%",
+                key="optimizer_change_limit",
+                help="Largest move from baseline spend the optimizer may recommend for any channel"
+            )
+        with col_bounds:
+            use_channel_bounds = st.checkbox(
+                "Channel floors & caps", key="optimizer_use_bounds",
+                help="Set minimum and maximum weekly spend per channel for the optimizer"
+            )
+        
+        channel_bounds = None
+        if use_channel_bounds:
+            channel_bounds = st.data_editor(
+                pd.DataFrame({
+                    'Channel': channels,
+                    'Min Spend': 0.0,
+                    'Max Spend': slider_max
+                }),
+                hide_index=True,
+                use_container_width=True,
+                disabled=['Channel'],
+                key="optimizer_bounds_editor",
+                column_config={
+                    "Min Spend": st.column_config.NumberColumn("Min Spend", min_value=0.0, format="$%.0f"),
+                    "Max Spend": st.column_config.NumberColumn("Max Spend", min_value=0.0, format="$%.0f")
+                }
+            )
+        
+        summary = st.session_state.get('optimizer_summary')
+        if summary and 'error' in summary:
+            st.warning(f"Optimizer: {summary['error']}")
+        elif summary:
+            st.caption(
+                f"Optimized in {summary['elapsed_ms']:.0f} ms — predicted weekly revenue "
+                f"${summary['optimized_revenue']:,.0f} vs ${summary['baseline_revenue']:,.0f} "
+                f"at the baseline mix for the same budget"
+            )
     
     # Pre-process quick actions before the slider loop
     # This ensures session state is updated BEFORE sliders are rendered
     if original_alloc_clicked or optimize_clicked or balance_clicked or scale_up:
-        # Need to calculate parameters first
-        temp_channel_params = {}
-        temp_baseline_allocation = {}
-        temp_total_baseline = 0
-        
-        for ch in channels:
-            params_temp = channel_params.get(ch, {})
-            ch_curve = df_curves[df_curves['CHANNEL'] == ch]
-            base_spend = params_temp.get('weekly_spend', 0)
-            if base_spend == 0:
-                base_spend = float(ch_curve['SPEND'].mean())
-            temp_baseline_allocation[ch] = base_spend
-            temp_total_baseline += base_spend
-            temp_channel_params[ch] = params_temp
+        st.session_state.pop('optimizer_summary', None)
         
         # Get target budget from slider (default to baseline if not set)
         budget_pct = st.session_state.get('budget_adjustment', 0)
-        target_total = temp_total_baseline * (1 + budget_pct / 100)
+        target_total = total_baseline * (1 + budget_pct / 100)
         
         if original_alloc_clicked:
             # Use BASELINE proportions, scale to target budget
-            scale_factor = target_total / temp_total_baseline if temp_total_baseline > 0 else 1.0
+            scale_factor = target_total / total_baseline if total_baseline > 0 else 1.0
             
-            for c in channels:
-                ch_curve = df_curves[df_curves['CHANNEL'] == c]
-                max_spend = float(ch_curve['SPEND'].max()) * 1.5
-                scaled_spend = temp_baseline_allocation[c] * scale_factor
-                st.session_state[f"slider_{c}"] = max(0.0, min(scaled_spend, max_spend))
+            scaled_spend = np.clip(baseline_spend * scale_factor, 0.0, slider_max)
+            for c, value in zip(channels, scaled_spend):
+                st.session_state[f"slider_{c}"] = float(value)
         
         elif optimize_clicked:
-            saturated_channels = []
-            efficient_channels = []
-            high_contrib_channels = []
-            
-            for c in channels:
-                params = temp_channel_params.get(c, {})
-                spend = temp_baseline_allocation[c]
-                alpha = params.get('saturation_alpha', 2.5)
-                gamma = params.get('saturation_gamma', 50000)
-                base_mroi = params.get('marginal_roi', 1.0)
-                
-                x_alpha = spend ** alpha
-                gamma_alpha = gamma ** alpha
-                saturation = x_alpha / (x_alpha + gamma_alpha)
-                
-                weight = spend / temp_total_baseline if temp_total_baseline > 0 else 0
-                contrib = base_mroi * weight
-                
-                if saturation > 0.5:
-                    saturated_channels.append(c)
-                elif saturation < 0.3 and base_mroi > 0.5:
-                    efficient_channels.append((c, base_mroi))
-                
-                if contrib > 0.1:
-                    high_contrib_channels.append(c)
+            # Exact optimum of the engine's response, the function engine.predict evaluates
+            # (see utils/budget_optimizer.py)
+            limit = None if change_limit_label == "No limit" else float(change_limit_label.strip("±%")) / 100
+            floors = caps = None
+            if channel_bounds is not None:
+                floors = channel_bounds['Min Spend'].fillna(0).to_numpy(dtype=float)
+                caps = channel_bounds['Max Spend'].fillna(np.inf).to_numpy(dtype=float)
+            lower, upper = allocation_bounds(baseline_spend, slider_max, limit, floors, caps)
             
-            cut_total = 0
-            raw_allocations = {}
-            for c in channels:
-                if c in saturated_channels:
-                    cut_amount = temp_baseline_allocation[c] * 0.40
-                    raw_allocations[c] = temp_baseline_allocation[c] - cut_amount
-                    cut_total += cut_amount
-                else:
-                    raw_allocations[c] = temp_baseline_allocation[c]
-            
-            redistribute_channels = [(ch, mroi) for ch, mroi in efficient_channels 
-                                     if ch not in high_contrib_channels]
-            
-            if redistribute_channels and cut_total > 0:
-                total_mroi = sum(mroi for _, mroi in redistribute_channels)
-                for ch, mroi in redistribute_channels:
-                    add_amount = cut_total * (mroi / total_mroi)
-                    raw_allocations[ch] = raw_allocations[ch] + add_amount
-            elif efficient_channels and cut_total > 0:
-                total_mroi = sum(mroi for _, mroi in efficient_channels)
-                for ch, mroi in efficient_channels:
-                    add_amount = cut_total * (mroi / total_mroi)
-                    raw_allocations[ch] = raw_allocations[ch] + add_amount
-            
-            raw_total = sum(raw_allocations.values())
-            # Scale to target budget instead of baseline
-            scale_factor = target_total / raw_total if raw_total > 0 else 1.0
-            
-            for c in channels:
-                ch_curve = df_curves[df_curves['CHANNEL'] == c]
-                max_spend = float(ch_curve['SPEND'].max()) * 1.5
-                optimal_spend = raw_allocations[c] * scale_factor
-                st.session_state[f"slider_{c}"] = max(0.0, min(optimal_spend, max_spend))
+            start = time.perf_counter()
+            try:
+                optimal = run_budget_optimizer(
+                    engine, engine_key, float(target_total), tuple(lower), tuple(upper)
+                )
+            except InfeasibleBudgetError as e:
+                st.session_state['optimizer_summary'] = {'error': str(e)}
+            else:
+                scale_factor = target_total / total_baseline if total_baseline > 0 else 1.0
+                st.session_state['optimizer_summary'] = {
+                    'elapsed_ms': (time.perf_counter() - start) * 1000,
+                    'optimized_revenue': float(engine.predict(optimal)[0].sum()),
+                    'baseline_revenue': float(engine.predict(baseline_spend * scale_factor)[0].sum())
+                }
+                for c, value in zip(channels, optimal):
+                    st.session_state[f"slider_{c}"] = float(value)
         
         elif balance_clicked:
             # Use target budget for balance
             balanced_value = target_total / len(channels) if channels else 0
-            for c in channels:
-                ch_curve = df_curves[df_curves['CHANNEL'] == c]
-                max_spend = float(ch_curve['SPEND'].max()) * 1.5
-                st.session_state[f"slider_{c}"] = min(balanced_value, max_spend)
+            for c, max_spend in zip(channels, slider_max):
+                st.session_state[f"slider_{c}"] = float(min(balanced_value, max_spend))
         
         elif scale_up:
             # Scale +20% ignores target budget, just scales current values
-            for c in channels:
-                ch_curve = df_curves[df_curves['CHANNEL'] == c]
-                max_spend = float(ch_curve['SPEND'].max()) * 1.5
-                current_val = st.session_state.get(f"slider_{c}", temp_baseline_allocation[c])
-                st.session_state[f"slider_{c}"] = min(current_val * 1.2, max_spend)
+            for c, max_spend in zip(channels, slider_max):
+                current_val = st.session_state.get(f"slider_{c}", baseline_allocation[c])
+                st.session_state[f"slider_{c}"] = float(min(current_val * 1.2, max_spend))
         
         st.rerun()
 
@@ -488,7 +531,6 @@ def main():
 
     # Store allocations
     current_allocation = {}
-    baseline_allocation = {}
     
     # Initialize gross margin in session state
     if 'gross_margin' not in st.session_state:
@@ -497,19 +539,6 @@ def main():
     with col_sliders:
         st.markdown("### Adjust Spend by Channel")
         
-        # Pre-calculate total baseline for percentage calculations
-        # Use actual weekly spend from MODEL_RESULTS (CURRENT_SPEND / 260 weeks)
-        total_baseline = 0
-        for ch in channels:
-            params = channel_params.get(ch, {})
-            ch_curve = df_curves[df_curves['CHANNEL'] == ch]
-            # Use actual weekly spend if available, otherwise fall back to curve mean
-            base_spend = params.get('weekly_spend', 0)
-            if base_spend == 0:
-                base_spend = float(ch_curve['SPEND'].mean())
-            baseline_allocation[ch] = base_spend
-            total_baseline += base_spend
-        
         # Placeholder for Total Spend Summary - will be populated after sliders
         spend_summary_placeholder = st.empty()
         
@@ -556,13 +585,19 @@ def main():
         # Reset total_simulated for accurate calculation during slider loop
         total_simulated = 0
         
-        for ch in channels:
-            ch_curve = df_curves[df_curves['CHANNEL'] == ch]
+        # Zone badges at the current slider values (one vectorized engine call)
+        slider_zones = zones_at_spend(
+            engine,
+            np.array([st.session_state.get(f"slider_{ch}", baseline_allocation[ch]) for ch in channels], dtype=float),
+            gammas
+        )
+        
+        for ch, max_spend, zone in zip(channels, slider_max, slider_zones):
             params = channel_params.get(ch, {})
             
             # Get baseline values
             base_spend = baseline_allocation[ch]
-            max_spend = float(ch_curve['SPEND'].max()) * 1.5
+            max_spend = float(max_spend)
             min_spend = 0.0
             
             slider_key = f"slider_{ch}"
@@ -576,18 +611,6 @@ def main():
             # Calculate percentage of total budget
             pct_of_total = (base_spend / total_baseline * 100) if total_baseline > 0 else 0
             
-            # Get current slider value from session state for zone calculation
-            current_val = st.session_state.get(slider_key, base_spend)
-            
-            # Calculate efficiency zone based on spend relative to gamma (matches chart zones)
-            gamma = params.get('saturation_gamma', 50000)
-            if current_val < gamma * 0.5:
-                zone = "EFFICIENT"
-            elif current_val < gamma * 1.5:
-                zone = "DIMINISHING"
-            else:
-                zone = "SATURATED"
-            
             col_ch, col_zone = st.columns([3, 1])
             with col_ch:
                 st.markdown(
@@ -619,14 +642,6 @@ def main():
             current_allocation[ch] = val
             total_simulated += val
             
-            # Recalculate zone based on actual slider value (for display updates)
-            if val < gamma * 0.5:
-                zone = "EFFICIENT"
-            elif val < gamma * 1.5:
-                zone = "DIMINISHING"
-            else:
-                zone = "SATURATED"
-            
             # Show delta in both $ and % formats
             delta = val - base_spend
             pct_delta = ((val - base_spend) / base_spend * 100) if base_spend > 0 else 0
@@ -682,52 +697,41 @@ def main():
     with col_results:
         st.markdown("### Simulation Results")
         
-        # Calculate revenue predictions with CI
-        baseline_revenue = 0
-        simulated_revenue = 0
-        simulated_ci_lower = 0
-        simulated_ci_upper = 0
-        channel_impacts = []
+        # Calculate revenue predictions with CI (all channels in one batched lookup)
+        sim_spend_vector = np.array([current_allocation[ch] for ch in channels], dtype=float)
+        base_revenue_vector, _, _ = engine.predict(baseline_spend)
+        sim_revenue_vector, sim_ci_lower_vector, sim_ci_upper_vector = engine.predict(sim_spend_vector)
         
-        for ch in channels:
-            ch_curve = df_curves[df_curves['CHANNEL'] == ch].sort_values('SPEND')
-            
-            base_spend = baseline_allocation[ch]
-            sim_spend = current_allocation[ch]
-            
-            base_rev = interpolate_revenue(ch_curve, base_spend)
-            sim_rev, sim_ci_l, sim_ci_u = interpolate_revenue(ch_curve, sim_spend, return_ci=True)
-            
-            baseline_revenue += base_rev
-            simulated_revenue += sim_rev
-            simulated_ci_lower += sim_ci_l
-            simulated_ci_upper += sim_ci_u
-            
-            # Get zone at simulated spend
-            if 'EFFICIENCY_ZONE' in ch_curve.columns:
-                zone_at_spend = ch_curve[ch_curve['SPEND'] <= sim_spend]['EFFICIENCY_ZONE'].iloc[-1] \
-                    if len(ch_curve[ch_curve['SPEND'] <= sim_spend]) > 0 else 'UNKNOWN'
-            else:
-                gamma = channel_params.get(ch, {}).get('saturation_gamma', 50000)
-                if sim_spend < gamma * 0.5:
-                    zone_at_spend = "EFFICIENT"
-                elif sim_spend < gamma * 1.5:
-                    zone_at_spend = "DIMINISHING"
-                else:
-                    zone_at_spend = "SATURATED"
-            
-            channel_impacts.append({
+        baseline_revenue = float(base_revenue_vector.sum())
+        simulated_revenue = float(sim_revenue_vector.sum())
+        
+        # Portfolio band from joint Monte Carlo draws (summing per-channel bounds
+        # would assume perfectly correlated channels and overstate the band)
+        portfolio_mc = get_portfolio_uncertainty(engine, engine_key, df_draws).simulate(
+            sim_revenue_vector, base_revenue_vector
+        )
+        simulated_ci_lower = portfolio_mc['lower']
+        simulated_ci_upper = portfolio_mc['upper']
+        
+        # Get zone and exact marginal ROI at simulated spend
+        sim_zones = zones_at_spend(engine, sim_spend_vector, gammas)
+        sim_mroi_vector = engine.marginal_roi(sim_spend_vector)
+        
+        channel_impacts = [
+            {
                 'Channel': ch,
-                'Baseline Spend': base_spend,
-                'Simulated Spend': sim_spend,
-                'Spend Delta': sim_spend - base_spend,
-                'Baseline Revenue': base_rev,
-                'Simulated Revenue': sim_rev,
-                'Revenue Delta': sim_rev - base_rev,
-                'CI_Lower': sim_ci_l,
-                'CI_Upper': sim_ci_u,
-                'Zone': zone_at_spend
-            })
+                'Baseline Spend': baseline_spend[i],
+                'Simulated Spend': sim_spend_vector[i],
+                'Spend Delta': sim_spend_vector[i] - baseline_spend[i],
+                'Baseline Revenue': base_revenue_vector[i],
+                'Simulated Revenue': sim_revenue_vector[i],
+                'Revenue Delta': sim_revenue_vector[i] - base_revenue_vector[i],
+                'CI_Lower': sim_ci_lower_vector[i],
+                'CI_Upper': sim_ci_upper_vector[i],
+                'Zone': sim_zones[i]
+            }
+            for i, ch in enumerate(channels)
+        ]
         
         # Revenue impact metrics with CI
         rev_delta = simulated_revenue - baseline_revenue
@@ -752,7 +756,13 @@ def main():
             st.metric(
                 "90% CI Range",
                 f"{format_currency_short(simulated_ci_lower)} - {format_currency_short(simulated_ci_upper)}",
-                help="Statistical confidence interval for simulated revenue"
+                help=f"5th-95th percentile of portfolio revenue over {portfolio_mc['n_draws']:,} "
+                     f"Monte Carlo draws of the channel coefficients"
+            )
+            st.markdown(
+                f"<p style='color: rgba(255,255,255,0.6); font-size: 0.7rem; margin-top: -0.5rem;'>"
+                f"P(revenue lift &gt; 0): {portfolio_mc['prob_lift']:.0%}</p>",
+                unsafe_allow_html=True
             )
         with col_m3:
             # Calculate and display ROAS
@@ -772,7 +782,7 @@ def main():
             )
         
         # Efficiency Score
-        efficiency = calculate_efficiency_score(channel_impacts, channel_params)
+        efficiency = calculate_efficiency_score(channels, sim_spend_vector, sim_mroi_vector, sim_zones)
         
         st.markdown("<br>", unsafe_allow_html=True)
         
@@ -863,33 +873,34 @@ def main():
             key="sim_curve_select"
         )
         
-        ch_curve = df_curves[df_curves['CHANNEL'] == selected_channel].sort_values('SPEND')
+        curve_spend, curve_revenue, curve_ci_lower, curve_ci_upper = engine.curve_with_ci(selected_channel)
         ch_params = channel_params.get(selected_channel, {})
         
-        if not ch_curve.empty:
+        if len(curve_spend) > 0:
             fig_curve = go.Figure()
             
             # Add CI band if available
-            if 'PREDICTED_REVENUE_CI_LOWER' in ch_curve.columns:
+            if engine.has_ci:
                 fig_curve = add_confidence_band_to_line_chart(
                     fig_curve,
-                    ch_curve['SPEND'].tolist(),
-                    ch_curve['PREDICTED_REVENUE_CI_LOWER'].fillna(ch_curve['PREDICTED_REVENUE'] * 0.85).tolist(),
-                    ch_curve['PREDICTED_REVENUE_CI_UPPER'].fillna(ch_curve['PREDICTED_REVENUE'] * 1.15).tolist()
+                    curve_spend.tolist(),
+                    curve_ci_lower.tolist(),
+                    curve_ci_upper.tolist()
                 )
             
             # Response curve line
             fig_curve.add_trace(go.Scatter(
-                x=ch_curve['SPEND'],
-                y=ch_curve['PREDICTED_REVENUE'],
+                x=curve_spend,
+                y=curve_revenue,
                 mode='lines',
                 name='Response Curve',
                 line=dict(color=COLOR_PRIMARY, width=3)
             ))
             
             # Baseline point
+            i = engine.position[selected_channel]
             base_spend = baseline_allocation[selected_channel]
-            base_rev = interpolate_revenue(ch_curve, base_spend)
+            base_rev = base_revenue_vector[i]
             fig_curve.add_trace(go.Scatter(
                 x=[base_spend],
                 y=[base_rev],
@@ -900,7 +911,7 @@ def main():
             
             # Simulated point
             sim_spend = current_allocation[selected_channel]
-            sim_rev = interpolate_revenue(ch_curve, sim_spend)
+            sim_rev = sim_revenue_vector[i]
             fig_curve.add_trace(go.Scatter(
                 x=[sim_spend],
                 y=[sim_rev],
@@ -912,9 +923,9 @@ def main():
             fig_curve = apply_plotly_theme(fig_curve)
             
             # Add saturation zone annotation if gamma is available
-            gamma = ch_params.get('saturation_gamma', ch_curve['SPEND'].median())
+            gamma = ch_params.get('saturation_gamma', float(np.median(curve_spend)))
             alpha = ch_params.get('saturation_alpha', 2.5)
-            max_spend = ch_curve['SPEND'].max()
+            max_spend = engine.max_spend[i]
             fig_curve = add_saturation_zone_annotation(fig_curve, gamma, max_spend, alpha=alpha)
             
             fig_curve.update_layout(
@@ -981,6 +992,191 @@ def main():
         exp = get_explanation("marginal_vs_average_roi")
         st.markdown(exp.get("content", ""), unsafe_allow_html=True)
 
+    # --- Scenario Batch Evaluation ---
+    st.markdown("### Scenario Batch Evaluation")
+    with st.expander("Compare many budget scenarios at once", expanded=False):
+        scenario_source = st.radio(
+            "Scenarios",
+            ["Generate grid", "Upload CSV"],
+            horizontal=True,
+            key="scenario_source"
+        )
+        
+        scenario_names, scenario_spend = [], None
+        if scenario_source == "Upload CSV":
+            st.download_button(
+                "Download template (baseline)",
+                scenario_template(channels, baseline_spend).to_csv(index=False),
+                file_name="scenario_template.csv",
+                mime="text/csv"
+            )
+            uploaded = st.file_uploader(
+                "Weekly spend per scenario: SCENARIO + one column per channel, "
+                "or long format SCENARIO, CHANNEL, SPEND (missing channels keep baseline)",
+                type="csv",
+                key="scenario_upload"
+            )
+            if uploaded is not None:
+                try:
+                    scenario_names, scenario_spend = parse_scenario_csv(
+                        pd.read_csv(uploaded), channels, baseline_spend
+                    )
+                except ValueError as e:
+                    st.warning(str(e))
+        else:
+            col_g1, col_g2, col_g3 = st.columns(3)
+            with col_g1:
+                budget_range = st.slider(
+                    "Total budget change (%)", -50, 100, (-20, 20), step=5, key="scenario_budget_range"
+                )
+            with col_g2:
+                budget_step = st.select_slider(
+                    "Budget step (%)", options=[1, 5, 10, 25], value=10, key="scenario_budget_step"
+                )
+            with col_g3:
+                channel_shift = st.select_slider(
+                    "Single-channel shift (±%)", options=[0, 10, 20, 30, 50], value=20,
+                    key="scenario_channel_shift",
+                    help="Adds scenarios that move one channel at a time at every budget level"
+                )
+            budget_changes = np.arange(budget_range[0], budget_range[1] + budget_step / 2, budget_step) / 100
+            shifts = [-channel_shift / 100, channel_shift / 100] if channel_shift else []
+            scenario_names, scenario_spend = scenario_grid(
+                channels, baseline_spend, budget_changes, shifts, slider_max
+            )
+        
+        if scenario_spend is not None and len(scenario_names) > 0:
+            scenario_key = scenario_hash(scenario_names, scenario_spend, channels)
+            df_scenarios = run_scenario_batch(
+                engine, engine_key, scenario_key, scenario_names, scenario_spend, baseline_spend,
+                get_portfolio_uncertainty(engine, engine_key, df_draws)
+            )
+            st.caption(f"{len(df_scenarios):,} scenarios × {len(channels)} channels · batch {scenario_key}")
+            
+            st.dataframe(
+                df_scenarios.assign(PROB_LIFT=df_scenarios['PROB_LIFT'] * 100)
+                    .sort_values('PREDICTED_REVENUE', ascending=False),
+                use_container_width=True,
+                hide_index=True,
+                column_config={
+                    "SCENARIO": st.column_config.TextColumn("Scenario", width="large"),
+                    "TOTAL_SPEND": st.column_config.NumberColumn("Spend", format="$%.0f"),
+                    "SPEND_CHANGE_PCT": st.column_config.NumberColumn("Spend Δ", format="%+.1f%%"),
+                    "PREDICTED_REVENUE": st.column_config.NumberColumn("Revenue", format="$%.0f"),
+                    "REVENUE_CI_LOWER": st.column_config.NumberColumn("CI Low", format="$%.0f"),
+                    "REVENUE_CI_UPPER": st.column_config.NumberColumn("CI High", format="$%.0f"),
+                    "REVENUE_DELTA": st.column_config.NumberColumn("Revenue Δ", format="$%.0f"),
+                    "PROB_LIFT": st.column_config.NumberColumn("P(lift > 0)", format="%.0f%%"),
+                    "ROAS": st.column_config.NumberColumn("ROAS", format="%.2fx"),
+                    "WEIGHTED_MROI": st.column_config.NumberColumn("mROI", format="%.2f"),
+                    "EFFICIENCY_SCORE": st.column_config.ProgressColumn(
+                        "Efficiency", min_value=0, max_value=100, format="%.0f"
+                    )
+                }
+            )
+            
+            # Export: results plus the per-channel spend that produced them
+            df_export = pd.concat(
+                [df_scenarios, pd.DataFrame(scenario_spend, columns=channels)], axis=1
+            )
+            st.download_button(
+                "Export results (CSV)",
+                df_export.to_csv(index=False),
+                file_name=f"scenario_results_{scenario_key}.csv",
+                mime="text/csv"
+            )
+
+    # --- Efficient Frontier ---
+    st.markdown("### Efficient Frontier")
+    with st.expander("Optimal revenue across total budgets", expanded=False):
+        col_f1, col_f2 = st.columns([3, 1])
+        with col_f1:
+            frontier_range = st.slider(
+                "Total budget change (%)", -50, 100, (-50, 100), step=5, key="frontier_range"
+            )
+        with col_f2:
+            frontier_step = st.select_slider(
+                "Step (%)", options=[1, 2, 5, 10], value=1, key="frontier_step"
+            )
+        
+        # Channel floors/caps from the optimizer settings apply; the ±% limit does not
+        # (it would make most of the sweep infeasible)
+        floors = caps = None
+        if channel_bounds is not None:
+            floors = channel_bounds['Min Spend'].fillna(0).to_numpy(dtype=float)
+            caps = channel_bounds['Max Spend'].fillna(np.inf).to_numpy(dtype=float)
+        frontier_lower, frontier_upper = allocation_bounds(baseline_spend, slider_max, None, floors, caps)
+        
+        frontier_changes = np.arange(frontier_range[0], frontier_range[1] + frontier_step / 2, frontier_step) / 100
+        frontier_spend = run_efficient_frontier(
+            engine, engine_key,
+            tuple(total_baseline * (1 + frontier_changes)), tuple(frontier_lower), tuple(frontier_upper)
+        )
+        df_frontier = frontier_table(engine, frontier_changes, frontier_spend, baseline_spend)
+        
+        fig_frontier = go.Figure()
+        fig_frontier.add_trace(go.Scatter(
+            x=df_frontier['TOTAL_BUDGET'],
+            y=df_frontier['OPTIMAL_REVENUE'],
+            mode='lines',
+            name='Optimal allocation',
+            line=dict(color=COLOR_ACCENT, width=3)
+        ))
+        fig_frontier.add_trace(go.Scatter(
+            x=df_frontier['TOTAL_BUDGET'],
+            y=df_frontier['PROPORTIONAL_REVENUE'],
+            mode='lines',
+            name='Current mix, scaled',
+            line=dict(color=COLOR_PRIMARY, width=2, dash='dash')
+        ))
+        fig_frontier.add_trace(go.Scatter(
+            x=df_frontier['TOTAL_BUDGET'],
+            y=df_frontier['MARGINAL_RETURN'],
+            mode='lines',
+            name='Marginal return (right)',
+            line=dict(color=COLOR_WARNING, width=1),
+            yaxis='y2'
+        ))
+        fig_frontier.add_trace(go.Scatter(
+            x=[total_simulated],
+            y=[simulated_revenue],
+            mode='markers',
+            name='Simulated',
+            marker=dict(color=COLOR_ACCENT, size=14, symbol='star')
+        ))
+        fig_frontier = apply_plotly_theme(fig_frontier)
+        fig_frontier.update_layout(
+            title="",
+            xaxis_title="Total Weekly Budget ($)",
+            yaxis_title="Predicted Revenue ($)",
+            yaxis2=dict(title="Marginal return ($ per $)", overlaying='y', side='right', showgrid=False),
+            legend=dict(orientation='h', yanchor='bottom', y=1.02),
+            margin=dict(l=0, r=0, t=30, b=40),
+            height=380
+        )
+        st.plotly_chart(fig_frontier, use_container_width=True, key="sim_efficient_frontier")
+        
+        st.dataframe(
+            df_frontier,
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "BUDGET_CHANGE_PCT": st.column_config.NumberColumn("Budget Δ", format="%+.0f%%"),
+                "TOTAL_BUDGET": st.column_config.NumberColumn("Budget", format="$%.0f"),
+                "OPTIMAL_REVENUE": st.column_config.NumberColumn("Optimal Revenue", format="$%.0f"),
+                "PROPORTIONAL_REVENUE": st.column_config.NumberColumn("Scaled Mix Revenue", format="$%.0f"),
+                "REALLOCATION_GAIN": st.column_config.NumberColumn("Reallocation Gain", format="$%.0f"),
+                "OPTIMAL_ROAS": st.column_config.NumberColumn("ROAS", format="%.2fx"),
+                "MARGINAL_RETURN": st.column_config.NumberColumn("Marginal Return", format="%.2f")
+            }
+        )
+        st.download_button(
+            "Export frontier (CSV)",
+            pd.concat([df_frontier, pd.DataFrame(frontier_spend, columns=channels)], axis=1).to_csv(index=False),
+            file_name="efficient_frontier.csv",
+            mime="text/csv"
+        )
+
     # --- Navigation ---
     st.markdown("<br>", unsafe_allow_html=True)
     st.markdown("---")
@@ -22,7 +22,8 @@ from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from utils.data_loader import run_queries_parallel
+from utils.data_loader import chart_queries
+from utils.data_store import load_shared
 from utils.styling import (
     inject_custom_css,
     render_learn_more_panel,
@@ -59,21 +60,17 @@ st.set_page_config(
 inject_custom_css()
 
 
-@st.cache_data(ttl=300)
-def load_explorer_data(_session):
-    """Load all data for model exploration including enhanced fields."""
-    # Import centralized queries from data_loader
-    from utils.data_loader import QUERIES
-    
-    # Select the queries needed for Model Explorer
-    explorer_queries = {
-        "WEEKLY": QUERIES["WEEKLY"],
-        "CURVES": QUERIES["CURVES"],
-        "RESULTS": QUERIES["RESULTS"],
-        "ROI": QUERIES["ROI"],
-        "METADATA": QUERIES["METADATA"],
-    }
-    return run_queries_parallel(_session, explorer_queries)
+def load_explorer_data(session):
+    """Load all data for model exploration including enhanced fields (shared across pages)."""
+    charts = [
+        "explorer_health",
+        "explorer_trend",
+        "explorer_lag_correlation",
+        "explorer_region_trend",
+        "explorer_region_share",
+        "explorer_channel_correlation",
+    ]
+    return load_shared(session, ["CURVES", "RESULTS", "ROI", "METADATA"] + chart_queries(charts))
 
 
 def render_model_health_card(df_results: pd.DataFrame, df_weekly: pd.DataFrame) -> None:
@@ -168,17 +165,21 @@ def render_model_health_card(df_results: pd.DataFrame, df_weekly: pd.DataFrame)
             st.markdown(f"- [Alert] {issue}")
 
 
-def render_eda_tab(df_weekly: pd.DataFrame):
-    """Render Exploratory Data Analysis tab."""
-    if df_weekly.empty:
+def render_eda_tab(df_agg: pd.DataFrame, df_region: pd.DataFrame, df_channel: pd.DataFrame):
+    """
+    Render Exploratory Data Analysis tab.
+    
+    Args:
+        df_agg: Weekly totals (WEEKLY_BY_WEEK)
+        df_region: Weekly totals by region (WEEKLY_BY_REGION)
+        df_channel: Weekly totals by channel (WEEKLY_BY_CHANNEL)
+    """
+    if df_agg.empty:
         st.info("No weekly data available for analysis.")
         return
     
     st.markdown("### Trends & Seasonality")
     
-    # Aggregate weekly trends
-    df_agg = df_weekly.groupby('WEEK_START')[['SPEND', 'REVENUE']].sum().reset_index()
-    
     fig_trend = go.Figure()
     fig_trend.add_trace(go.Scatter(
         x=df_agg['WEEK_START'],
@@ -256,15 +257,14 @@ def render_eda_tab(df_weekly: pd.DataFrame):
         st.plotly_chart(fig_lag, use_container_width=True, key="eda_lag_corr")
     
     # Regional breakdown
-    if 'REGION' in df_weekly.columns:
+    if not df_region.empty:
         st.markdown("### Regional Performance")
         
         col1, col2 = st.columns(2)
         
         with col1:
-            df_reg = df_weekly.groupby(['WEEK_START', 'REGION'])['REVENUE'].sum().reset_index()
             fig_reg = px.line(
-                df_reg, x='WEEK_START', y='REVENUE', color='REGION',
+                df_region, x='WEEK_START', y='REVENUE', color='REGION',
                 title="Revenue by Region Over Time"
             )
             fig_reg = apply_plotly_theme(fig_reg)
@@ -272,7 +272,7 @@ def render_eda_tab(df_weekly: pd.DataFrame):
             st.plotly_chart(fig_reg, use_container_width=True, key="eda_regional")
         
         with col2:
-            df_reg_total = df_weekly.groupby('REGION')[['SPEND', 'REVENUE']].sum().reset_index()
+            df_reg_total = df_region.groupby('REGION', observed=True)[['SPEND', 'REVENUE']].sum().reset_index()
             fig_pie = px.pie(
                 df_reg_total, values='REVENUE', names='REGION',
                 title="Revenue Distribution by Region"
@@ -284,14 +284,14 @@ def render_eda_tab(df_weekly: pd.DataFrame):
     # Correlation analysis
     st.markdown("### Correlation Analysis")
     
-    if 'CHANNEL' in df_weekly.columns:
-        pivot_spend = df_weekly.pivot_table(
-            index='WEEK_START', columns='CHANNEL', values='SPEND', aggfunc='sum'
+    if not df_channel.empty:
+        pivot_spend = df_channel.dropna(subset=['CHANNEL']).pivot(
+            index='WEEK_START', columns='CHANNEL', values='SPEND'
         ).fillna(0)
     else:
-        pivot_spend = df_weekly[['WEEK_START', 'SPEND']].set_index('WEEK_START')
+        pivot_spend = df_agg[['WEEK_START', 'SPEND']].set_index('WEEK_START')
     
-    target = df_weekly.groupby('WEEK_START')['REVENUE'].sum()
+    target = df_agg.set_index('WEEK_START')['REVENUE']
     df_corr = pivot_spend.join(target).dropna()
     corr_matrix = df_corr.corr()
     
@@ -1090,7 +1090,9 @@ def main():
     
     with st.spinner("Loading model data..."):
         data = load_explorer_data(session)
-        df_weekly = data.get("WEEKLY", pd.DataFrame())
+        df_weekly = data.get("WEEKLY_BY_WEEK", pd.DataFrame())
+        df_weekly_region = data.get("WEEKLY_BY_REGION", pd.DataFrame())
+        df_weekly_channel = data.get("WEEKLY_BY_CHANNEL", pd.DataFrame())
         df_curves = data.get("CURVES", pd.DataFrame())
         df_results = data.get("RESULTS", pd.DataFrame())
         df_roi = data.get("ROI", pd.DataFrame())
@@ -1132,7 +1134,7 @@ def main():
         render_diagnostics_tab(df_results, df_weekly)
     
     with tab_eda:
-        render_eda_tab(df_weekly)
+        render_eda_tab(df_weekly, df_weekly_region, df_weekly_channel)
     
     with tab_curves:
         render_curves_tab(df_curves, df_results)
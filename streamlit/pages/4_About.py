@@ -363,7 +363,7 @@ def main():
         </tr>
         <tr style="border-bottom: 1px solid #f0f0f0;">
             <td style="padding: 0.75rem; color: #333;">Nevergrad Optimization</td>
-            <td style="padding: 0.75rem; color: #555;">TwoPointsDE (500 iterations)</td>
+            <td style="padding: 0.75rem; color: #555;">TwoPointsDE (2000 iterations)</td>
             <td style="padding: 0.75rem; color: #555;">Finds optimal θ, α, γ per channel</td>
         </tr>
         <tr style="border-bottom: 1px solid #f0f0f0;">
@@ -467,8 +467,8 @@ def main():
 config = MMMConfig(
     geo_level="SUPER_REGION",      # Granularity: SUPER_REGION | REGION | COUNTRY
     product_level="SEGMENT",       # Granularity: SEGMENT | DIVISION | CATEGORY
-    nevergrad_budget=500,          # Evolutionary optimization iterations
-    n_bootstrap=100,               # Bootstrap samples for CI
+    nevergrad_budget=2000,         # Evolutionary optimization iterations
+    n_bootstrap=1000,              # Bootstrap samples for CI
     confidence_level=0.90,         # 90% confidence intervals
     cv_train_weeks=52,             # 1-year rolling training window
     cv_test_weeks=13,              # 1-quarter holdout for validation
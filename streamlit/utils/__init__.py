@@ -4,7 +4,23 @@ MMM ROI Engine Utilities
 Shared utilities for data loading, styling, Cortex AI integration, and educational content.
 """
 
-from utils.data_loader import run_queries_parallel
+from utils.data_loader import run_queries_parallel, invalidate_cache
+from utils.data_store import DataStore, load_shared, clear_shared
+from utils.curve_index import CurveIndex
+from utils.response_model import ResponseModel
+from utils.uncertainty import PortfolioUncertainty
+from utils.scenarios import (
+    scenario_hash,
+    parse_scenario_csv,
+    scenario_grid,
+    evaluate_scenarios
+)
+from utils.budget_optimizer import (
+    optimize_allocation,
+    optimize_response,
+    allocation_bounds,
+    InfeasibleBudgetError
+)
 from utils.styling import (
     inject_custom_css,
     render_persona_card,
@@ -58,6 +74,23 @@ from utils.explanations import (
 __all__ = [
     # Data loading
     'run_queries_parallel',
+    'invalidate_cache',
+    'DataStore',
+    'load_shared',
+    'clear_shared',
+    
+    # Response engines & budget optimizer
+    'CurveIndex',
+    'ResponseModel',
+    'PortfolioUncertainty',
+    'scenario_hash',
+    'parse_scenario_csv',
+    'scenario_grid',
+    'evaluate_scenarios',
+    'optimize_allocation',
+    'optimize_response',
+    'allocation_bounds',
+    'InfeasibleBudgetError',
     
     # Styling - Core
     'inject_custom_css',
@@ -0,0 +1,506 @@
+"""
+Budget Optimizer for the Budget Simulator.
+
+Finds the revenue-maximizing weekly allocation for a total budget with
+per-channel floors and caps, over the same function the simulator uses to
+predict revenue.
+
+Parametric engine (ResponseModel): optimize_response() equalizes the exact
+marginal ROI coef · hill'(s / (1 - θ)) / (1 - θ) across channels, as the
+water-filling solver in mmm/budget.py does (the app deploys without the mmm
+package). For a price λ each channel spends where its marginal ROI falls to λ
+on the decreasing branch past the Hill inflection, or stays at its floor when
+that earns more; λ is bisected until the budget is spent. This is exact for
+concave curves. For S-shaped curves a local search then switches channels on
+(past the inflection) or off (at the floor) one at a time, and pairwise
+transfers between channels polish the result; that optimum is local.
+
+Curves-table engine (CurveIndex): the simulator predicts revenue by linear
+interpolation on each curve, so optimize_allocation() optimizes exactly that
+function. Each channel's curve is restricted to its [floor, cap] range and
+replaced by its upper concave hull; the hull segments of all channels are then
+filled in order of slope (marginal ROI) until the budget is spent. For concave
+curves this is the exact optimum. For S-shaped curves at most one channel ends
+part-way along a hull chord, the usual equal-marginal-ROI answer.
+
+Both run in NumPy in milliseconds. response_frontier() solves a whole sweep
+of total budgets in one vectorized pass. For the curves, efficient_frontier()
+sorts the hull segments once and reads the optimum for every budget off the
+same cumulative fill, since the fill order does not depend on the budget.
+"""
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+# Bisection steps for the price λ (in log space) and, per price, for each channel's
+# tangency spend (warm-started inside the fill, from scratch in _tangency)
+PRICE_STEPS = 60
+SPEND_STEPS = 8
+TANGENCY_STEPS = 50
+
+# S-shaped channels tried per round of the on/off local search
+FLIP_CANDIDATES = 4
+
+# Pairwise exchange polish: transfer grid per channel pair, and rounds of it
+EXCHANGE_GRID = 32
+EXCHANGE_ROUNDS = 3
+
+
+class InfeasibleBudgetError(ValueError):
+    """Raised when the floors exceed the budget or the caps cannot absorb it."""
+
+
+def _upper_hull(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Indices of the upper concave hull of points sorted by x (monotone chain)."""
+    hull: List[int] = []
+    for i in range(len(x)):
+        while len(hull) >= 2:
+            a, b = hull[-2], hull[-1]
+            # Drop b if it lies on or below the chord a → i
+            if (y[b] - y[a]) * (x[i] - x[a]) <= (y[i] - y[a]) * (x[b] - x[a]):
+                hull.pop()
+            else:
+                break
+        hull.append(i)
+    return np.asarray(hull, dtype=int)
+
+
+def optimize_allocation(
+    curves: Sequence[tuple],
+    total_budget: float,
+    lower: Sequence[float],
+    upper: Sequence[float]
+) -> np.ndarray:
+    """
+    Maximize total interpolated revenue subject to Σ spend = total_budget.
+
+    Args:
+        curves: Per-channel (spend, revenue) arrays sorted by spend (CurveIndex.curve)
+        total_budget: Weekly budget to allocate
+        lower: Per-channel spend floors
+        upper: Per-channel spend caps
+
+    Returns:
+        Array of recommended weekly spend per channel (same order as curves)
+
+    Raises:
+        InfeasibleBudgetError: if sum(lower) > total_budget or sum(upper) < total_budget
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.maximum(np.asarray(upper, dtype=float), lower)
+    _check_feasible(total_budget, lower, upper)
+
+    seg_channel, seg_width, seg_slope = _hull_segments(curves, lower, upper)
+
+    # Fill the steepest segments first (hull slopes already decrease within a channel)
+    remaining = max(total_budget - lower.sum(), 0.0)
+    take = np.clip(remaining - (np.cumsum(seg_width) - seg_width), 0.0, seg_width)
+
+    spend = lower + np.bincount(seg_channel, weights=take, minlength=len(lower))
+    return np.clip(spend, lower, upper)
+
+
+def efficient_frontier(
+    curves: Sequence[tuple],
+    budgets: Sequence[float],
+    lower: Sequence[float],
+    upper: Sequence[float]
+) -> np.ndarray:
+    """
+    Optimal allocation for every total budget in a sweep.
+
+    Args:
+        curves: Per-channel (spend, revenue) arrays sorted by spend (engine.curve)
+        budgets: Total weekly budgets to solve for
+        lower: Per-channel spend floors
+        upper: Per-channel spend caps
+
+    Returns:
+        Spend per budget, budgets × channels (NaN rows where the budget is
+        infeasible for the bounds)
+    """
+    budgets = np.asarray(budgets, dtype=float)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.maximum(np.asarray(upper, dtype=float), lower)
+    n_ch = len(lower)
+
+    seg_channel, seg_width, _ = _hull_segments(curves, lower, upper)
+    filled = np.cumsum(seg_width)
+    remaining = np.maximum(budgets - lower.sum(), 0.0)
+    n_full = np.searchsorted(filled, remaining, side='right')
+
+    # Warm start: walk the budgets in increasing order, each one adding only the
+    # segments filled since the previous budget (O(segments + budgets × channels))
+    spend = np.empty((len(budgets), n_ch))
+    current, done = lower.copy(), 0
+    for j in np.argsort(remaining, kind='stable'):
+        k = n_full[j]
+        if k > done:
+            current += np.bincount(seg_channel[done:k], weights=seg_width[done:k], minlength=n_ch)
+            done = k
+        spend[j] = current
+        if k < len(seg_width):
+            spend[j, seg_channel[k]] += remaining[j] - (filled[k - 1] if k > 0 else 0.0)
+    spend = np.clip(spend, lower, upper)
+    spend[~_feasible(budgets, lower, upper)] = np.nan
+    return spend
+
+
+def optimize_response(
+    model,
+    total_budget: float,
+    lower: Sequence[float],
+    upper: Sequence[float]
+) -> np.ndarray:
+    """
+    Maximize total ResponseModel revenue subject to Σ spend = total_budget.
+
+    Args:
+        model: ResponseModel (steady-state adstock + Hill per channel)
+        total_budget: Weekly budget to allocate
+        lower: Per-channel spend floors
+        upper: Per-channel spend caps
+
+    Returns:
+        Array of recommended weekly spend per channel (model.channels order)
+
+    Raises:
+        InfeasibleBudgetError: if sum(lower) > total_budget or sum(upper) < total_budget
+    """
+    lower = np.asarray(lower, dtype=float)
+    upper = np.maximum(np.asarray(upper, dtype=float), lower)
+    _check_feasible(total_budget, lower, upper)
+    return _solve_response(model, np.array([float(total_budget)]), lower, upper)[0]
+
+
+def response_frontier(
+    model,
+    budgets: Sequence[float],
+    lower: Sequence[float],
+    upper: Sequence[float]
+) -> np.ndarray:
+    """
+    Optimal ResponseModel allocation for every total budget in a sweep.
+
+    Args:
+        model: ResponseModel (steady-state adstock + Hill per channel)
+        budgets: Total weekly budgets to solve for
+        lower: Per-channel spend floors
+        upper: Per-channel spend caps
+
+    Returns:
+        Spend per budget, budgets × channels (NaN rows where the budget is
+        infeasible for the bounds)
+    """
+    budgets = np.asarray(budgets, dtype=float)
+    lower = np.asarray(lower, dtype=float)
+    upper = np.maximum(np.asarray(upper, dtype=float), lower)
+
+    spend = np.full((len(budgets), len(lower)), np.nan)
+    feasible = _feasible(budgets, lower, upper)
+    if feasible.any():
+        spend[feasible] = _solve_response(model, budgets[feasible], lower, upper)
+    return spend
+
+
+def _feasible(budgets: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Mask of budgets with sum(lower) <= budget <= sum(upper) (bounds per channel or per budget row)."""
+    return (lower.sum(axis=-1) <= budgets * (1 + 1e-9)) & (upper.sum(axis=-1) >= budgets * (1 - 1e-9))
+
+
+def _check_feasible(total_budget: float, lower: np.ndarray, upper: np.ndarray):
+    """Raise InfeasibleBudgetError unless sum(lower) <= total_budget <= sum(upper)."""
+    if lower.sum() > total_budget * (1 + 1e-9):
+        raise InfeasibleBudgetError(
+            f"Channel floors (${lower.sum():,.0f}) exceed the budget (${total_budget:,.0f})"
+        )
+    if upper.sum() < total_budget * (1 - 1e-9):
+        raise InfeasibleBudgetError(
+            f"Channel caps (${upper.sum():,.0f}) cannot absorb the budget (${total_budget:,.0f})"
+        )
+
+
+def _hull_segments(curves: Sequence[tuple], lower: np.ndarray, upper: np.ndarray) -> tuple:
+    """Hull segments of every channel on [floor, cap] as (channel, width, slope), steepest first."""
+    seg_channel, seg_width, seg_slope = [], [], []
+    for i, (spend, revenue) in enumerate(curves):
+        inside = (spend > lower[i]) & (spend < upper[i])
+        x = np.concatenate(([lower[i]], spend[inside], [upper[i]]))
+        y = np.interp(x, spend, revenue)
+        hull = _upper_hull(x, y)
+        width = np.diff(x[hull])
+        keep = width > 0
+        seg_channel.append(np.full(keep.sum(), i))
+        seg_width.append(width[keep])
+        seg_slope.append(np.diff(y[hull])[keep] / width[keep])
+
+    seg_channel = np.concatenate(seg_channel)
+    seg_width = np.concatenate(seg_width)
+    seg_slope = np.concatenate(seg_slope)
+
+    order = np.argsort(-seg_slope, kind='stable')
+    return seg_channel[order], seg_width[order], seg_slope[order]
+
+
+def _revenue(model, spend: np.ndarray, index=None) -> np.ndarray:
+    """ResponseModel revenue at each spend (predict() without the CI bands)."""
+    coef = model.coef if index is None else model.coef[index]
+    return np.maximum(model.saturation(spend, index) * coef, 0.0)
+
+
+def _marginal(model, spend: np.ndarray, index=None) -> np.ndarray:
+    """Marginal ROI of _revenue (0 for channels with a non-positive coefficient)."""
+    coef = model.coef if index is None else model.coef[index]
+    with np.errstate(invalid='ignore'):
+        return np.where(coef > 0, model.marginal_roi(spend, index), 0.0)
+
+
+def _tangency(model, price: np.ndarray, start: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """Largest spend on [start, cap] whose marginal ROI is still >= price (start if none)."""
+    a, b = np.array(start), np.array(upper)
+    for _ in range(TANGENCY_STEPS):
+        mid = (a + b) / 2
+        ok = _marginal(model, mid) >= price
+        a = np.where(ok, mid, a)
+        b = np.where(ok, b, mid)
+    return np.where(_marginal(model, upper) >= price, upper, a)
+
+
+def _fill_response(model, budgets: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> tuple:
+    """
+    Equal-marginal-ROI fill of each budget (one row per budget).
+
+    For a price λ every channel takes the spend maximizing revenue - λ·spend on
+    [floor, cap]: its floor, or the point past the Hill inflection where marginal
+    ROI falls to λ. Total spend falls as λ rises, so log λ is bisected per budget,
+    starting from the all-caps and all-floors allocations, and the budget is met
+    by mixing the allocations on either side of the final λ. Each channel's
+    tangency point stays bracketed by its points at those two prices, so a few
+    bisection steps per price are enough.
+
+    Returns:
+        (spend, price): budgets × channels allocation and the final λ per budget
+    """
+    shape = (len(budgets), len(model.channels))
+    lower = np.broadcast_to(lower, shape)
+    upper = np.broadcast_to(upper, shape)
+    start = np.clip(model.inflection_spend(), lower, upper)  # Marginal ROI falls on [start, cap]
+    floor_revenue = _revenue(model, lower)
+    cap_marginal = _marginal(model, upper)
+
+    # Price bracket: from below every marginal ROI at the caps to above every peak
+    peak = _marginal(model, start + 1e-9 * (upper - start))
+    high = np.max(peak[np.isfinite(peak) & (peak > 0)], initial=1.0) * 2
+    low = np.min(cap_marginal[cap_marginal > 0], initial=high) / 2
+    log_low = np.full((shape[0], 1), np.log(min(low, high * 1e-12)))
+    log_high = np.full((shape[0], 1), np.log(high))
+    above, below = np.array(upper), np.array(lower)
+    # Marginal ROI >= price at tangent_low (or it is start), < price at tangent_high (or it is the cap)
+    tangent_low, tangent_high = start.copy(), np.array(upper)
+
+    for _ in range(PRICE_STEPS):
+        log_mid = (log_low + log_high) / 2
+        price = np.exp(log_mid)
+        a, b = tangent_low, tangent_high
+        for _ in range(SPEND_STEPS):
+            mid = (a + b) / 2
+            ok = _marginal(model, mid) >= price
+            a = np.where(ok, mid, a)
+            b = np.where(ok, b, mid)
+        tangency = np.where(cap_marginal >= price, upper, a)
+        keep = _revenue(model, tangency) - price * tangency >= floor_revenue - price * lower
+        spend = np.where(keep, tangency, lower)
+
+        over = spend.sum(axis=1, keepdims=True) >= budgets[:, None]
+        log_low = np.where(over, log_mid, log_low)
+        log_high = np.where(over, log_high, log_mid)
+        above = np.where(over, spend, above)
+        below = np.where(over, below, spend)
+        tangent_high = np.where(over, b, tangent_high)
+        tangent_low = np.where(over, tangent_low, a)
+
+    gap = above.sum(axis=1) - below.sum(axis=1)
+    mix = np.divide(budgets - below.sum(axis=1), gap, out=np.zeros_like(gap), where=gap > 0)
+    spend = np.clip(below + mix[:, None] * (above - below), lower, upper)
+    return spend, np.exp((log_low + log_high) / 2)[:, 0]
+
+
+def _exchange(model, spend: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> tuple:
+    """
+    Best single transfer between two channels for each row of spend.
+
+    Every ordered pair (i, j) scans moving δ from i to j on a grid over its full
+    range, so a move can switch i off or take j past its convex section at once.
+    The best grid point is refined by bisecting the marginal gain
+    mROI_j(s_j + δ) - mROI_i(s_i - δ) between its grid neighbours.
+
+    Returns:
+        (spend, gain): each row after its best move, and the revenue it adds
+    """
+    n_rows, n_ch = spend.shape
+    src, dst = np.nonzero(~np.eye(n_ch, dtype=bool))
+    s_src, s_dst = spend[:, src], spend[:, dst]
+    room = np.maximum(np.minimum(s_src - lower[:, src], upper[:, dst] - s_dst), 0.0)
+    before = _revenue(model, s_src, src) + _revenue(model, s_dst, dst)
+
+    steps = np.linspace(0.0, 1.0, EXCHANGE_GRID + 1)[:, None]
+    grid = room[:, None, :] * steps  # rows × grid × pairs
+    grid_gain = (
+        _revenue(model, s_src[:, None, :] - grid, src) + _revenue(model, s_dst[:, None, :] + grid, dst)
+        - before[:, None, :]
+    )
+    best = grid_gain.reshape(n_rows, -1).argmax(axis=1)
+    step, pair = np.divmod(best, len(src))
+    rows = np.arange(n_rows)
+
+    # Refine between the neighbouring grid points (marginal gain falls through a local max)
+    steps = steps[:, 0]
+    a = room[rows, pair] * steps[np.maximum(step - 1, 0)]
+    b = room[rows, pair] * steps[np.minimum(step + 1, EXCHANGE_GRID)]
+    i, j = src[pair], dst[pair]
+    for _ in range(TANGENCY_STEPS):
+        mid = (a + b) / 2
+        rising = _marginal(model, spend[rows, j] + mid, j) > _marginal(model, spend[rows, i] - mid, i)
+        a = np.where(rising, mid, a)
+        b = np.where(rising, b, mid)
+    delta = grid[rows, step, pair]
+    refined = (
+        _revenue(model, spend[rows, i] - a, i) + _revenue(model, spend[rows, j] + a, j)
+        - before[rows, pair]
+    )
+    best_gain = grid_gain[rows, step, pair]
+    delta = np.where(refined > best_gain, a, delta)
+    best_gain = np.maximum(refined, best_gain)
+
+    moved = spend.copy()
+    moved[rows, i] -= delta
+    moved[rows, j] += delta
+    return np.clip(moved, lower, upper), best_gain
+
+
+def _solve_response(model, budgets: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    """
+    _fill_response, then a local search over which S-shaped channels are switched on.
+
+    A channel whose floor lies below its Hill inflection is either off (held at
+    its floor) or on (spending on its concave branch, past the inflection). With
+    every channel's mode fixed the problem is concave and the fill is exact, so
+    starting from the modes of the first fill, single-channel mode flips are
+    accepted while they raise revenue. Each round tries the FLIP_CANDIDATES
+    channels whose on/off surplus at the current λ is closest to a tie, always
+    including the channel the first fill left part-way up its convex section.
+    A few rounds of _exchange then polish the result; S-curve optima stay local.
+    """
+    shape = (len(budgets), len(model.channels))
+    lower = np.broadcast_to(lower, shape)
+    upper = np.broadcast_to(upper, shape)
+    on_floor = np.clip(model.inflection_spend(), lower, upper)
+    s_shaped = on_floor > lower
+
+    spend, price = _fill_response(model, budgets, lower, upper)
+    if not s_shaped.any():
+        return spend
+    best_revenue = _revenue(model, spend).sum(axis=1)
+
+    def fill_modes(rows: np.ndarray, on: np.ndarray) -> tuple:
+        mode_lower = np.where(on, on_floor[rows], lower[rows])
+        mode_upper = np.where(s_shaped[rows] & ~on, lower[rows], upper[rows])
+        ok = _feasible(budgets[rows], mode_lower, mode_upper)
+        filled = np.full(mode_lower.shape, np.nan)
+        revenue = np.full(len(rows), -np.inf)
+        mode_price = price[rows].copy()  # Infeasible modes keep the first fill's λ for ranking
+        if ok.any():
+            filled[ok], mode_price[ok] = _fill_response(model, budgets[rows][ok], mode_lower[ok], mode_upper[ok])
+            revenue[ok] = _revenue(model, filled[ok]).sum(axis=1)
+        return filled, revenue, mode_price
+
+    rows = np.arange(shape[0])
+    on = spend >= on_floor
+    partial = (spend > lower) & ~on
+    mode_spend, mode_revenue, mode_price = fill_modes(rows, on)
+    for _ in range(shape[1]):
+        # Flip candidates: S-shaped channels whose on/off surplus r(s) - λ·s is nearest a tie
+        row_price = mode_price[rows][:, None]
+        on_spend = np.where(on[rows], np.nan_to_num(mode_spend[rows]),
+                            _tangency(model, row_price, on_floor[rows], upper[rows]))
+        surplus = (_revenue(model, on_spend) - row_price * on_spend) - (
+            _revenue(model, lower[rows]) - row_price * lower[rows]
+        )
+        closeness = np.where(s_shaped[rows], np.where(partial[rows], -1.0, np.abs(surplus)), np.inf)
+        nearest = np.argsort(closeness, axis=1)[:, :FLIP_CANDIDATES]
+        row_of, channel_of = np.nonzero(np.isfinite(np.take_along_axis(closeness, nearest, axis=1)))
+        if len(row_of) == 0:
+            break
+        channel_of = nearest[row_of, channel_of]
+        flipped = on[rows][row_of]
+        flipped[np.arange(len(row_of)), channel_of] ^= True
+        candidate, candidate_revenue, candidate_price = fill_modes(rows[row_of], flipped)
+
+        # Best improving flip per row (the current modes may be infeasible: -inf revenue)
+        current = mode_revenue[rows][row_of]
+        tolerance = 1e-9 * np.abs(np.nan_to_num(candidate_revenue, neginf=0.0))
+        improves = np.isfinite(candidate_revenue) & (candidate_revenue > current + tolerance)
+        order = np.lexsort((-np.where(improves, candidate_revenue, -np.inf), row_of))
+        first = order[np.r_[True, row_of[order][1:] != row_of[order][:-1]]]
+        pick = np.full(len(rows), -1)
+        pick[row_of[first]] = np.where(improves[first], first, -1)
+        improved = pick >= 0
+        if not improved.any():
+            break
+        moved, chosen = rows[improved], pick[improved]
+        on[moved] = flipped[chosen]
+        mode_spend[moved] = candidate[chosen]
+        mode_revenue[moved] = candidate_revenue[chosen]
+        mode_price[moved] = candidate_price[chosen]
+        rows = moved
+
+    better = mode_revenue > best_revenue
+    spend[better] = mode_spend[better]
+    best_revenue = np.maximum(mode_revenue, best_revenue)
+
+    # Pairwise exchanges reach what one flip can't: several channels switching at
+    # once, or a channel held part-way up its convex section. Re-fill each move's modes.
+    for _ in range(EXCHANGE_ROUNDS):
+        moved, gain = _exchange(model, spend, lower, upper)
+        improved = gain > 1e-9 * np.abs(best_revenue)
+        if not improved.any():
+            break
+        refilled, refilled_revenue, _ = fill_modes(np.nonzero(improved)[0], moved[improved] >= on_floor[improved])
+        moved_revenue = _revenue(model, moved[improved]).sum(axis=1)
+        keep_fill = (refilled_revenue > moved_revenue)[:, None]
+        spend[improved] = np.where(keep_fill, refilled, moved[improved])
+        best_revenue[improved] = np.maximum(refilled_revenue, moved_revenue)
+    return spend
+
+
+def allocation_bounds(
+    baseline: np.ndarray,
+    slider_max: np.ndarray,
+    change_limit: Optional[float] = None,
+    floors: Optional[np.ndarray] = None,
+    caps: Optional[np.ndarray] = None
+) -> tuple:
+    """
+    Combine ±% change limits, explicit floors/caps and the slider range into bounds.
+
+    Args:
+        baseline: Baseline weekly spend per channel
+        slider_max: Largest spend each slider allows
+        change_limit: Max fractional change vs baseline (0.3 = ±30%), None for no limit
+        floors: Optional per-channel minimum spend
+        caps: Optional per-channel maximum spend
+
+    Returns:
+        (lower, upper) arrays
+    """
+    lower = np.zeros_like(baseline, dtype=float)
+    upper = np.asarray(slider_max, dtype=float).copy()
+    if change_limit is not None:
+        lower = np.maximum(lower, baseline * (1 - change_limit))
+        upper = np.minimum(upper, baseline * (1 + change_limit))
+    if floors is not None:
+        lower = np.maximum(lower, floors)
+    if caps is not None:
+        upper = np.minimum(upper, caps)
+    return lower, np.maximum(upper, lower)
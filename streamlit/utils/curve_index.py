@@ -0,0 +1,175 @@
+"""
+Response Curve Index for the Budget Simulator.
+
+Every rerun of the simulator used to filter MMM.RESPONSE_CURVES by channel and
+re-sort it for each slider, result row and quick action. CurveIndex does that
+work once per data load: each channel's curve becomes a row of contiguous
+(channels × points) NumPy arrays sorted by spend, so evaluating the whole
+portfolio at a spend vector is a handful of array operations.
+
+Build it once per curves load and share it across reruns:
+
+    index = CurveIndex.from_frame(df_curves)          # wrap in st.cache_resource
+    revenue, ci_lower, ci_upper = index.interpolate_all(spend_vector)
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+class CurveIndex:
+    """
+    Per-channel response curves packed into (channels × points) arrays.
+
+    Channels with fewer points are padded by repeating their last point, which
+    leaves linear interpolation unchanged. Revenue lookups match np.interp on
+    the individual curve (flat beyond either end) and are floored at 0.
+    """
+
+    def __init__(
+        self,
+        channels: Sequence[str],
+        spend: np.ndarray,
+        revenue: np.ndarray,
+        ci_lower: np.ndarray,
+        ci_upper: np.ndarray,
+        n_points: np.ndarray,
+        zones: Optional[np.ndarray] = None,
+        has_ci: bool = True
+    ):
+        self.channels: List[str] = list(channels)
+        self.position: Dict[str, int] = {ch: i for i, ch in enumerate(self.channels)}
+        self.spend = spend
+        self.revenue = revenue
+        self.ci_lower = ci_lower
+        self.ci_upper = ci_upper
+        self.n_points = n_points
+        self.zones = zones
+        self.has_ci = has_ci  # False when CI bands are the ±15% fallback
+
+        rows = np.arange(len(self.channels))
+        valid = np.arange(spend.shape[1]) < n_points[:, None]
+        self.min_spend = spend[:, 0]
+        self.max_spend = spend[rows, n_points - 1]
+        self.mean_spend = np.where(valid, spend, 0.0).sum(axis=1) / np.maximum(n_points, 1)
+        self.median_spend = np.array([np.median(spend[i, :n_points[i]]) for i in rows])
+
+    @classmethod
+    def from_frame(cls, df_curves: pd.DataFrame) -> "CurveIndex":
+        """
+        Build the index from MMM.RESPONSE_CURVES rows.
+
+        Args:
+            df_curves: Rows with CHANNEL, SPEND, PREDICTED_REVENUE and optionally
+                PREDICTED_REVENUE_CI_LOWER/UPPER and EFFICIENCY_ZONE
+
+        Returns:
+            CurveIndex with channels in order of first appearance
+        """
+        df = df_curves.sort_values(['CHANNEL', 'SPEND'], kind='stable')
+        channels = df_curves['CHANNEL'].unique().tolist()
+        codes = pd.Categorical(df['CHANNEL'], categories=channels).codes
+        counts = np.bincount(codes, minlength=len(channels))
+        width = max(int(counts.max()), 1)
+
+        # Position of each row within its channel (rows are grouped by channel)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        order = np.argsort(codes, kind='stable')
+        codes = codes[order]
+        col = np.arange(len(codes)) - starts[codes]
+
+        def pack(values: np.ndarray) -> np.ndarray:
+            out = np.empty((len(channels), width), dtype=values.dtype)
+            out[codes, col] = values[order]
+            # Pad short curves with their last point
+            pad = np.arange(width) >= counts[:, None]
+            last = out[np.arange(len(channels)), np.maximum(counts - 1, 0)]
+            return np.where(pad, last[:, None], out)
+
+        revenue = df['PREDICTED_REVENUE'].to_numpy(dtype=float)
+        has_ci = 'PREDICTED_REVENUE_CI_LOWER' in df.columns
+        if has_ci:
+            ci_lower = df['PREDICTED_REVENUE_CI_LOWER'].to_numpy(dtype=float)
+            ci_upper = df['PREDICTED_REVENUE_CI_UPPER'].to_numpy(dtype=float)
+            ci_lower = np.where(np.isnan(ci_lower), revenue * 0.85, ci_lower)
+            ci_upper = np.where(np.isnan(ci_upper), revenue * 1.15, ci_upper)
+        else:
+            ci_lower, ci_upper = revenue * 0.85, revenue * 1.15
+
+        zones = pack(df['EFFICIENCY_ZONE'].astype(str).to_numpy(dtype=object)) \
+            if 'EFFICIENCY_ZONE' in df.columns else None
+
+        return cls(
+            channels,
+            spend=pack(df['SPEND'].to_numpy(dtype=float)),
+            revenue=pack(revenue),
+            ci_lower=pack(ci_lower),
+            ci_upper=pack(ci_upper),
+            n_points=counts,
+            zones=zones,
+            has_ci=has_ci
+        )
+
+    def _segments(self, spend_vector: np.ndarray) -> tuple:
+        """Left grid index and interpolation weight per channel for a spend vector (or scenarios × channels)."""
+        s = np.asarray(spend_vector, dtype=float)
+        # Number of grid points at or below each spend (rows are sorted)
+        right = (self.spend <= s[..., None]).sum(axis=-1)
+        left = np.clip(right - 1, 0, self.spend.shape[1] - 1)
+        nxt = np.minimum(left + 1, self.n_points - 1)
+        rows = np.arange(s.shape[-1])
+        x0, x1 = self.spend[rows, left], self.spend[rows, nxt]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            w = np.where(x1 > x0, (s - x0) / (x1 - x0), 0.0)
+        w = np.where(right == 0, 0.0, np.clip(w, 0.0, 1.0))
+        return rows, left, nxt, w, right
+
+    def interpolate_all(self, spend_vector: Sequence[float]) -> tuple:
+        """
+        Revenue and CI bounds for every channel at once.
+
+        Args:
+            spend_vector: Weekly spend per channel, in index channel order
+                (or a scenarios × channels matrix)
+
+        Returns:
+            (revenue, ci_lower, ci_upper) arrays shaped like spend_vector, floored at 0
+        """
+        rows, left, nxt, w, _ = self._segments(spend_vector)
+
+        def lerp(grid: np.ndarray) -> np.ndarray:
+            return np.maximum(grid[rows, left] * (1 - w) + grid[rows, nxt] * w, 0.0)
+
+        return lerp(self.revenue), lerp(self.ci_lower), lerp(self.ci_upper)
+
+    # Same call as ResponseModel.predict so the simulator can use either engine
+    predict = interpolate_all
+
+    def marginal_roi(self, spend_vector: Sequence[float]) -> np.ndarray:
+        """Slope of the interpolated curve at each spend (0 outside the grid)."""
+        rows, left, nxt, _, right = self._segments(spend_vector)
+        dx = self.spend[rows, nxt] - self.spend[rows, left]
+        dy = self.revenue[rows, nxt] - self.revenue[rows, left]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(dx > 0, dy / dx, 0.0)
+        return np.where(right == 0, 0.0, slope)
+
+    def zones_at(self, spend_vector: Sequence[float]) -> List[str]:
+        """EFFICIENCY_ZONE of the last grid point at or below each spend ('UNKNOWN' below the grid)."""
+        if self.zones is None:
+            return ['UNKNOWN'] * len(self.channels)
+        rows, left, _, _, right = self._segments(spend_vector)
+        return np.where(right == 0, 'UNKNOWN', self.zones[rows, left]).tolist()
+
+    def curve(self, channel: str) -> tuple:
+        """(spend, revenue) arrays for one channel, sorted by spend, revenue floored at 0."""
+        i = self.position[channel]
+        n = self.n_points[i]
+        return self.spend[i, :n], np.maximum(self.revenue[i, :n], 0.0)
+
+    def curve_with_ci(self, channel: str) -> tuple:
+        """(spend, revenue, ci_lower, ci_upper) arrays for one channel (unfloored, for charts)."""
+        i = self.position[channel]
+        n = self.n_points[i]
+        return self.spend[i, :n], self.revenue[i, :n], self.ci_lower[i, :n], self.ci_upper[i, :n]
@@ -1,8 +1,20 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
 import time
-from typing import Dict
+from typing import Dict, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    # Without pyarrow results come through Snowpark's to_pandas_batches()
+    pa = None
 
 logger = logging.getLogger("snowflake.connector")
 logger.setLevel(logging.INFO)
@@ -14,6 +26,41 @@ logger.setLevel(logging.INFO)
 DATABASE = "GLOBAL_B2B_MMM"
 
 
+# =============================================================================
+# Weekly Grains - V_MMM_INPUT_WEEKLY pre-aggregated in Snowflake
+# Each chart declares the grain it plots (CHART_GRAINS) and pages load only
+# those QUERIES entries, so a handful of summed columns per week (or per
+# week × region / week × channel) leave Snowflake instead of every column of
+# every week × region × channel row, and pages no longer groupby in pandas.
+# The view is a scan of the materialized DIMENSIONAL.MMM_INPUT_WEEKLY table
+# (sql/06_weekly_input_table.sql), refreshed incrementally as new rows land.
+# =============================================================================
+WEEKLY_VIEW = f"{DATABASE}.DIMENSIONAL.V_MMM_INPUT_WEEKLY"
+WEEKLY_MEASURES = ("SPEND", "REVENUE")
+
+# Grain key → view column (the view keeps its _NAME / _CODE column names)
+WEEKLY_KEY_COLUMNS = {
+    "REGION": "REGION_NAME",
+    "CHANNEL": "CHANNEL_CODE",
+}
+
+WEEKLY_GRAINS = {
+    "WEEKLY_BY_WEEK": ("WEEK_START",),
+    "WEEKLY_BY_REGION": ("WEEK_START", "REGION"),
+    "WEEKLY_BY_CHANNEL": ("WEEK_START", "CHANNEL"),
+}
+
+
+def weekly_grain_query(keys: Sequence[str], measures: Sequence[str] = WEEKLY_MEASURES) -> str:
+    """SQL summing the weekly input measures by the given key columns."""
+    key_list = ", ".join(
+        f"{WEEKLY_KEY_COLUMNS[k]} AS {k}" if k in WEEKLY_KEY_COLUMNS else k for k in keys
+    )
+    positions = ", ".join(str(i + 1) for i in range(len(keys)))
+    sums = ", ".join(f"SUM({m}) AS {m}" for m in measures)
+    return f"SELECT {key_list}, {sums} FROM {WEEKLY_VIEW} GROUP BY {positions} ORDER BY {positions}"
+
+
 # =============================================================================
 # Centralized Query Definitions - Single source of truth for all SQL queries
 # All queries use fully qualified names (DATABASE.SCHEMA.TABLE) for portability
@@ -22,12 +69,27 @@ QUERIES = {
     # Weekly input data for MMM - Note: View is in DIMENSIONAL schema
     "WEEKLY": f"SELECT * FROM {DATABASE}.DIMENSIONAL.V_MMM_INPUT_WEEKLY ORDER BY WEEK_START",
     
+    # Weekly spend/revenue totals at the grains charts plot (see CHART_GRAINS)
+    "WEEKLY_BY_WEEK": weekly_grain_query(WEEKLY_GRAINS["WEEKLY_BY_WEEK"]),
+    "WEEKLY_BY_REGION": weekly_grain_query(WEEKLY_GRAINS["WEEKLY_BY_REGION"]),
+    "WEEKLY_BY_CHANNEL": weekly_grain_query(WEEKLY_GRAINS["WEEKLY_BY_CHANNEL"]),
+    
     # Response curves from model training
     "CURVES": f"SELECT * FROM {DATABASE}.MMM.RESPONSE_CURVES",
     
     # Model results - get all results (MODEL_RESULTS has no CREATED_AT column)
     "RESULTS": f"SELECT * FROM {DATABASE}.MMM.MODEL_RESULTS",
     
+    # Model results with significance / confidence interpretation (latest version)
+    "RESULTS_INTERPRETED": f"SELECT * FROM {DATABASE}.MMM.V_MODEL_RESULTS_INTERPRETED",
+    
+    # Bootstrap coefficient draws for the current model (joint Monte Carlo uncertainty)
+    "BOOTSTRAP_DRAWS": f"""
+        SELECT DRAW_ID, CHANNEL, COEF
+        FROM {DATABASE}.MMM.BOOTSTRAP_DRAWS
+        WHERE MODEL_VERSION IN (SELECT DISTINCT MODEL_VERSION FROM {DATABASE}.MMM.MODEL_RESULTS)
+    """,
+    
     # ROI summary by channel
     "ROI": f"SELECT * FROM {DATABASE}.MMM.V_ROI_BY_CHANNEL",
     
@@ -54,11 +116,360 @@ QUERIES = {
 }
 
 
+# Weekly grain each chart reads; pages load chart_queries([...]) for the charts they draw
+CHART_GRAINS = {
+    "dashboard_trend": "WEEKLY_BY_WEEK",
+    "explorer_health": "WEEKLY_BY_WEEK",
+    "explorer_trend": "WEEKLY_BY_WEEK",
+    "explorer_lag_correlation": "WEEKLY_BY_WEEK",
+    "explorer_region_trend": "WEEKLY_BY_REGION",
+    "explorer_region_share": "WEEKLY_BY_REGION",
+    "explorer_channel_correlation": "WEEKLY_BY_CHANNEL",
+}
+
+
+def chart_queries(charts: Iterable[str]) -> List[str]:
+    """QUERIES names needed to draw the given charts (each grain once)."""
+    return list(dict.fromkeys(CHART_GRAINS[chart] for chart in charts))
+
+
+# =============================================================================
+# Typed Result Schemas
+# Column dtypes per QUERIES entry, applied while fetching (see fetch_frame):
+#   category  label columns (one copy of each string; categories sorted)
+#   float32   chart-only measures (weekly spend/revenue/engagement)
+#   float64   anything feeding the response engines or the optimizer
+#   int32     small integer ids and counts
+#   datetime  DATE / TIMESTAMP columns as datetime64
+#   json      ARRAY / OBJECT / VARIANT columns (JSON text) as Python lists/dicts
+#   string    free-text and id columns left as strings
+# Columns not listed keep the Arrow default (NUMBER with scale becomes float64).
+# =============================================================================
+# Both the V_MMM_INPUT_WEEKLY column names and their model names (REGION_NAME / REGION)
+WEEKLY_LABEL_COLUMNS = (
+    "SUPER_REGION", "REGION", "COUNTRY", "SEGMENT", "DIVISION", "CATEGORY",
+    "CHANNEL", "CHANNEL_TYPE", "CAMPAIGN_OBJECTIVE",
+    "SUPER_REGION_NAME", "REGION_NAME", "COUNTRY_NAME", "SEGMENT_NAME", "DIVISION_NAME",
+    "CATEGORY_NAME", "CHANNEL_CODE",
+)
+WEEKLY_MEASURE_COLUMNS = (
+    "SPEND", "IMPRESSIONS", "CLICKS", "VIDEO_VIEWS", "ENGAGEMENTS", "CTR", "CPM",
+    "REVENUE", "TRANSACTIONS", "PMI_INDEX", "COMPETITOR_SOV", "INDUSTRY_GROWTH", "ROAS",
+    "AVG_PMI", "AVG_COMPETITOR_SOV", "AVG_INDUSTRY_GROWTH",
+)
+
+QUERY_SCHEMAS = {
+    "WEEKLY": {
+        "WEEK_START": "datetime",
+        **dict.fromkeys(WEEKLY_LABEL_COLUMNS, "category"),
+        **dict.fromkeys(WEEKLY_MEASURE_COLUMNS, "float32"),
+    },
+    "WEEKLY_BY_WEEK": {"WEEK_START": "datetime", "SPEND": "float32", "REVENUE": "float32"},
+    "WEEKLY_BY_REGION": {"WEEK_START": "datetime", "REGION": "category", "SPEND": "float32", "REVENUE": "float32"},
+    "WEEKLY_BY_CHANNEL": {"WEEK_START": "datetime", "CHANNEL": "category", "SPEND": "float32", "REVENUE": "float32"},
+    "CURVES": {
+        "MODEL_VERSION": "category",
+        "CHANNEL": "category",
+        "SPEND": "float64",
+        "PREDICTED_REVENUE": "float64",
+        "PREDICTED_REVENUE_CI_LOWER": "float64",
+        "PREDICTED_REVENUE_CI_UPPER": "float64",
+        "MARGINAL_ROI_AT_SPEND": "float64",
+        "EFFICIENCY_ZONE": "category",
+    },
+    "RESULTS": {
+        "MODEL_VERSION": "string",
+        "CHANNEL": "string",
+        "ADSTOCK_DECAY": "float64",
+        "SATURATION_ALPHA": "float64",
+        "SATURATION_GAMMA": "float64",
+        "RESPONSE_COEF": "float64",
+        "RESPONSE_COEF_STD": "float64",
+        "CURRENT_SPEND": "float64",
+        "MAX_WEEKLY_SPEND": "float64",
+    },
+    "RESULTS_INTERPRETED": {"MODEL_VERSION": "string", "CHANNEL": "string"},
+    "BOOTSTRAP_DRAWS": {"DRAW_ID": "int32", "CHANNEL": "string", "COEF": "float64"},
+    "ROI": {"CHANNEL": "string", "TOTAL_SPEND": "float64", "ATTRIBUTED_REVENUE": "float64", "ROAS": "float64"},
+    "METADATA": {"MODEL_VERSION": "string", "MODEL_RUN_DATE": "datetime"},
+    "ROI_REGION": {"CHANNEL": "category", "REGION": "category"},
+    "RESULTS_BY_REGION": {"REGION": "category", "CHANNEL_COUNT": "int32", "CHANNELS": "json"},
+}
+
+_NUMERIC_TYPES = {
+    "float32": pa.float32() if pa else None,
+    "float64": pa.float64() if pa else None,
+    "int32": pa.int32() if pa else None,
+}
+
+
+def _parse_json(value):
+    if isinstance(value, str):
+        return json.loads(value)
+    if value is None or isinstance(value, (list, dict)):
+        return value
+    return list(value)  # Parquet round trip returns arrays
+
+
+def apply_schema(df: pd.DataFrame, schema: Dict[str, str]) -> pd.DataFrame:
+    """
+    Cast a result frame to its schema (columns missing from the frame are skipped).
+    
+    Args:
+        df: Query result
+        schema: Column name to dtype name (see QUERY_SCHEMAS)
+    
+    Returns:
+        The same frame with converted columns
+    """
+    for column, dtype in schema.items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if dtype == "category":
+            if not isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype("category")
+            categories = values.cat.categories
+            if not categories.is_monotonic_increasing:
+                values = values.cat.reorder_categories(categories.sort_values())
+        elif dtype in _NUMERIC_TYPES:
+            if values.dtype != dtype:
+                values = pd.to_numeric(values, errors="coerce")
+                if dtype == "int32" and values.isna().any():
+                    values = values.astype("float64")
+                else:
+                    values = values.astype(dtype)
+        elif dtype == "datetime":
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values, errors="coerce")
+        elif dtype == "json":
+            values = values.map(_parse_json)
+        elif dtype == "string":
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                values = values.astype(object)
+        df[column] = values
+    return df
+
+
+def _cast_arrow(table, schema: Dict[str, str]):
+    """Cast one Arrow batch: numeric downcasts and dictionary-encoded labels."""
+    for i, field in enumerate(table.schema):
+        dtype = schema.get(field.name)
+        column = table.column(i)
+        if dtype in _NUMERIC_TYPES:
+            column = pc.cast(column, _NUMERIC_TYPES[dtype], safe=False)
+        elif dtype == "category" and pa.types.is_string(field.type):
+            column = column.dictionary_encode()
+        elif dtype is None and pa.types.is_decimal(field.type):
+            column = pc.cast(column, pa.float64(), safe=False)
+        else:
+            continue
+        table = table.set_column(i, field.name, column)
+    return table
+
+
+def _fetch_arrow(session, query: str, schema: Dict[str, str]) -> Optional[pd.DataFrame]:
+    """Fetch through the connector's Arrow batches (None when that path is unavailable)."""
+    connection = getattr(session, "connection", None)
+    if pa is None or connection is None:
+        return None
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query)
+        try:
+            batches = [_cast_arrow(batch, schema) for batch in cursor.fetch_arrow_batches()]
+        except Exception as e:
+            # e.g. result returned in JSON format, which has no Arrow batches
+            logger.info(f"[DATA_LOADER] Arrow fetch unavailable: {type(e).__name__}: {e}")
+            return None
+        if not batches:
+            return pd.DataFrame(columns=[col[0] for col in cursor.description or []])
+        table = pa.concat_tables(batches)
+        return table.to_pandas(date_as_object=False, split_blocks=True)
+    finally:
+        cursor.close()
+
+
+def fetch_frame(session, name: str, query: str) -> pd.DataFrame:
+    """
+    Run one query and return its result typed by QUERY_SCHEMAS.
+    
+    Arrow batches are cast in Arrow (float32, dictionary-encoded labels) and
+    converted to pandas once, so label columns never become one Python string
+    per row. Sessions without an Arrow-capable connection use Snowpark's
+    to_pandas_batches(), downcasting each batch as it arrives.
+    
+    Args:
+        session: Snowflake Snowpark session
+        name: QUERIES entry name (selects the schema; unknown names are untyped)
+        query: SQL text
+    
+    Returns:
+        Result DataFrame
+    """
+    schema = QUERY_SCHEMAS.get(name, {})
+    df = _fetch_arrow(session, query, schema)
+    if df is None:
+        numeric = {col: dtype for col, dtype in schema.items() if dtype in _NUMERIC_TYPES}
+        batches = [apply_schema(batch, numeric) for batch in session.sql(query).to_pandas_batches()]
+        df = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame()
+    return apply_schema(df, schema)
+
+
+# =============================================================================
+# Persistent Result Cache
+# Query results are stored as Parquet files keyed by the query text and the
+# last-altered time of the tables it reads, so they survive the 5-minute
+# st.cache_data TTL and app restarts and are served until the data changes
+# (e.g. the training notebook rewrites the MMM tables).
+# =============================================================================
+CACHE_DIR = os.environ.get("MMM_QUERY_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mmm_query_cache"))
+
+# Schemas each query reads (views resolve to their base tables: V_MMM_INPUT_WEEKLY
+# scans DIMENSIONAL.MMM_INPUT_WEEKLY, or ATOMIC directly where
+# 06_weekly_input_table.sql is not deployed). Queries not listed depend on
+# every schema below.
+WEEKLY_SOURCES = ("ATOMIC", "DIMENSIONAL")
+QUERY_SOURCES = {
+    "WEEKLY": WEEKLY_SOURCES,
+    "WEEKLY_BY_WEEK": WEEKLY_SOURCES,
+    "WEEKLY_BY_REGION": WEEKLY_SOURCES,
+    "WEEKLY_BY_CHANNEL": WEEKLY_SOURCES,
+    "CURVES": ("MMM",),
+    "RESULTS": ("MMM",),
+    "RESULTS_INTERPRETED": ("MMM",),
+    "BOOTSTRAP_DRAWS": ("MMM",),
+    "ROI": WEEKLY_SOURCES,
+    "METADATA": ("MMM",),
+    "ROI_REGION": WEEKLY_SOURCES,
+    "RESULTS_BY_REGION": ("MMM",),
+}
+DEFAULT_SOURCES = ("ATOMIC", "MMM")
+
+# One metadata round-trip gives the data version of every schema; MODEL_VERSION
+# is included so a retrain is detected even within one LAST_ALTERED tick
+SOURCE_VERSION_QUERY = f"""
+    SELECT TABLE_SCHEMA, TO_VARCHAR(MAX(LAST_ALTERED)) AS LAST_ALTERED, COUNT(*) AS N_TABLES
+    FROM {DATABASE}.INFORMATION_SCHEMA.TABLES
+    WHERE TABLE_TYPE = 'BASE TABLE'
+    GROUP BY TABLE_SCHEMA
+"""
+MODEL_VERSION_QUERY = f"SELECT MAX(MODEL_VERSION) AS MODEL_VERSION FROM {DATABASE}.MMM.MODEL_METADATA"
+
+# Seconds a fetched set of source versions is trusted before checking again
+SOURCE_VERSION_TTL = 60
+
+_source_versions: Dict[str, str] = {}
+_source_versions_at = 0.0
+_source_versions_lock = threading.Lock()
+
+
+def get_source_versions(session, max_age: float = SOURCE_VERSION_TTL) -> Dict[str, str]:
+    """
+    Current data version per schema ({} if the metadata query fails).
+    
+    Args:
+        session: Snowflake Snowpark session
+        max_age: Reuse the last lookup if it is younger than this many seconds
+    
+    Returns:
+        Dict mapping schema name to a version string (last-altered time, table
+        count and, for MMM, the latest MODEL_VERSION)
+    """
+    global _source_versions, _source_versions_at
+    with _source_versions_lock:
+        if _source_versions and time.time() - _source_versions_at < max_age:
+            return dict(_source_versions)
+        try:
+            rows = session.sql(SOURCE_VERSION_QUERY).collect()
+            versions = {r['TABLE_SCHEMA']: f"{r['LAST_ALTERED']}|{r['N_TABLES']}" for r in rows}
+            try:
+                model_version = session.sql(MODEL_VERSION_QUERY).collect()[0]['MODEL_VERSION']
+                versions["MMM"] = f"{versions.get('MMM', '')}|{model_version}"
+            except Exception as e:
+                logger.info(f"[DATA_LOADER] No MODEL_VERSION for cache key: {type(e).__name__}")
+        except Exception as e:
+            logger.error(f"[DATA_LOADER] Source version lookup FAILED: {type(e).__name__}: {e}")
+            return {}
+        _source_versions, _source_versions_at = versions, time.time()
+        return dict(versions)
+
+
+def query_version(name: str, query: str, versions: Dict[str, str]) -> str:
+    """Short hash of a query's text and the current version of its source schemas."""
+    sources = QUERY_SOURCES.get(name, DEFAULT_SOURCES)
+    key = "\x1f".join([query] + [f"{src}={versions.get(src, '')}" for src in sources])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+
+def _cache_path(name: str, query: str, versions: Dict[str, str]) -> str:
+    """Parquet file for a query at the current version of its source schemas."""
+    return os.path.join(CACHE_DIR, f"{name}__{query_version(name, query, versions)}.parquet")
+
+
+def _read_cached(path: str) -> Optional[pd.DataFrame]:
+    try:
+        name = os.path.basename(path).split("__")[0]
+        return apply_schema(pd.read_parquet(path), QUERY_SCHEMAS.get(name, {}))
+    except (ImportError, OSError, ValueError) as e:
+        logger.info(f"[DATA_LOADER] Cache read skipped for {os.path.basename(path)}: {type(e).__name__}")
+        return None
+
+
+def _write_cached(name: str, path: str, df: pd.DataFrame):
+    """Write a result atomically and drop older versions of the same query."""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        # Optional layer: missing pyarrow, read-only disk or unsupported column types
+        logger.info(f"[DATA_LOADER] Cache write skipped for '{name}': {type(e).__name__}: {e}")
+        return
+    for entry in os.listdir(CACHE_DIR):
+        stale = os.path.join(CACHE_DIR, entry)
+        if entry.startswith(f"{name}__") and entry.endswith(".parquet") and stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def invalidate_cache(names: Optional[Iterable[str]] = None) -> int:
+    """
+    Drop persistent cache entries and force a fresh source-version lookup.
+    
+    Args:
+        names: Query names to drop (None for every entry)
+    
+    Returns:
+        Number of cache files removed
+    """
+    global _source_versions_at
+    with _source_versions_lock:
+        _source_versions_at = 0.0
+    if not os.path.isdir(CACHE_DIR):
+        return 0
+    prefixes = None if names is None else tuple(f"{n}__" for n in names)
+    removed = 0
+    for entry in os.listdir(CACHE_DIR):
+        if entry.endswith(".parquet") and (prefixes is None or entry.startswith(prefixes)):
+            try:
+                os.remove(os.path.join(CACHE_DIR, entry))
+                removed += 1
+            except OSError:
+                pass
+    logger.info(f"[DATA_LOADER] Invalidated {removed} cache entries")
+    return removed
+
+
 def run_queries_parallel(
     session,
     queries: Dict[str, str],
     max_workers: int = 4,
-    return_empty_on_error: bool = True
+    return_empty_on_error: bool = True,
+    use_cache: bool = True
 ) -> Dict[str, pd.DataFrame]:
     """
     Execute multiple independent SQL queries in parallel.
@@ -68,6 +479,8 @@ def run_queries_parallel(
         queries: Dict mapping names to SQL strings
         max_workers: Max concurrent queries (4 recommended for Snowflake)
         return_empty_on_error: Return empty DataFrame on failure vs raise
+        use_cache: Serve results from the persistent Parquet cache while the
+            source tables are unchanged (see get_source_versions)
     
     Returns:
         Dict mapping query names to result DataFrames
@@ -76,6 +489,22 @@ def run_queries_parallel(
         logger.info("[DATA_LOADER] No queries provided")
         return {}
     
+    cached: Dict[str, pd.DataFrame] = {}
+    cache_paths: Dict[str, str] = {}
+    if use_cache:
+        versions = get_source_versions(session)
+        if versions:
+            for name, query in queries.items():
+                cache_paths[name] = _cache_path(name, query, versions)
+                df = _read_cached(cache_paths[name]) if os.path.exists(cache_paths[name]) else None
+                if df is not None:
+                    cached[name] = df
+            if cached:
+                logger.info(f"[DATA_LOADER] Cache hits: {sorted(cached)}")
+            queries = {name: q for name, q in queries.items() if name not in cached}
+            if not queries:
+                return cached
+    
     logger.info(f"[DATA_LOADER] Starting parallel execution of {len(queries)} queries")
     for name, query in queries.items():
         logger.info(f"[DATA_LOADER] Query '{name}': {query[:100]}...")
@@ -86,8 +515,10 @@ def run_queries_parallel(
     def execute_query(name: str, query: str) -> tuple:
         try:
             logger.info(f"[DATA_LOADER] Executing query '{name}'")
-            df = session.sql(query).to_pandas()
+            df = fetch_frame(session, name, query)
             logger.info(f"[DATA_LOADER] Query '{name}' returned {len(df)} rows, columns: {list(df.columns)}")
+            if name in cache_paths:
+                _write_cached(name, cache_paths[name], df)
             return name, df
         except Exception as e:
             logger.error(f"[DATA_LOADER] Query '{name}' FAILED: {type(e).__name__}: {e}")
@@ -119,5 +550,6 @@ def run_queries_parallel(
     for name, df in results.items():
         logger.info(f"[DATA_LOADER] Final result '{name}': {len(df)} rows, empty={df.empty}")
     
+    results.update(cached)
     return results
 
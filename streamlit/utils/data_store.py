@@ -0,0 +1,149 @@
+"""
+Shared Data Store for all pages.
+
+Each page used to load its own copy of the same QUERIES entries (WEEKLY,
+RESULTS, CURVES, ...) under its own st.cache_data key, so moving between the
+persona pages re-ran the queries and kept one DataFrame copy per page. The
+DataStore is a single st.cache_resource object shared by every page and
+session:
+
+    data = load_shared(session, ["WEEKLY", "RESULTS"])    # {name: DataFrame}
+
+Each entry is loaded once per source version (query_version: the query text
+plus the last-altered time of its schemas and, for MMM, the MODEL_VERSION),
+so a retrain reloads only the MMM entries. Concurrent requests for an entry
+that is already loading wait for that load instead of querying again.
+
+Pages receive shallow copies with copy-on-write enabled (always on from
+pandas 3): the arrays are shared until a page writes, and any write, in-place
+.loc / .iloc / inplace=True included, copies the affected data first, so one
+page's edits never reach the frame other pages and sessions read.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Iterable
+
+import pandas as pd
+import streamlit as st
+
+from utils.data_loader import QUERIES, get_source_versions, query_version, run_queries_parallel
+
+logger = logging.getLogger("snowflake.connector")
+
+# Shared frames are handed out as shallow copies; copy-on-write keeps page
+# writes off the stored data (pandas 2.x needs it switched on)
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+# Seconds before an entry is reloaded when its source version is unknown
+# (metadata lookup failed) or its query came back empty (failed or no rows yet)
+STORE_TTL = 300
+
+
+class DataStore:
+    """
+    Process-wide cache of QUERIES results, one version per entry.
+
+    Use get_data_store() for the shared instance; load() returns
+    {name: DataFrame} views.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, tuple] = {}        # name -> (version, loaded_at, DataFrame)
+        self._pending: Dict[tuple, Future] = {}     # (name, version) -> load in flight
+
+    def _version(self, name: str, versions: Dict[str, str]) -> str:
+        if not versions:
+            return f"ttl-{int(time.time() // STORE_TTL)}"
+        return query_version(name, QUERIES[name], versions)
+
+    def _is_fresh(self, name: str, version: str) -> bool:
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != version:
+            return False
+        return not entry[2].empty or time.time() - entry[1] < STORE_TTL
+
+    def load(self, session, names: Iterable[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Shared results for named QUERIES entries.
+
+        Args:
+            session: Snowflake Snowpark session
+            names: Keys of QUERIES to load
+
+        Returns:
+            Dict mapping each name to a copy-on-write shallow copy of its
+            DataFrame (empty DataFrame if the query failed)
+
+        Raises:
+            KeyError: if a name is not in QUERIES
+        """
+        names = list(dict.fromkeys(names))
+        unknown = [n for n in names if n not in QUERIES]
+        if unknown:
+            raise KeyError(f"Unknown queries: {', '.join(unknown)}")
+
+        versions = get_source_versions(session)
+        wanted = {name: self._version(name, versions) for name in names}
+        frames: Dict[str, pd.DataFrame] = {}
+        waiting: Dict[str, Future] = {}
+        owned: Dict[str, Future] = {}
+
+        with self._lock:
+            for name, version in wanted.items():
+                if self._is_fresh(name, version):
+                    frames[name] = self._entries[name][2]
+                    continue
+                future = self._pending.get((name, version))
+                if future is None:
+                    future = self._pending[(name, version)] = owned[name] = Future()
+                waiting[name] = future
+
+        if owned:
+            logger.info(f"[DATA_STORE] Loading {sorted(owned)}; shared: {sorted(frames)}")
+            try:
+                results = run_queries_parallel(session, {name: QUERIES[name] for name in owned})
+            except BaseException as e:
+                with self._lock:
+                    for name, future in owned.items():
+                        self._pending.pop((name, wanted[name]), None)
+                        future.set_exception(e)
+                raise
+            with self._lock:
+                for name, future in owned.items():
+                    df = results.get(name, pd.DataFrame())
+                    self._entries[name] = (wanted[name], time.time(), df)
+                    self._pending.pop((name, wanted[name]), None)
+                    future.set_result(df)
+
+        for name, future in waiting.items():
+            frames[name] = future.result()
+        return {name: frames[name].copy(deep=False) for name in names}
+
+    def clear(self, names: Iterable[str] = None):
+        """Drop stored entries (all of them when names is None); loads in flight finish normally."""
+        with self._lock:
+            if names is None:
+                self._entries.clear()
+            else:
+                for name in names:
+                    self._entries.pop(name, None)
+
+
+@st.cache_resource(show_spinner=False)
+def get_data_store() -> DataStore:
+    """The DataStore shared by every page and session of this app process."""
+    return DataStore()
+
+
+def load_shared(session, names: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """Load named QUERIES entries through the shared DataStore (see DataStore.load)."""
+    return get_data_store().load(session, names)
+
+
+def clear_shared(names: Iterable[str] = None):
+    """Drop shared entries so the next load_shared() queries them again."""
+    get_data_store().clear(names)
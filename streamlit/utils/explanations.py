@@ -240,7 +240,7 @@ EXPLANATIONS = {
             <br><br>
             <strong>How it works:</strong>
             <ol>
-                <li>Randomly resample the data with replacement (100 times)</li>
+                <li>Randomly resample the data with replacement (1,000 times)</li>
                 <li>Re-fit the model on each "fake" dataset</li>
                 <li>Collect the distribution of ROI estimates</li>
                 <li>5th and 95th percentiles → 90% confidence interval</li>
@@ -401,7 +401,7 @@ EXPLANATIONS = {
                 <li>Start with population of candidate parameter sets</li>
                 <li>Evaluate each by fitting Ridge and measuring error</li>
                 <li>Breed best performers, mutate, repeat</li>
-                <li>After 500 iterations, return best parameters found</li>
+                <li>After 2000 iterations, return best parameters found</li>
             </ol>
             This finds near-optimal parameters without gradient computation.
         """,
@@ -0,0 +1,201 @@
+"""
+Parametric Response Model for the Budget Simulator.
+
+Evaluates each channel's steady-state response directly from the learned
+MMM.MODEL_RESULTS parameters instead of interpolating MMM.RESPONSE_CURVES.
+A channel held at weekly spend s settles at adstock s / (1 - θ), so
+
+    revenue(s) = coef · hill(s / (1 - θ); α, γ)
+    mROI(s)    = coef · hill'(s / (1 - θ); α, γ) / (1 - θ)
+    CI(s)      = hill(·) · [max(0, coef - z·std), coef + z·std]
+
+the same formulas the training pipeline uses to write the curves table
+(mmm/curves.py), so results agree with the curves at every grid point and
+are exact in between and beyond them. All methods take a spend vector in
+channel order (or a scenarios × channels matrix) and evaluate every channel
+in one NumPy pass, so thousands of channel keys need only one row each.
+"""
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Marginal-ROI thresholds for EFFICIENCY_ZONE (as in mmm/curves.py)
+EFFICIENT_MROI = 1.5
+SATURATED_MROI = 0.8
+
+# z-score for the 90% CI bands
+CI_Z = 1.645
+
+# Weeks in the training window when MODEL_RESULTS has no N_OBSERVATIONS
+DEFAULT_WEEKS = 260
+
+
+class ResponseModel:
+    """
+    Vectorized steady-state adstock + Hill response for a set of channels.
+
+    Build with ResponseModel.from_results(df_results); every array attribute
+    is indexed by position in .channels.
+    """
+
+    def __init__(
+        self,
+        channels: Sequence[str],
+        theta: np.ndarray,
+        alpha: np.ndarray,
+        gamma: np.ndarray,
+        coef: np.ndarray,
+        coef_std: np.ndarray,
+        baseline_spend: np.ndarray,
+        max_spend: np.ndarray
+    ):
+        self.channels: List[str] = list(channels)
+        self.position: Dict[str, int] = {ch: i for i, ch in enumerate(self.channels)}
+        self.theta = np.clip(np.asarray(theta, dtype=float), 0.0, 0.999999)
+        self.alpha = np.asarray(alpha, dtype=float)
+        self.gamma = np.maximum(np.asarray(gamma, dtype=float), 1e-10)
+        self.coef = np.asarray(coef, dtype=float)
+        self.coef_std = np.asarray(coef_std, dtype=float)
+        self.baseline_spend = np.asarray(baseline_spend, dtype=float)
+        self.max_spend = np.asarray(max_spend, dtype=float)  # Same span as the curves table
+        self.mean_spend = self.baseline_spend
+        self.has_ci = True
+
+        self._carry = 1 / (1 - self.theta)
+        self._gamma_alpha = self.gamma ** self.alpha
+
+    @classmethod
+    def from_results(cls, df_results: pd.DataFrame) -> Optional["ResponseModel"]:
+        """
+        Build the model from MMM.MODEL_RESULTS rows.
+
+        Args:
+            df_results: One row per CHANNEL with ADSTOCK_DECAY, SATURATION_ALPHA,
+                SATURATION_GAMMA and RESPONSE_COEF / RESPONSE_COEF_STD (COEFF_WEIGHT
+                with a 15% std for tables written before those columns existed)
+
+        Returns:
+            ResponseModel, or None if the learned parameters are missing
+        """
+        required = {'CHANNEL', 'ADSTOCK_DECAY', 'SATURATION_ALPHA', 'SATURATION_GAMMA', 'CURRENT_SPEND'}
+        if df_results.empty or not required.issubset(df_results.columns):
+            return None
+
+        df = df_results.drop_duplicates('CHANNEL')
+
+        def column(name: str, default) -> np.ndarray:
+            if name in df.columns:
+                return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+            return np.broadcast_to(np.asarray(default, dtype=float), len(df)).copy()
+
+        coef = column('RESPONSE_COEF', np.nan)
+        coef = np.where(np.isnan(coef), column('COEFF_WEIGHT', 0.0), coef)
+        coef_std = column('RESPONSE_COEF_STD', np.nan)
+        coef_std = np.where(np.isnan(coef_std), np.abs(coef) * 0.15, coef_std)
+
+        weeks = column('N_OBSERVATIONS', DEFAULT_WEEKS)
+        weeks = np.where(np.nan_to_num(weeks) > 0, weeks, DEFAULT_WEEKS)
+        baseline = np.nan_to_num(column('CURRENT_SPEND', 0.0)) / weeks
+
+        # Curves span 0 to 3× the largest weekly spend; without it, use 3× twice the average
+        max_weekly = column('MAX_WEEKLY_SPEND', np.nan)
+        max_weekly = np.where(np.isnan(max_weekly) | (max_weekly <= 0), baseline * 2, max_weekly)
+
+        return cls(
+            channels=df['CHANNEL'].astype(str).tolist(),
+            theta=np.nan_to_num(column('ADSTOCK_DECAY', 0.0)),
+            alpha=np.nan_to_num(column('SATURATION_ALPHA', 1.0), nan=1.0),
+            gamma=np.nan_to_num(column('SATURATION_GAMMA', 1.0), nan=1.0),
+            coef=np.nan_to_num(coef),
+            coef_std=np.nan_to_num(coef_std),
+            baseline_spend=baseline,
+            max_spend=max_weekly * 3
+        )
+
+    def saturation(self, spend, index=None) -> np.ndarray:
+        """
+        Hill saturation (0-1) of the steady-state adstock at each weekly spend.
+
+        index gives the channel position of each entry along spend's last axis
+        (default: every channel in order).
+        """
+        carry, alpha, gamma_alpha = self._select(index, self._carry, self.alpha, self._gamma_alpha)
+        x = np.maximum(np.asarray(spend, dtype=float), 0.0) * carry
+        x_alpha = x ** alpha
+        return x_alpha / (x_alpha + gamma_alpha)
+
+    def predict(self, spend) -> tuple:
+        """
+        Weekly revenue and 90% CI bounds at each spend.
+
+        Args:
+            spend: Weekly spend per channel (channels,) or (scenarios × channels)
+
+        Returns:
+            (revenue, ci_lower, ci_upper) arrays shaped like spend, floored at 0
+        """
+        sat = self.saturation(spend)
+        revenue = np.maximum(sat * self.coef, 0.0)
+        ci_lower = np.maximum(sat * np.maximum(0.0, self.coef - CI_Z * self.coef_std), 0.0)
+        ci_upper = np.maximum(sat * (self.coef + CI_Z * self.coef_std), 0.0)
+        return revenue, ci_lower, ci_upper
+
+    def marginal_roi(self, spend, index=None) -> np.ndarray:
+        """
+        Exact marginal ROI d(revenue)/d(spend) at each weekly spend.
+
+        Uses hill'(x) = α·f·(1 - f) / x. At zero spend the slope is
+        +inf for α < 1, coef / (γ(1 - θ)) for α = 1 and 0 for α > 1.
+        index selects channels as in saturation().
+        """
+        carry, alpha, gamma, coef = self._select(index, self._carry, self.alpha, self.gamma, self.coef)
+        s = np.maximum(np.asarray(spend, dtype=float), 0.0)
+        x = s * carry
+        f = self.saturation(s, index)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = alpha * f * (1 - f) / x
+        at_zero = np.where(alpha < 1, np.inf, np.where(alpha == 1, 1 / gamma, 0.0))
+        return coef * np.where(x > 0, slope, at_zero) * carry
+
+    def inflection_spend(self) -> np.ndarray:
+        """
+        Weekly spend where marginal ROI peaks (0 for α <= 1).
+
+        hill'' = 0 at x^α = γ^α (α - 1) / (α + 1); past it marginal ROI only falls.
+        """
+        ratio = np.clip((self.alpha - 1) / (self.alpha + 1), 0.0, None)
+        return self.gamma * ratio ** (1 / self.alpha) / self._carry
+
+    @staticmethod
+    def _select(index, *arrays) -> tuple:
+        """Per-channel arrays, picked by index when one is given."""
+        return arrays if index is None else tuple(a[index] for a in arrays)
+
+    def zones_at(self, spend) -> List[str]:
+        """EFFICIENCY_ZONE from marginal ROI: EFFICIENT (> 1.5), DIMINISHING (0.8-1.5), SATURATED."""
+        mroi = self.marginal_roi(spend)
+        return np.select(
+            [mroi > EFFICIENT_MROI, mroi >= SATURATED_MROI],
+            ['EFFICIENT', 'DIMINISHING'],
+            default='SATURATED'
+        ).tolist()
+
+    def curve(self, channel: str, n_points: int = 1000, max_spend: Optional[float] = None) -> tuple:
+        """(spend, revenue) grid for one channel, from 0 to max_spend (default: the curves-table span)."""
+        spend, revenue, _, _ = self.curve_with_ci(channel, n_points, max_spend)
+        return spend, revenue
+
+    def curve_with_ci(self, channel: str, n_points: int = 1000, max_spend: Optional[float] = None) -> tuple:
+        """(spend, revenue, ci_lower, ci_upper) grid for one channel."""
+        i = self.position[channel]
+        top = self.max_spend[i] if max_spend is None else max_spend
+        spend = np.linspace(0.0, top, n_points)
+        x_alpha = (spend * self._carry[i]) ** self.alpha[i]
+        sat = x_alpha / (x_alpha + self._gamma_alpha[i])
+        return (
+            spend,
+            np.maximum(sat * self.coef[i], 0.0),
+            sat * max(0.0, self.coef[i] - CI_Z * self.coef_std[i]),
+            sat * (self.coef[i] + CI_Z * self.coef_std[i])
+        )
@@ -0,0 +1,233 @@
+"""
+Batch Scenario Evaluation for the Budget Simulator.
+
+Planners compare many budget scenarios (quarterly plans, regional splits)
+rather than one slider allocation. A batch is an N × channels matrix of weekly
+spend in the response engine's channel order; evaluate_scenarios() scores
+every row in one vectorized pass:
+
+    revenue, CI   engine.predict(matrix)                  (ResponseModel or CurveIndex)
+    mROI, score   engine.marginal_roi(matrix) → spend-weighted efficiency score
+    band, P(lift) PortfolioUncertainty.simulate_batch()    (Monte Carlo, joint draws)
+
+Scenarios come from an uploaded CSV (parse_scenario_csv) or a generated grid
+(scenario_grid); scenario_hash() gives a stable cache key for a batch.
+frontier_table() scores the optimal allocations of a total-budget sweep
+(budget_optimizer.response_frontier / efficient_frontier) against
+proportional scaling.
+"""
+import hashlib
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Efficiency score: weighted marginal ROI of 0.5 → 0, 2.0 → 100 (as on the Simulator page)
+SCORE_MROI_FLOOR = 0.5
+SCORE_MROI_RANGE = 1.5
+
+
+def scenario_hash(names: Sequence[str], spend: np.ndarray, channels: Sequence[str]) -> str:
+    """Stable hash of a scenario batch (names, channel order and spend values)."""
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(channels).encode())
+    digest.update("\x1e".join(names).encode())
+    digest.update(np.ascontiguousarray(spend, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def scenario_template(channels: Sequence[str], baseline: Sequence[float]) -> pd.DataFrame:
+    """One-row wide CSV template (SCENARIO + one column per channel) at the baseline."""
+    template = pd.DataFrame([baseline], columns=list(channels))
+    template.insert(0, 'SCENARIO', 'Baseline')
+    return template
+
+
+def parse_scenario_csv(
+    df: pd.DataFrame,
+    channels: Sequence[str],
+    baseline: Sequence[float]
+) -> tuple:
+    """
+    Turn an uploaded scenario file into a spend matrix.
+
+    Accepts wide files (SCENARIO + one column per channel, weekly spend) or
+    long files (SCENARIO, CHANNEL, SPEND). Channels a scenario leaves out keep
+    their baseline spend.
+
+    Args:
+        df: Uploaded rows
+        channels: Engine channel order
+        baseline: Baseline weekly spend per channel
+
+    Returns:
+        (names, spend) with spend shaped scenarios × channels
+
+    Raises:
+        ValueError: if the file references unknown channels or has negative spend
+    """
+    df = df.rename(columns={c: c.strip() for c in df.columns})
+    upper = {c.upper(): c for c in df.columns}
+
+    if {'SCENARIO', 'CHANNEL', 'SPEND'}.issubset(upper):
+        df = df.pivot_table(index=upper['SCENARIO'], columns=upper['CHANNEL'],
+                            values=upper['SPEND'], aggfunc='sum', sort=False)
+        names = [str(n) for n in df.index]
+    else:
+        if 'SCENARIO' in upper:
+            names = df[upper['SCENARIO']].astype(str).tolist()
+            df = df.drop(columns=upper['SCENARIO'])
+        else:
+            names = [f"Scenario {i + 1}" for i in range(len(df))]
+
+    unknown = [c for c in df.columns if c not in set(channels)]
+    if unknown:
+        raise ValueError(f"Unknown channels in scenario file: {', '.join(map(str, unknown[:5]))}")
+
+    values = df.reindex(columns=list(channels)).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    spend = np.where(np.isnan(values), np.asarray(baseline, dtype=float), values)
+    if (spend < 0).any():
+        raise ValueError("Scenario spend must be non-negative")
+    return names, spend
+
+
+def scenario_grid(
+    channels: Sequence[str],
+    baseline: Sequence[float],
+    budget_changes: Sequence[float],
+    channel_changes: Sequence[float] = (),
+    slider_max: Optional[Sequence[float]] = None
+) -> tuple:
+    """
+    Generated planning grid: total-budget levels × single-channel shifts.
+
+    Each budget change scales the baseline proportionally; each channel
+    change then moves one channel by that fraction (others unchanged).
+
+    Args:
+        channels: Engine channel order
+        baseline: Baseline weekly spend per channel
+        budget_changes: Fractional total-budget changes, e.g. [-0.1, 0, 0.1]
+        channel_changes: Fractional single-channel changes, e.g. [-0.2, 0.2]
+        slider_max: Optional per-channel spend cap
+
+    Returns:
+        (names, spend) with spend shaped scenarios × channels
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    budget_changes = np.asarray(budget_changes, dtype=float)
+    channel_changes = np.asarray([c for c in channel_changes if c != 0], dtype=float)
+    n_ch = len(channels)
+
+    # (budgets, 1 + channels × shifts, channels): unshifted row first, then one channel moved
+    factors = np.ones((1 + n_ch * len(channel_changes), n_ch))
+    shift_rows = np.arange(1, len(factors))
+    factors[shift_rows, np.repeat(np.arange(n_ch), len(channel_changes))] += np.tile(channel_changes, n_ch)
+    spend = (1 + budget_changes)[:, None, None] * factors[None] * baseline
+    if slider_max is not None:
+        spend = np.minimum(spend, np.asarray(slider_max, dtype=float))
+
+    shift_labels = [""] + [f" | {ch} {c:+.0%}" for ch in channels for c in channel_changes]
+    names = [f"Budget {b:+.0%}{label}" for b in budget_changes for label in shift_labels]
+    return names, spend.reshape(-1, n_ch)
+
+
+def efficiency_scores(spend: np.ndarray, marginal_roi: np.ndarray) -> tuple:
+    """Spend-weighted marginal ROI and 0-100 efficiency score per scenario (row)."""
+    total = spend.sum(axis=-1, keepdims=True)
+    weights = np.divide(spend, total, out=np.zeros_like(spend), where=total > 0)
+    weighted_mroi = np.where(weights > 0, weights * marginal_roi, 0.0).sum(axis=-1)
+    score = np.clip((weighted_mroi - SCORE_MROI_FLOOR) / SCORE_MROI_RANGE * 100, 0, 100)
+    return weighted_mroi, np.where(total[..., 0] > 0, score, 0.0)
+
+
+def evaluate_scenarios(
+    engine,
+    names: List[str],
+    spend: np.ndarray,
+    baseline: Sequence[float],
+    uncertainty=None
+) -> pd.DataFrame:
+    """
+    Score every scenario in one vectorized pass.
+
+    Args:
+        engine: Response engine (ResponseModel or CurveIndex)
+        names: Scenario labels
+        spend: Weekly spend, scenarios × channels (engine channel order)
+        baseline: Baseline weekly spend per channel
+        uncertainty: Optional PortfolioUncertainty for Monte Carlo bands;
+            without it the band is the sum of per-channel CI bounds
+
+    Returns:
+        One row per scenario: spend, revenue, 90% CI, revenue delta, ROAS,
+        marginal ROI, efficiency score and P(lift > 0)
+    """
+    spend = np.atleast_2d(np.asarray(spend, dtype=float))
+    baseline = np.asarray(baseline, dtype=float)
+    revenue, ci_lower, ci_upper = engine.predict(spend)
+    base_revenue = engine.predict(baseline)[0]
+    weighted_mroi, score = efficiency_scores(spend, engine.marginal_roi(spend))
+
+    total_spend = spend.sum(axis=1)
+    total_revenue = revenue.sum(axis=1)
+    if uncertainty is not None:
+        bands = uncertainty.simulate_batch(revenue, base_revenue)
+        lower, upper, prob_lift = bands['lower'], bands['upper'], bands['prob_lift']
+    else:
+        lower, upper = ci_lower.sum(axis=1), ci_upper.sum(axis=1)
+        prob_lift = np.full(len(spend), np.nan)
+
+    return pd.DataFrame({
+        'SCENARIO': names,
+        'TOTAL_SPEND': total_spend,
+        'SPEND_CHANGE_PCT': (total_spend / baseline.sum() - 1) * 100 if baseline.sum() > 0 else 0.0,
+        'PREDICTED_REVENUE': total_revenue,
+        'REVENUE_CI_LOWER': lower,
+        'REVENUE_CI_UPPER': upper,
+        'REVENUE_DELTA': total_revenue - base_revenue.sum(),
+        'PROB_LIFT': prob_lift,
+        'ROAS': np.divide(total_revenue, total_spend, out=np.zeros_like(total_revenue), where=total_spend > 0),
+        'WEIGHTED_MROI': weighted_mroi,
+        'EFFICIENCY_SCORE': score
+    })
+
+
+def frontier_table(
+    engine,
+    budget_changes: Sequence[float],
+    optimal_spend: np.ndarray,
+    baseline: Sequence[float]
+) -> pd.DataFrame:
+    """
+    Efficient-frontier table for a total-budget sweep.
+
+    Args:
+        engine: Response engine (ResponseModel or CurveIndex)
+        budget_changes: Fractional total-budget changes vs baseline, ascending
+        optimal_spend: Optimal weekly spend per budget, budgets × channels
+            (NaN rows for infeasible budgets)
+        baseline: Baseline weekly spend per channel
+
+    Returns:
+        One row per budget: optimal and proportionally scaled revenue, the gain
+        from reallocating, ROAS and the marginal return of the total budget
+        (d revenue / d budget along the frontier)
+    """
+    baseline = np.asarray(baseline, dtype=float)
+    changes = np.asarray(budget_changes, dtype=float)
+    budgets = baseline.sum() * (1 + changes)
+    optimal_revenue = engine.predict(np.nan_to_num(optimal_spend))[0].sum(axis=1)
+    optimal_revenue = np.where(np.isnan(optimal_spend).any(axis=1), np.nan, optimal_revenue)
+    proportional_revenue = engine.predict((1 + changes)[:, None] * baseline)[0].sum(axis=1)
+    marginal_return = np.gradient(optimal_revenue, budgets) if len(budgets) > 1 else np.full(len(budgets), np.nan)
+
+    return pd.DataFrame({
+        'BUDGET_CHANGE_PCT': changes * 100,
+        'TOTAL_BUDGET': budgets,
+        'OPTIMAL_REVENUE': optimal_revenue,
+        'PROPORTIONAL_REVENUE': proportional_revenue,
+        'REALLOCATION_GAIN': optimal_revenue - proportional_revenue,
+        'OPTIMAL_ROAS': np.divide(optimal_revenue, budgets, out=np.full(len(budgets), np.nan), where=budgets > 0),
+        'MARGINAL_RETURN': marginal_return
+    })
@@ -0,0 +1,178 @@
+"""
+Monte Carlo Uncertainty for Simulated Portfolio Revenue.
+
+Summing per-channel CI bounds treats every channel as perfectly correlated and
+overstates the portfolio band. Instead, each draw scales every channel's
+response by its own coefficient multiplier (coefficient draw / point
+estimate). Channel revenue is linear in the coefficient, so for D draws and
+C channels
+
+    portfolio revenue = M @ revenue          (D,) with M the (D × C) multipliers
+    revenue lift      = M @ (revenue - baseline_revenue)
+
+and percentile bands and P(lift > 0) come from one matrix-vector product.
+The multipliers depend only on the model, so they are drawn once per model
+load and reused on every slider change (~2 ms for 10k draws × 40 channels).
+
+When the training run's bootstrap draws are available (MMM.BOOTSTRAP_DRAWS),
+from_samples() uses them directly, keeping the correlation between channel
+coefficients; otherwise channels are drawn independently from mean/std.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+# z-score of the stored 90% CI bands (as in utils/response_model.py)
+CI_Z = 1.645
+
+DEFAULT_DRAWS = 10_000
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+
+class PortfolioUncertainty:
+    """
+    Coefficient-multiplier draws for a set of channels.
+
+    Build with PortfolioUncertainty.from_samples(...), .from_normal(...) or
+    .from_engine(engine);
+    columns of .multipliers follow the engine's channel order.
+    """
+
+    def __init__(self, multipliers: np.ndarray):
+        self.multipliers = np.ascontiguousarray(multipliers, dtype=np.float64)
+        self.n_draws, self.n_channels = self.multipliers.shape
+
+    @classmethod
+    def from_normal(
+        cls,
+        relative_std: Sequence[float],
+        n_draws: int = DEFAULT_DRAWS,
+        seed: int = 42
+    ) -> "PortfolioUncertainty":
+        """
+        Independent normal draws with mean 1 and each channel's relative std.
+
+        Args:
+            relative_std: Coefficient std / coefficient, per channel
+            n_draws: Number of Monte Carlo draws
+            seed: Random seed (fixed so bands do not jitter between reruns)
+
+        Returns:
+            PortfolioUncertainty with multipliers floored at 0 (media effects
+            are non-negative, matching the floored CI lower bound)
+        """
+        relative_std = np.asarray(relative_std, dtype=float)
+        rng = np.random.default_rng(seed)
+        draws = 1.0 + rng.standard_normal((n_draws, len(relative_std))) * relative_std
+        return cls(np.maximum(draws, 0.0))
+
+    @classmethod
+    def from_samples(cls, samples: np.ndarray, coef: Sequence[float]) -> "PortfolioUncertainty":
+        """
+        Joint draws from bootstrap coefficient samples.
+
+        Args:
+            samples: Coefficient draws (draws × channels), in engine channel order
+            coef: Point-estimate coefficient per channel (ResponseModel.coef)
+
+        Returns:
+            PortfolioUncertainty with multipliers 1 + (sample - sample mean) / coef,
+            so the band is centred on the point estimate like from_normal
+        """
+        samples = np.asarray(samples, dtype=float)
+        coef = np.asarray(coef, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            spread = (samples - samples.mean(axis=0)) / coef
+        draws = 1.0 + np.where(coef > 0, np.nan_to_num(spread), 0.0)
+        return cls(np.maximum(draws, 0.0))
+
+    @classmethod
+    def from_engine(cls, engine, n_draws: int = DEFAULT_DRAWS, seed: int = 42) -> "PortfolioUncertainty":
+        """
+        Draws for a response engine (ResponseModel or CurveIndex).
+
+        The relative std is read off the engine's 90% CI band at half its
+        spend range: (ci_upper - revenue) / (1.645 · revenue). For the
+        parametric engine this is exactly RESPONSE_COEF_STD / RESPONSE_COEF.
+        """
+        return cls.from_normal(relative_std(engine), n_draws=n_draws, seed=seed)
+
+    def simulate(
+        self,
+        revenue: Sequence[float],
+        baseline_revenue: Optional[Sequence[float]] = None,
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES
+    ) -> dict:
+        """
+        Portfolio revenue distribution at one allocation.
+
+        Args:
+            revenue: Point-estimate revenue per channel at the simulated spend
+            baseline_revenue: Point-estimate revenue per channel at the baseline
+            percentiles: Percentiles to report
+
+        Returns:
+            Dict with mean, percentiles {p: value}, lower/upper (first/last
+            percentile) and, with a baseline, lift_percentiles and prob_lift
+            (share of draws where simulated revenue beats the baseline)
+        """
+        revenue = np.asarray(revenue, dtype=float)
+        totals = self.multipliers @ revenue
+        values = np.percentile(totals, percentiles)
+        result = {
+            "mean": float(totals.mean()),
+            "percentiles": dict(zip(percentiles, values.tolist())),
+            "lower": float(values[0]),
+            "upper": float(values[-1]),
+            "n_draws": self.n_draws
+        }
+
+        if baseline_revenue is not None:
+            lift = self.multipliers @ (revenue - np.asarray(baseline_revenue, dtype=float))
+            result["lift_percentiles"] = dict(zip(percentiles, np.percentile(lift, percentiles).tolist()))
+            result["prob_lift"] = float(np.mean(lift > 0))
+
+        return result
+
+    def simulate_batch(
+        self,
+        revenue: np.ndarray,
+        baseline_revenue: Sequence[float],
+        percentiles: Sequence[float] = DEFAULT_PERCENTILES,
+        chunk_size: int = 256
+    ) -> dict:
+        """
+        Portfolio revenue distribution for many allocations at once.
+
+        Args:
+            revenue: Point-estimate revenue per channel, scenarios × channels
+            baseline_revenue: Point-estimate revenue per channel at the baseline
+            percentiles: Percentiles to report
+            chunk_size: Scenarios per matrix product (bounds memory at chunk × draws)
+
+        Returns:
+            Dict of per-scenario arrays: percentiles {p: array}, lower, upper and prob_lift
+        """
+        revenue = np.atleast_2d(np.asarray(revenue, dtype=float))
+        baseline_total = self.multipliers @ np.asarray(baseline_revenue, dtype=float)
+        bands = np.empty((len(percentiles), len(revenue)))
+        prob_lift = np.empty(len(revenue))
+        for start in range(0, len(revenue), chunk_size):
+            totals = revenue[start:start + chunk_size] @ self.multipliers.T    # (chunk, draws)
+            bands[:, start:start + chunk_size] = np.percentile(totals, percentiles, axis=1)
+            prob_lift[start:start + chunk_size] = np.mean(totals > baseline_total, axis=1)
+        return {
+            "percentiles": dict(zip(percentiles, bands)),
+            "lower": bands[0],
+            "upper": bands[-1],
+            "prob_lift": prob_lift,
+            "n_draws": self.n_draws
+        }
+
+
+def relative_std(engine) -> np.ndarray:
+    """Per-channel coefficient std / coefficient implied by an engine's 90% CI band."""
+    revenue, _, ci_upper = engine.predict(np.asarray(engine.max_spend, dtype=float) / 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel = (ci_upper - revenue) / (CI_Z * revenue)
+    return np.where(revenue > 0, np.nan_to_num(rel, nan=0.0, posinf=0.0), 0.0)
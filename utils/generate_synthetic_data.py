@@ -1,12 +1,20 @@
+import argparse
 import pandas as pd
 import numpy as np
-import random
 import os
+import time
 import datetime
 from datetime import timedelta
 from faker import Faker
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    # Without pyarrow the CSVs are written by pandas (several times slower at --scale 10+)
+    # and --format parquet is unavailable
+    pa = None
 
 # --- Constants & Configuration ---
 RANDOM_SEED = 42
@@ -217,24 +225,128 @@ CHANNELS = [
     "Meta (Facebook)"  # Tier 4 (Unprofitable)
 ]
 
+# Precomputed pools: ACCOUNT_NAME is drawn from a fixed set of Faker companies
+# (one Faker call per opportunity dominated the runtime) and IDs come from IdSequence
+ACCOUNT_POOL_SIZE = 3000
+DEFAULT_CAMPAIGNS = 150
+CHUNK_CAMPAIGNS = 1000  # per chunk: ~60K spend rows, ~100K opportunities
+
+# Seasonal spend multiplier by month (Q1/Q3 spikes for B2B budget cycles, year-end flush)
+MONTH_SEASONALITY = np.array([1.0, 1.4, 1.4, 1.4, 1.0, 1.0, 1.0, 1.4, 1.4, 1.4, 1.0, 1.2, 1.2])  # index = month
+
 # --- Initialization ---
-random.seed(RANDOM_SEED)
-np.random.seed(RANDOM_SEED)
+rng = np.random.default_rng(RANDOM_SEED)
 fake = Faker()
 Faker.seed(RANDOM_SEED)
+_account_pool = None
 
-def ensure_directories():
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-    os.makedirs(BRIEFS_DIR, exist_ok=True)
+def ensure_directories(output_dir=OUTPUT_DIR, briefs=True):
+    os.makedirs(output_dir, exist_ok=True)
+    if briefs:
+        os.makedirs(os.path.join(output_dir, "campaign_briefs"), exist_ok=True)
+
+def set_period(years):
+    """Generate `years` calendar years of data starting at START_DATE."""
+    global END_DATE, DAYS
+    END_DATE = datetime.date(START_DATE.year + years, 1, 1) - timedelta(days=1)
+    DAYS = (END_DATE - START_DATE).days + 1
 
 # --- Helper Functions ---
 
 def get_fiscal_week(date_obj):
     return f"{date_obj.year}-W{date_obj.isocalendar()[1]:02d}"
 
-def generate_campaigns(num_campaigns=50):
-    campaigns = []
+def _day(date_obj):
+    return np.datetime64(date_obj, "D")
+
+def _channel_param(channels, key):
+    """B2B_CHANNEL_PERFORMANCE[channel][key] for every entry of `channels`, as an array."""
+    values = {ch: cfg[key] for ch, cfg in B2B_CHANNEL_PERFORMANCE.items()}
+    return pd.Series(np.asarray(channels)).map(values).to_numpy()
+
+def _campaign_rows(campaigns_df, campaign_ids):
+    """Row position in campaigns_df of each campaign ID (-1 if unknown)."""
+    return pd.Index(campaigns_df["CAMPAIGN_ID"]).get_indexer(campaign_ids)
+
+class IdSequence:
+    """
+    Unique, random-looking IDs such as OPP-3fa85f64.
+    
+    take(n) continues a counter and scrambles it with an invertible 32-bit mix,
+    so IDs never repeat within 2^32 draws and need no uniqueness check.
+    """
+    HEX = np.array(list("0123456789abcdef"))
+    
+    def __init__(self, prefix, salt=0):
+        self.prefix = prefix
+        self.salt = salt
+        self.issued = 0
+    
+    def take(self, n):
+        x = (np.arange(self.issued, self.issued + n, dtype=np.uint64) + self.salt) & 0xFFFFFFFF
+        self.issued += n
+        x = (x * 0x9E3779B1) & 0xFFFFFFFF
+        x ^= x >> np.uint64(16)
+        x = (x * 0x85EBCA6B) & 0xFFFFFFFF
+        x ^= x >> np.uint64(13)
+        digits = (x[:, None] >> np.arange(28, -4, -4, dtype=np.uint64)) & 0xF
+        return np.char.add(self.prefix, np.ascontiguousarray(self.HEX[digits]).view("<U8").ravel())
+
+OPP_IDS = IdSequence("OPP-", salt=0x2F6B1C3D)
+INV_IDS = IdSequence("INV-", salt=0x7A19E405)
+
+def account_pool():
+    """Company names ACCOUNT_NAME is sampled from (built on first use)."""
+    global _account_pool
+    if _account_pool is None:
+        _account_pool = np.array([fake.company() for _ in range(ACCOUNT_POOL_SIZE)], dtype=object)
+    return _account_pool
+
+class TableWriter:
+    """
+    Append DataFrame chunks to one CSV or Parquet file.
+    
+    The first chunk fixes the schema and later chunks are cast to it, so memory
+    is bounded by the chunk size however many rows are written. Dates are
+    written as YYYY-MM-DD and missing values as empty fields.
+    """
+    def __init__(self, path, fmt="csv"):
+        self.path = path
+        self.fmt = fmt
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+    
+    def write(self, df):
+        if pa is None:
+            df.to_csv(self.path, mode="a" if self.rows else "w", header=not self.rows, index=False)
+        else:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            columns = [col.cast(pa.date32()) if pa.types.is_timestamp(col.type) else col for col in table.columns]
+            table = pa.table(columns, names=table.column_names)
+            if self._writer is None:
+                writer_cls = pq.ParquetWriter if self.fmt == "parquet" else pa_csv.CSVWriter
+                self._writer = writer_cls(self.path, table.schema)
+                self._schema = table.schema
+            self._writer.write_table(table.cast(self._schema))
+        self.rows += len(df)
+    
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+    
+    def __enter__(self):
+        return self
     
+    def __exit__(self, *exc):
+        self.close()
+
+def write_table(df, path, fmt="csv"):
+    with TableWriter(path, fmt) as writer:
+        writer.write(df)
+
+def generate_campaigns(num_campaigns=50):
     # Channel weights by campaign type (10 channels)
     # Order: LinkedIn, Google, Microsoft, YouTube, Programmatic, Trade Pubs, 
     #        Meta(IG), X.com, TikTok, Meta(FB)
@@ -244,31 +356,33 @@ def generate_campaigns(num_campaigns=50):
         "Nurture": [0.30, 0.20, 0.15, 0.10, 0.05, 0.05, 0.05, 0.04, 0.03, 0.03],
     }
     
-    for i in range(num_campaigns):
-        bg = random.choice(BGS)
-        region = random.choice(REGIONS)
-        division = random.choice(DIVISIONS[bg])
-        ctype = random.choice(TYPES)
-        cid = f"CMP-{100+i}"
+    bg_idx = rng.integers(0, len(BGS), num_campaigns)
+    bg = np.array(BGS)[bg_idx]
+    region = rng.choice(REGIONS, num_campaigns)
+    division = np.array([DIVISIONS[b] for b in BGS])[bg_idx, rng.integers(0, 2, num_campaigns)]
+    type_idx = rng.integers(0, len(TYPES), num_campaigns)
+    ctype = np.array(TYPES)[type_idx]
+    cid = np.char.add("CMP-", (100 + np.arange(num_campaigns)).astype(str))
+    
+    # Assign channel based on campaign type preferences (inverse CDF per row)
+    weights = np.array([CHANNEL_WEIGHTS[t] for t in TYPES])
+    cdf = np.cumsum(weights / weights.sum(axis=1, keepdims=True), axis=1)
+    channel_idx = (rng.random(num_campaigns)[:, None] >= cdf[type_idx]).sum(axis=1)
+    channel = np.array(CHANNELS)[np.minimum(channel_idx, len(CHANNELS) - 1)]
+    
+    campaigns = pd.DataFrame({
+        "CAMPAIGN_ID": cid,
         # Taxonomy: [BG]_[Region]_[Division]_[CampaignType]_[ID]
-        name = f"{bg}_{region}_{division}_{ctype}_{cid}"
-        
-        # Assign channel based on campaign type preferences
-        weights = CHANNEL_WEIGHTS.get(ctype, CHANNEL_WEIGHTS["LeadGen"])
-        channel = random.choices(CHANNELS, weights=weights)[0]
-            
-        campaigns.append({
-            "CAMPAIGN_ID": cid,
-            "CAMPAIGN_NAME": name,
-            "BG": bg,
-            "REGION": region,
-            "DIVISION": division,
-            "TYPE": ctype,
-            "CHANNEL": channel,
-            "START_DATE": START_DATE + timedelta(days=random.randint(0, DAYS - 90)),
-            "DURATION": random.randint(30, 90) # Days
-        })
-    return pd.DataFrame(campaigns)
+        "CAMPAIGN_NAME": [f"{b}_{r}_{d}_{t}_{c}" for b, r, d, t, c in zip(bg, region, division, ctype, cid)],
+        "BG": bg,
+        "REGION": region,
+        "DIVISION": division,
+        "TYPE": ctype,
+        "CHANNEL": channel,
+        "START_DATE": _day(START_DATE) + rng.integers(0, DAYS - 90, num_campaigns, endpoint=True),
+        "DURATION": rng.integers(30, 90, num_campaigns, endpoint=True),  # Days
+    })
+    return campaigns
 
 def generate_spend(campaigns_df):
     """
@@ -277,9 +391,8 @@ def generate_spend(campaigns_df):
     Over 3 years: ~$525M total spend.
     
     Uses B2B_CHANNEL_PERFORMANCE config for channel-specific parameters.
+    One row per campaign day, built with np.repeat rather than a loop per day.
     """
-    spend_records = []
-    
     # Campaign type weights (not channel-specific)
     TYPE_SPEND_WEIGHTS = {
         "Brand": 1.4,         # Larger brand campaigns
@@ -287,63 +400,43 @@ def generate_spend(campaigns_df):
         "Nurture": 0.5        # Smaller, targeted
     }
     
-    for _, camp in campaigns_df.iterrows():
-        start = camp["START_DATE"]
-        channel = camp["CHANNEL"]
-        
-        # Get channel config from B2B_CHANNEL_PERFORMANCE
-        ch_config = B2B_CHANNEL_PERFORMANCE.get(channel, {
-            "spend_weight": 1.0, "cpm": 20, "ctr": 0.01
-        })
-        
-        channel_weight = ch_config.get("spend_weight", 1.0)
-        type_weight = TYPE_SPEND_WEIGHTS.get(camp["TYPE"], 1.0)
-        
-        # Base daily spend: $50K-$100K per campaign, adjusted by weights
-        # This gives ~$175M/year with ~20-25 campaigns active at any time
-        base_daily = np.random.uniform(50000, 100000) * channel_weight * type_weight
-        
-        for day_offset in range(camp["DURATION"]):
-            current_date = start + timedelta(days=day_offset)
-            if current_date > END_DATE:
-                break
-                
-            # Seasonal multiplier (Q1/Q3 spikes for B2B budget cycles)
-            month = current_date.month
-            seasonality = 1.0
-            if month in [1, 2, 3, 7, 8, 9]:  # Q1 and Q3
-                seasonality = 1.4
-            elif month in [11, 12]:  # Year-end budget flush
-                seasonality = 1.2
-            
-            # Get CPM from channel config
-            cpm = ch_config.get("cpm", 20)
-            
-            # Daily spend with noise
-            daily_spend = base_daily * seasonality * np.random.uniform(0.7, 1.3)
-            
-            # Injection: Healthcare LinkedIn Boost (pharma/medical premium)
-            if camp["BG"] == "HCBG" and channel == "LinkedIn":
-                daily_spend *= 1.25
-                
-            impressions = int((daily_spend / cpm) * 1000)
-            
-            # Get CTR from channel config
-            ctr = ch_config.get("ctr", 0.01)
-            
-            clicks = int(impressions * ctr * np.random.uniform(0.8, 1.2))
-            
-            spend_records.append({
-                "DATE": current_date,
-                "CAMPAIGN_ID": camp["CAMPAIGN_ID"],
-                "CHANNEL": camp["CHANNEL"],
-                "SPEND_AMT": round(daily_spend, 2),
-                "IMPRESSIONS": impressions,
-                "CLICKS": clicks,
-                "VIDEO_VIEWS_50": int(impressions * 0.15) if camp["TYPE"] == "Brand" else 0
-            })
-            
-    return pd.DataFrame(spend_records)
+    channel = campaigns_df["CHANNEL"].to_numpy()
+    ctype = campaigns_df["TYPE"].to_numpy()
+    type_weight = pd.Series(ctype).map(TYPE_SPEND_WEIGHTS).fillna(1.0).to_numpy()
+    
+    # Base daily spend: $50K-$100K per campaign, adjusted by weights
+    # This gives ~$175M/year with ~20-25 campaigns active at any time
+    base_daily = rng.uniform(50000, 100000, len(campaigns_df)) * _channel_param(channel, "spend_weight") * type_weight
+    
+    # Injection: Healthcare LinkedIn Boost (pharma/medical premium)
+    base_daily *= np.where((campaigns_df["BG"].to_numpy() == "HCBG") & (channel == "LinkedIn"), 1.25, 1.0)
+    
+    # Expand campaigns to days
+    duration = campaigns_df["DURATION"].to_numpy()
+    camp = np.repeat(np.arange(len(campaigns_df)), duration)
+    day_offset = np.arange(len(camp)) - np.repeat(np.cumsum(duration) - duration, duration)
+    dates = campaigns_df["START_DATE"].to_numpy().astype("datetime64[D]")[camp] + day_offset
+    keep = dates <= _day(END_DATE)
+    camp, dates = camp[keep], dates[keep]
+    
+    month = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    
+    # Daily spend with seasonality and noise
+    daily_spend = base_daily[camp] * MONTH_SEASONALITY[month] * rng.uniform(0.7, 1.3, len(camp))
+    
+    impressions = (daily_spend / _channel_param(channel, "cpm")[camp] * 1000).astype(np.int64)
+    clicks = (impressions * _channel_param(channel, "ctr")[camp] * rng.uniform(0.8, 1.2, len(camp))).astype(np.int64)
+    video_views = np.where(ctype[camp] == "Brand", (impressions * 0.15).astype(np.int64), 0)
+    
+    return pd.DataFrame({
+        "DATE": dates,
+        "CAMPAIGN_ID": campaigns_df["CAMPAIGN_ID"].to_numpy()[camp],
+        "CHANNEL": channel[camp],
+        "SPEND_AMT": np.round(daily_spend, 2),
+        "IMPRESSIONS": impressions,
+        "CLICKS": clicks,
+        "VIDEO_VIEWS_50": video_views,
+    })
 
 def generate_opportunities(spend_df, campaigns_df):
     """
@@ -356,93 +449,69 @@ def generate_opportunities(spend_df, campaigns_df):
     - Deterministic base with controlled variance
     
     Uses B2B_CHANNEL_PERFORMANCE config for channel-specific parameters.
+    Each spend row is repeated once per opportunity and lags, stages and
+    amounts are sampled for all opportunities at once.
     """
-    opps = []
-    campaign_lookup = campaigns_df.set_index("CAMPAIGN_ID").to_dict("index")
+    channel = campaigns_df["CHANNEL"].to_numpy()
+    ctype = campaigns_df["TYPE"].to_numpy()
+    bg = campaigns_df["BG"].to_numpy()
     
-    # Process ALL spend records for better coverage
-    for _, row in spend_df.iterrows():
-        camp = campaign_lookup[row["CAMPAIGN_ID"]]
-        channel = camp["CHANNEL"]
-        
-        # Get channel config from B2B_CHANNEL_PERFORMANCE
-        ch_config = B2B_CHANNEL_PERFORMANCE.get(channel, {
-            "win_rate": 0.50, "deal_size_multiplier": 1.0, "roas_target": 2.0,
-            "opp_lag_min": 7, "opp_lag_max": 21, "cycle_min": 14, "cycle_max": 28,
-            "noise_factor": 0.20
-        })
-        
-        # DETERMINISTIC opportunity generation based on spend
-        # This creates a direct spend→revenue relationship the model can detect
-        roas_target = ch_config.get("roas_target", 2.0)
-        noise_factor = ch_config.get("noise_factor", 0.20)
-        
-        # Expected revenue from this day's spend
-        expected_revenue = row["SPEND_AMT"] * roas_target
-        
-        # Number of opps scaled by expected revenue (~$150K per opp average)
-        # Higher ROAS channels generate more/larger opps
-        num_opps = max(1, int(expected_revenue / 150000))
-        
-        for _ in range(num_opps):
-            # Use channel-specific SHORT lags
-            opp_lag_min = ch_config.get("opp_lag_min", 7)
-            opp_lag_max = ch_config.get("opp_lag_max", 21)
-            lag_days = random.randint(opp_lag_min, opp_lag_max)
-            created_date = row["DATE"] + timedelta(days=lag_days)
-            
-            if created_date > END_DATE:
-                continue
-                
-            # Use channel-specific win rate
-            win_rate = ch_config.get("win_rate", 0.50)
-            
-            # Campaign type adjustment (smaller effect)
-            if camp["TYPE"] == "LeadGen":
-                win_rate = min(0.90, win_rate * 1.05)
-            elif camp["TYPE"] == "Brand":
-                win_rate *= 0.98
-                
-            # Simplified stage distribution
-            closed_lost_rate = max(0.05, 1.0 - win_rate - 0.05)
-            
-            stage = np.random.choice(
-                ["Closed Won", "Closed Lost", "Negotiation"], 
-                p=[win_rate, closed_lost_rate, 0.05]
-            )
-            
-            # Use channel-specific SHORT sales cycles
-            cycle_min = ch_config.get("cycle_min", 14)
-            cycle_max = ch_config.get("cycle_max", 28)
-            cycle_days = random.randint(cycle_min, cycle_max)
-            close_date = created_date + timedelta(days=cycle_days)
-            
-            # Deal size: based on expected revenue per opp with controlled noise
-            # Lower noise_factor = more predictable = better model fit
-            base_deal = expected_revenue / num_opps
-            deal_amount = base_deal * (1 + np.random.normal(0, noise_factor))
-            deal_amount = max(25000, deal_amount)  # Floor at $25K
-            
-            # Apply channel-specific deal size multiplier
-            deal_amount *= ch_config.get("deal_size_multiplier", 1.0)
-                
-            # Business group adjustments (smaller effect)
-            if camp["BG"] == "HCBG":
-                deal_amount *= 1.05
-            
-            opps.append({
-                "OPPORTUNITY_ID": f"OPP-{fake.uuid4()[:8]}",
-                "ACCOUNT_NAME": fake.company(),
-                "LEAD_SOURCE_CAMPAIGN": row["CAMPAIGN_ID"],
-                "STAGE": stage,
-                "AMOUNT_USD": round(deal_amount, 2),
-                "CREATED_DATE": created_date,
-                "CLOSE_DATE": close_date if stage in ["Closed Won", "Closed Lost"] else None,
-                "BUSINESS_GROUP": camp["BG"],
-                "REGION": camp["REGION"]
-            })
-        
-    return pd.DataFrame(opps)
+    # Channel-specific win rate with campaign type adjustment (smaller effect)
+    win_rate = _channel_param(channel, "win_rate")
+    win_rate = np.where(ctype == "LeadGen", np.minimum(0.90, win_rate * 1.05), win_rate)
+    win_rate = np.where(ctype == "Brand", win_rate * 0.98, win_rate)
+    # Simplified stage distribution
+    closed_lost_rate = np.maximum(0.05, 1.0 - win_rate - 0.05)
+    
+    # Lower noise_factor = more predictable = better model fit; HCBG deals slightly larger
+    deal_multiplier = _channel_param(channel, "deal_size_multiplier") * np.where(bg == "HCBG", 1.05, 1.0)
+    
+    # DETERMINISTIC opportunity generation based on spend
+    # This creates a direct spend→revenue relationship the model can detect
+    spend_camp = _campaign_rows(campaigns_df, spend_df["CAMPAIGN_ID"])
+    expected_revenue = spend_df["SPEND_AMT"].to_numpy() * _channel_param(channel, "roas_target")[spend_camp]
+    
+    # Number of opps scaled by expected revenue (~$150K per opp average)
+    # Higher ROAS channels generate more/larger opps
+    num_opps = np.maximum(1, (expected_revenue / 150000).astype(np.int64))
+    row = np.repeat(np.arange(len(spend_df)), num_opps)
+    camp = spend_camp[row]
+    
+    # Use channel-specific SHORT lags
+    lag_days = rng.integers(_channel_param(channel, "opp_lag_min")[camp], _channel_param(channel, "opp_lag_max")[camp], endpoint=True)
+    created_date = spend_df["DATE"].to_numpy().astype("datetime64[D]")[row] + lag_days
+    keep = created_date <= _day(END_DATE)
+    row, camp, created_date = row[keep], camp[keep], created_date[keep]
+    n = len(row)
+    
+    u = rng.random(n)
+    stage = np.select(
+        [u < win_rate[camp], u < win_rate[camp] + closed_lost_rate[camp]],
+        ["Closed Won", "Closed Lost"],
+        "Negotiation"
+    )
+    
+    # Use channel-specific SHORT sales cycles
+    cycle_days = rng.integers(_channel_param(channel, "cycle_min")[camp], _channel_param(channel, "cycle_max")[camp], endpoint=True)
+    close_date = np.where(stage != "Negotiation", created_date + cycle_days, np.datetime64("NaT", "D"))
+    
+    # Deal size: based on expected revenue per opp with controlled noise, floor at $25K
+    base_deal = expected_revenue[row] / num_opps[row]
+    deal_amount = np.maximum(25000, base_deal * (1 + rng.normal(0, _channel_param(channel, "noise_factor")[camp])))
+    deal_amount *= deal_multiplier[camp]
+    
+    accounts = account_pool()
+    return pd.DataFrame({
+        "OPPORTUNITY_ID": OPP_IDS.take(n),
+        "ACCOUNT_NAME": accounts[rng.integers(0, len(accounts), n)],
+        "LEAD_SOURCE_CAMPAIGN": spend_df["CAMPAIGN_ID"].to_numpy()[row],
+        "STAGE": stage,
+        "AMOUNT_USD": np.round(deal_amount, 2),
+        "CREATED_DATE": created_date,
+        "CLOSE_DATE": close_date,
+        "BUSINESS_GROUP": bg[camp],
+        "REGION": campaigns_df["REGION"].to_numpy()[camp],
+    })
 
 def generate_revenue(opps_df, campaigns_df):
     """
@@ -457,93 +526,61 @@ def generate_revenue(opps_df, campaigns_df):
     """
     won_opps = opps_df[opps_df["STAGE"] == "Closed Won"]
     
-    # Build campaign lookup to get channel for revenue lag
-    campaign_lookup = campaigns_df.set_index("CAMPAIGN_ID").to_dict("index")
+    # Channel-specific revenue lag via LEAD_SOURCE_CAMPAIGN (1-7 days if the campaign is unknown)
+    channel = campaigns_df["CHANNEL"].to_numpy()
+    camp = _campaign_rows(campaigns_df, won_opps["LEAD_SOURCE_CAMPAIGN"])
+    known = camp >= 0
+    rev_lag_min = np.where(known, _channel_param(channel, "rev_lag_min")[camp], 1)
+    rev_lag_max = np.where(known, _channel_param(channel, "rev_lag_max")[camp], 7)
     
-    # Build opp to campaign lookup via LEAD_SOURCE_CAMPAIGN
-    opp_to_campaign = opps_df.set_index("OPPORTUNITY_ID")["LEAD_SOURCE_CAMPAIGN"].to_dict()
+    # Simplified: 80% immediate, 20% slightly delayed; one invoice per deal
+    immediate = rng.random(len(won_opps)) < 0.80
+    lag_days = np.where(
+        immediate,
+        rng.integers(rev_lag_min, rev_lag_max, endpoint=True),
+        rng.integers(rev_lag_max, rev_lag_max + 7, endpoint=True)
+    )
+    inv_date = won_opps["CLOSE_DATE"].to_numpy().astype("datetime64[D]") + lag_days
     
-    invoices = []
+    # Keep revenue within the data window, capped at END_DATE for reporting
+    keep = inv_date <= _day(END_DATE + timedelta(days=30))
+    won_opps, inv_date = won_opps[keep], np.minimum(inv_date[keep], _day(END_DATE))
     
-    for _, opp in won_opps.iterrows():
-        total_amt = opp["AMOUNT_USD"]
-        
-        # Get channel-specific revenue lag from config
-        campaign_id = opp_to_campaign.get(opp["OPPORTUNITY_ID"])
-        if campaign_id and campaign_id in campaign_lookup:
-            channel = campaign_lookup[campaign_id]["CHANNEL"]
-            ch_config = B2B_CHANNEL_PERFORMANCE.get(channel, {})
-            rev_lag_min = ch_config.get("rev_lag_min", 1)
-            rev_lag_max = ch_config.get("rev_lag_max", 7)
-        else:
-            rev_lag_min = 1
-            rev_lag_max = 7
-        
-        # Simplified: 80% immediate (single invoice), 20% slightly delayed
-        deal_type = np.random.choice(
-            ["immediate", "standard"],
-            p=[0.80, 0.20]
-        )
-        
-        if deal_type == "immediate":
-            # Single invoice, very quick recognition
-            num_invoices = 1
-            base_lag = random.randint(rev_lag_min, rev_lag_max)
-            lag_increment = 0
-        else:
-            # Standard: single invoice, slightly longer
-            num_invoices = 1
-            base_lag = random.randint(rev_lag_max, rev_lag_max + 7)
-            lag_increment = 0
-        
-        for i in range(num_invoices):
-            lag_days = base_lag + (lag_increment * i)
-            inv_date = opp["CLOSE_DATE"] + timedelta(days=lag_days)
-            
-            # Keep revenue within the data window
-            if inv_date > END_DATE + timedelta(days=30):
-                continue
-            
-            # Cap at END_DATE for reporting
-            if inv_date > END_DATE:
-                inv_date = END_DATE
-                
-            invoices.append({
-                "INVOICE_ID": f"INV-{fake.uuid4()[:8]}",
-                "BOOKED_REVENUE": round(total_amt / num_invoices, 2),
-                "PROFIT_CENTER": f"PC_{opp['BUSINESS_GROUP']}_{opp['REGION']}",
-                "POSTING_DATE": inv_date,
-                "OPPORTUNITY_ID": opp["OPPORTUNITY_ID"]
-            })
-            
-    return pd.DataFrame(invoices)
+    return pd.DataFrame({
+        "INVOICE_ID": INV_IDS.take(len(won_opps)),
+        "BOOKED_REVENUE": np.round(won_opps["AMOUNT_USD"].to_numpy(), 2),
+        "PROFIT_CENTER": ("PC_" + won_opps["BUSINESS_GROUP"] + "_" + won_opps["REGION"]).to_numpy(),
+        "POSTING_DATE": inv_date,
+        "OPPORTUNITY_ID": won_opps["OPPORTUNITY_ID"].to_numpy(),
+    })
 
 def generate_macro_data():
-    dates = [START_DATE + timedelta(days=i) for i in range(DAYS)]
-    data = []
+    dates = _day(START_DATE) + np.arange(DAYS)
+    ordinal = dates.astype(np.int64) + datetime.date(1970, 1, 1).toordinal()
     
-    for d in dates:
-        # PMI varies between 45 and 60 with sine wave trend
-        pmi = 52 + 5 * np.sin(d.toordinal() / 365.0 * 2 * np.pi) + np.random.normal(0, 0.5)
-        
-        # Competitor SOV - Inverse to our spend (simplified)
-        comp_sov = np.random.uniform(0.1, 0.4)
-        
-        if d.weekday() == 0: # Weekly grain usually, but daily for file
-            data.append({
-                "DATE": d,
-                "PMI_INDEX": round(pmi, 2),
-                "COMPETITOR_SOV": round(comp_sov, 3),
-                "REGION": "NA" # Simplified
-            })
-            
-    return pd.DataFrame(data)
+    # PMI varies between 45 and 60 with sine wave trend
+    pmi = 52 + 5 * np.sin(ordinal / 365.0 * 2 * np.pi) + rng.normal(0, 0.5, DAYS)
+    
+    # Competitor SOV - Inverse to our spend (simplified)
+    comp_sov = rng.uniform(0.1, 0.4, DAYS)
+    
+    # Weekly grain usually, but daily for file: keep Mondays
+    monday = (ordinal - 1) % 7 == 0
+    return pd.DataFrame({
+        "DATE": dates[monday],
+        "PMI_INDEX": np.round(pmi[monday], 2),
+        "COMPETITOR_SOV": np.round(comp_sov[monday], 3),
+        "REGION": "NA"  # Simplified
+    })
 
-def generate_campaign_briefs(campaigns_df):
+def generate_campaign_briefs(campaigns_df, briefs_dir=BRIEFS_DIR):
     # Generate simple PDF briefs for Cortex Search
-    for _, camp in campaigns_df.iterrows():
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.pagesizes import letter
+    
+    for camp in campaigns_df.to_dict("records"):
         filename = f"{camp['CAMPAIGN_ID']}_Brief.pdf"
-        filepath = os.path.join(BRIEFS_DIR, filename)
+        filepath = os.path.join(briefs_dir, filename)
         
         c = canvas.Canvas(filepath, pagesize=letter)
         c.drawString(100, 750, f"Campaign Strategy Brief: {camp['CAMPAIGN_NAME']}")
@@ -556,46 +593,90 @@ def generate_campaign_briefs(campaigns_df):
 
 # --- Main Execution ---
 
-def main():
-    print(f"Generating synthetic data to {OUTPUT_DIR}...")
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic MMM demo data")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help=f"Multiply the number of campaigns ({DEFAULT_CAMPAIGNS}) and so all row counts, "
+                             "e.g. 10 or 100 for load tests (default: 1)")
+    parser.add_argument("--years", type=int, default=5,
+                        help=f"Years of data starting {START_DATE} (default: 5)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR,
+                        help=f"Output directory (default: {OUTPUT_DIR})")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv",
+                        help="Output file format; parquet needs pyarrow (default: csv)")
+    parser.add_argument("--chunk-campaigns", type=int, default=CHUNK_CAMPAIGNS,
+                        help="Campaigns generated and written per chunk; bounds memory "
+                             f"regardless of --scale (default: {CHUNK_CAMPAIGNS})")
+    parser.add_argument("--no-briefs", action="store_true",
+                        help="Skip the campaign brief PDFs")
+    args = parser.parse_args(argv)
+    if args.format == "parquet" and pa is None:
+        parser.error("--format parquet requires pyarrow")
+    if args.chunk_campaigns < 1:
+        parser.error("--chunk-campaigns must be at least 1")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    set_period(args.years)
+    output_dir = args.output_dir
+    num_campaigns = max(1, round(DEFAULT_CAMPAIGNS * args.scale))
+    num_chunks = -(-num_campaigns // args.chunk_campaigns)
+    started = time.perf_counter()
+    
+    def output_path(name):
+        return os.path.join(output_dir, f"{name}.{args.format}")
+    
+    print(f"Generating synthetic data to {output_dir}...")
     print(f"Target: Strong spend→revenue correlation for MMM model")
-    ensure_directories()
+    print(f"Scale: {num_campaigns} campaigns, {START_DATE} to {END_DATE}, {num_chunks} chunk(s)")
+    ensure_directories(output_dir, briefs=not args.no_briefs)
     
     print("1. Generating Campaigns...")
-    campaigns_df = generate_campaigns(150)  # Increased from 75 for better revenue coverage
-    campaigns_df.to_csv(os.path.join(OUTPUT_DIR, "campaign_metadata.csv"), index=False)
-    
-    print("2. Generating Spend (Sprinklr)...")
-    spend_df = generate_spend(campaigns_df)
-    spend_df.to_csv(os.path.join(OUTPUT_DIR, "sprinklr_spend.csv"), index=False)
-    print(f"   Total spend: ${spend_df['SPEND_AMT'].sum()/1e6:.1f}M")
+    campaigns_df = generate_campaigns(num_campaigns)
+    write_table(campaigns_df, output_path("campaign_metadata"), args.format)
     
-    print("3. Generating Opportunities (Salesforce)...")
-    opps_df = generate_opportunities(spend_df, campaigns_df)
-    opps_df.to_csv(os.path.join(OUTPUT_DIR, "salesforce_opps.csv"), index=False)
-    won_count = len(opps_df[opps_df['STAGE'] == 'Closed Won'])
-    print(f"   Total opps: {len(opps_df)}, Closed Won: {won_count} ({100*won_count/len(opps_df):.1f}%)")
+    # Spend, opportunities and revenue of a campaign depend only on that campaign,
+    # so they are generated and appended chunk by chunk of campaigns
+    print("2-4. Generating Spend (Sprinklr), Opportunities (Salesforce), Revenue (SAP)...")
+    total_spend = total_rev = 0.0
+    won_count = 0
+    with TableWriter(output_path("sprinklr_spend"), args.format) as spend_out, \
+            TableWriter(output_path("salesforce_opps"), args.format) as opps_out, \
+            TableWriter(output_path("sap_revenue"), args.format) as rev_out:
+        for i, start in enumerate(range(0, num_campaigns, args.chunk_campaigns), start=1):
+            chunk_df = campaigns_df.iloc[start:start + args.chunk_campaigns]
+            spend_df = generate_spend(chunk_df)
+            opps_df = generate_opportunities(spend_df, chunk_df)
+            rev_df = generate_revenue(opps_df, chunk_df)
+            
+            spend_out.write(spend_df)
+            opps_out.write(opps_df)
+            rev_out.write(rev_df)
+            total_spend += spend_df['SPEND_AMT'].sum()
+            total_rev += rev_df['BOOKED_REVENUE'].sum()
+            won_count += int((opps_df['STAGE'] == 'Closed Won').sum())
+            if num_chunks > 1:
+                print(f"   Chunk {i}/{num_chunks}: {opps_out.rows:,} opps so far")
     
-    print("4. Generating Revenue (SAP)...")
-    rev_df = generate_revenue(opps_df, campaigns_df)
-    rev_df.to_csv(os.path.join(OUTPUT_DIR, "sap_revenue.csv"), index=False)
-    print(f"   Total revenue: ${rev_df['BOOKED_REVENUE'].sum()/1e6:.1f}M")
+    print(f"   Spend rows: {spend_out.rows:,}, Total spend: ${total_spend/1e6:.1f}M")
+    print(f"   Total opps: {opps_out.rows:,}, Closed Won: {won_count:,} ({100*won_count/max(opps_out.rows, 1):.1f}%)")
+    print(f"   Total revenue: ${total_rev/1e6:.1f}M")
     
     # Calculate and display expected ROAS
-    total_spend = spend_df['SPEND_AMT'].sum()
-    total_rev = rev_df['BOOKED_REVENUE'].sum()
     print(f"   Expected overall ROAS: {total_rev/total_spend:.2f}x")
     
     print("5. Generating Macro Indicators...")
-    macro_df = generate_macro_data()
-    macro_df.to_csv(os.path.join(OUTPUT_DIR, "macro_indicators.csv"), index=False)
+    write_table(generate_macro_data(), output_path("macro_indicators"), args.format)
     
-    print("6. Generating Campaign Briefs (PDFs)...")
-    generate_campaign_briefs(campaigns_df)
+    if args.no_briefs:
+        print("6. Skipping Campaign Briefs (--no-briefs)")
+    else:
+        print("6. Generating Campaign Briefs (PDFs)...")
+        generate_campaign_briefs(campaigns_df, os.path.join(output_dir, "campaign_briefs"))
     
-    print("\nData generation complete.")
+    print(f"\nData generation complete in {time.perf_counter() - started:.1f}s.")
     print("Next: Run ./clean.sh --force && ./deploy.sh && ./run.sh main")
 
 if __name__ == "__main__":
     main()
-